@@ -42,6 +42,21 @@ sudo apt install -y \
     rfkill \
     jq
 
+# -----------------------------
+# VLC plugin cache
+# -----------------------------
+# AudioPlayer's fast startup profile (audio_async.py) assumes libvlc can
+# load its plugins from plugins.dat rather than scanning every .so on
+# first boot. The package trigger normally regenerates it, but not always
+# after a partial upgrade - regenerating here is cheap and idempotent.
+VLC_CACHE_GEN=$(ls /usr/lib/*/vlc/vlc-cache-gen 2>/dev/null | head -n1 || true)
+if [[ -n "$VLC_CACHE_GEN" ]]; then
+    echo "🎛️ Generating VLC plugin cache..."
+    sudo "$VLC_CACHE_GEN" "$(dirname "$VLC_CACHE_GEN")/plugins"
+else
+    echo "⚠️ vlc-cache-gen not found - VLC will scan its plugins on first start"
+fi
+
 # -----------------------------
 # Rotary encoder dtoverlay (idempotent)
 # -----------------------------
@@ -0,0 +1,208 @@
+"""Bitrate tier selection for stations published at several bitrates.
+
+Many stations offer the same programme at several bitrates (e.g. the
+BBC's lstn.lv URLs at 320/128/96/48 kbps). On a congested Wi-Fi link the
+top tier rebuffers where a lower one would play cleanly. stations.json can
+list those as "variants" (database.get_bitrate_ladders()), and
+BitrateSelector picks the tier each station plays at:
+
+- A station plays at its current tier, initially the highest.
+- The stall watchdog feeds it libvlc's read_bytes counter; when the
+  throughput delivered over BITRATE_WINDOW falls below BITRATE_HEADROOM x
+  the tier's bitrate - the buffer is draining - or the stream stalls, the
+  station steps down a tier and reconnects there.
+- BITRATE_STEP_UP_AFTER seconds without trouble moves the station back up
+  a tier for its next play, so a healthy stream is never cut off just to
+  try a higher bitrate. Until then the playing session keeps its own tier,
+  and is judged against that tier's bitrate.
+
+Every play is a session; ending one logs and keeps its effective bitrate
+(time-weighted nominal bitrate of the tiers played) and the throughput
+actually delivered.
+
+HLS master playlists are left to VLC's adaptive demux, which already picks
+among their variants from measured segment throughput.
+
+Pure logic, no hardware or asyncio: App feeds it from the watchdog.
+"""
+
+import logging
+from collections import deque
+from typing import Optional
+
+from .radio_config import BITRATE_HEADROOM, BITRATE_STEP_UP_AFTER, BITRATE_WINDOW
+
+_SESSIONS_KEPT = 20
+
+
+class BitrateSelector:
+    """Per-station bitrate tier, stepped down on trouble and back up when healthy."""
+
+    def __init__(
+        self,
+        ladders: Optional[dict] = None,
+        headroom: float = BITRATE_HEADROOM,
+        window: float = BITRATE_WINDOW,
+        step_up_after: float = BITRATE_STEP_UP_AFTER,
+    ) -> None:
+        # station url -> [(bitrate or None, url), ...], highest first
+        self.ladders = dict(ladders or {})
+        self.headroom = headroom
+        self.window = window
+        self.step_up_after = step_up_after
+        self.sessions: deque = deque(maxlen=_SESSIONS_KEPT)
+        self._tier: dict = {}       # station url -> ladder index of its next play (0 = highest)
+        self._samples: deque = deque()   # (time, cumulative bytes this tier)
+        self._last_read_bytes: Optional[int] = None
+        self._healthy_since = 0.0
+        self._session: Optional[dict] = None
+
+    def select(self, url: str) -> str:
+        """The URL to play for station url at its current tier."""
+        ladder = self.ladders.get(url)
+        if not ladder:
+            return url
+        return ladder[self._tier.get(url, 0)][1]
+
+    def bitrate(self, url: str) -> Optional[int]:
+        """Nominal bitrate (bps) of station url's current tier, if known."""
+        ladder = self.ladders.get(url)
+        if not ladder:
+            return None
+        return ladder[self._tier.get(url, 0)][0]
+
+    def start_session(self, url: str, now: float) -> None:
+        """Station url starts playing (ending any previous session)."""
+        self.end_session(now)
+        self._session = {
+            "station": url, "started": now, "bytes": 0, "step_downs": 0,
+            "tiers": {}, "tier": self._tier.get(url, 0), "bitrate": self.bitrate(url),
+            "tier_since": now,
+        }
+        self._restart_measurement(now)
+
+    def observe(self, read_bytes: Optional[int], now: float) -> None:
+        """Feed libvlc's read_bytes counter for the playing stream."""
+        if read_bytes is None:
+            return
+        if self._last_read_bytes is None:
+            delta = 0
+        elif read_bytes < self._last_read_bytes:
+            delta = read_bytes  # a reconnect opened a fresh media
+        else:
+            delta = read_bytes - self._last_read_bytes
+        self._last_read_bytes = read_bytes
+        total = (self._samples[-1][1] if self._samples else 0) + delta
+        self._samples.append((now, total))
+        # Keep one sample at or beyond the window as the baseline.
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+        if self._session is not None:
+            self._session["bytes"] += delta
+
+    def throughput(self, now: float) -> Optional[float]:
+        """Delivered bits/s over the last `window` seconds, once a full window is measured."""
+        if len(self._samples) < 2:
+            return None
+        (start, start_bytes), (end, end_bytes) = self._samples[0], self._samples[-1]
+        if end - start < self.window:
+            return None
+        return (end_bytes - start_bytes) * 8 / (end - start)
+
+    def too_slow(self, url: str, now: float) -> bool:
+        """Whether station url's playing tier is delivered too slowly to keep playing."""
+        session = self._playing_session(url)
+        bitrate = session["bitrate"] if session is not None else self.bitrate(url)
+        throughput = self.throughput(now)
+        if bitrate is None or throughput is None:
+            return False
+        return throughput < self.headroom * bitrate
+
+    def step_down(self, url: str, now: float) -> bool:
+        """Move station url down a tier after trouble; False if it's already at the lowest."""
+        self._healthy_since = now
+        ladder = self.ladders.get(url)
+        tier = self._playing_tier(url)
+        if not ladder or tier + 1 >= len(ladder):
+            return False
+        # From the tier actually playing: this also drops a pending step-up.
+        self._tier[url] = tier + 1
+        logging.info(f"📶 Stepping down to {_kbps(ladder[tier + 1][0])}: {url}")
+        session = self._playing_session(url)
+        if session is not None:
+            _close_tier(session, now)
+            session["tier"] = tier + 1
+            session["bitrate"] = ladder[tier + 1][0]
+            session["step_downs"] += 1
+        self._restart_measurement(now)
+        return True
+
+    def healthy(self, url: str, now: float) -> None:
+        """The watchdog saw station url playing cleanly at `now`. The playing
+        session stays on its tier; only the next play steps up, and by one
+        tier per play."""
+        tier = self._playing_tier(url)
+        if tier == 0 or self._tier.get(url, 0) < tier:
+            return
+        if now - self._healthy_since < self.step_up_after:
+            return
+        self._tier[url] = tier - 1
+        self._healthy_since = now
+        logging.info(f"📶 Next play steps up to {_kbps(self.ladders[url][tier - 1][0])}: {url}")
+
+    def end_session(self, now: float) -> Optional[dict]:
+        """Close the current session and return (and log) its report."""
+        session, self._session = self._session, None
+        if session is None:
+            return None
+        _close_tier(session, now)
+        seconds = now - session["started"]
+        report = {
+            "station": session["station"],
+            "seconds": seconds,
+            "bitrate": _effective_bitrate(session["tiers"]),
+            "throughput": session["bytes"] * 8 / seconds if seconds > 0 else None,
+            "step_downs": session["step_downs"],
+            "tiers": dict(session["tiers"]),
+        }
+        self.sessions.append(report)
+        logging.info(
+            f"📶 Played {report['station']} for {seconds:.0f}s at "
+            f"{_kbps(report['bitrate'])} effective, {_kbps(report['throughput'])} delivered, "
+            f"{report['step_downs']} step-downs"
+        )
+        return report
+
+    def _playing_session(self, url: str) -> Optional[dict]:
+        if self._session is not None and self._session["station"] == url:
+            return self._session
+        return None
+
+    def _playing_tier(self, url: str) -> int:
+        session = self._playing_session(url)
+        return session["tier"] if session is not None else self._tier.get(url, 0)
+
+    def _restart_measurement(self, now: float) -> None:
+        self._samples.clear()
+        self._last_read_bytes = None
+        self._healthy_since = now
+
+
+def _close_tier(session: dict, now: float) -> None:
+    """Add the time since the session's last tier change to its current tier."""
+    tiers = session["tiers"]
+    tiers[session["bitrate"]] = tiers.get(session["bitrate"], 0.0) + now - session["tier_since"]
+    session["tier_since"] = now
+
+
+def _effective_bitrate(tiers: dict) -> Optional[float]:
+    """Time-weighted bitrate of {bitrate: seconds}, ignoring tiers of unknown bitrate."""
+    known = {bitrate: seconds for bitrate, seconds in tiers.items() if bitrate is not None}
+    total = sum(known.values())
+    if total <= 0:
+        return None
+    return sum(bitrate * seconds for bitrate, seconds in known.items()) / total
+
+
+def _kbps(bps: Optional[float]) -> str:
+    return f"{bps / 1000:.0f} kbps" if bps is not None else "? kbps"
@@ -3,8 +3,15 @@ import logging
 import logging.handlers
 
 from radioglobe.hal.factory import build_hardware
+from radioglobe.hal.pcm_tap import PcmTap
+from radioglobe.input_log import InputRecorder
 from radioglobe.main import App
-from radioglobe.radio_config import LOG_LEVEL
+from radioglobe.net.dns import DnsCache
+from radioglobe.net.playlist import PlaylistResolver
+from radioglobe.net.probe import StationProber
+from radioglobe.net.relay import StreamRelay
+from radioglobe.net.scheduler import NetScheduler
+from radioglobe.radio_config import DEAD_AIR_ENABLED, INPUT_LOG_PATH, LOG_LEVEL, RELAY_ENABLED
 
 
 def main() -> None:
@@ -28,7 +35,22 @@ def main() -> None:
 
     logging.info("Starting RadioGlobe...")
 
-    asyncio.run(App(*build_hardware()).run())
+    # One scheduler and DNS cache shared by every network helper.
+    scheduler = NetScheduler()
+    dns = DnsCache(scheduler=scheduler)
+    recorder = InputRecorder(INPUT_LOG_PATH) if INPUT_LOG_PATH else None
+    asyncio.run(
+        App(
+            *build_hardware(recorder),
+            resolver=PlaylistResolver(dns=dns, scheduler=scheduler),
+            prober=StationProber(dns=dns, scheduler=scheduler),
+            relay=StreamRelay(dns=dns, scheduler=scheduler) if RELAY_ENABLED else None,
+            pcm_tap=PcmTap() if DEAD_AIR_ENABLED else None,
+            dns=dns,
+            scheduler=scheduler,
+            recorder=recorder,
+        ).run()
+    )
 
 
 if __name__ == "__main__":
@@ -9,3 +9,9 @@ STATUS_CALIBRATING = "Calibrating"
 STATUS_CALIBRATED = "CALIBRATED"
 STATUS_CALIBRATE = "CALIBRATE"
 STATUS_SHUTDOWN = "Shutdown"
+
+# Audio player event kinds (AudioEvent.kind, see hal/protocols.py)
+AUDIO_PLAYING = "playing"
+AUDIO_BUFFERING = "buffering"
+AUDIO_ERROR = "error"
+AUDIO_ENDED = "ended"
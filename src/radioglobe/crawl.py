@@ -0,0 +1,262 @@
+"""radioglobe-crawl: check every station in a stations.json and report its health.
+
+Each distinct station URL is requested once, by a bounded pool of workers on
+one pooled aiohttp session. Playlists and redirects are followed to the
+stream itself (as PlaylistResolver would), and each station gets a line in a
+JSONL report:
+
+    {"city", "name", "url", "ok", "status", "final_url", "content_type",
+     "codec", "hints", "playlist", "hls", "latency_ms", "first_byte_ms", "error"}
+
+latency_ms is the time to the stream's response headers (including any
+playlist hops), first_byte_ms the time to its first audio byte. codec and
+hints come from the Content-Type via hints_for_content_type().
+
+--prune drops the stations that failed (and cities left with none), and
+--reorder puts each city's answering stations fastest-first, with
+rank_stations()'s ordering; either writes a new stations file to --output.
+
+usage: radioglobe-crawl STATIONS.json [--report health.jsonl]
+           [--output OUT.json --prune --reorder] [--concurrency 64] [--timeout 10]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Optional
+
+import aiohttp
+
+from .net.playlist import (
+    MAX_PLAYLIST_BYTES,
+    MAX_PLAYLIST_DEPTH,
+    decode_playlist,
+    is_hls,
+    looks_like_playlist,
+    parse_playlist,
+)
+from .net.probe import ProbeResult, is_icy_status_error, rank_stations
+from .station_history import hints_for_content_type
+
+CRAWL_CONCURRENCY = 64   # stations checked at once
+CRAWL_PER_HOST = 4       # connections to any one streaming host at once
+CRAWL_TIMEOUT = 10       # seconds per station, playlist hops included
+_PROGRESS_EVERY = 500    # stations between progress log lines
+_NETWORK_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError)
+
+
+def iter_stations(stations: dict):
+    """(city, name, url) for every station in a stations.json dict, in file order."""
+    for city, info in stations.items():
+        for entry in info.get("urls", []):
+            yield city, entry["name"], entry["url"]
+
+
+def _new_record(url: str) -> dict:
+    return {
+        "url": url, "ok": False, "status": None, "final_url": None, "content_type": None,
+        "codec": None, "hints": None, "playlist": False, "hls": False,
+        "latency_ms": None, "first_byte_ms": None, "error": None,
+    }
+
+
+def _ms_since(started: float) -> float:
+    return round((time.monotonic() - started) * 1000, 1)
+
+
+async def check_station(session: aiohttp.ClientSession, url: str) -> dict:
+    """Follow url to its stream and read the first byte; never raises for network errors."""
+    record = _new_record(url)
+    started = time.monotonic()
+    try:
+        await _follow(session, url, record, started, 0)
+    except _NETWORK_ERRORS as e:
+        record["error"] = repr(e)
+    return record
+
+
+async def _follow(
+    session: aiohttp.ClientSession, url: str, record: dict, started: float, depth: int
+) -> None:
+    if depth >= MAX_PLAYLIST_DEPTH:
+        record["error"] = "playlists nested too deep"
+        return
+    try:
+        async with session.get(url, allow_redirects=True) as response:
+            record["status"] = response.status
+            record["latency_ms"] = _ms_since(started)
+            response.raise_for_status()
+            final_url = str(response.url)
+            content_type = response.content_type.lower()
+            if not looks_like_playlist(final_url, content_type):
+                await response.content.readany()
+                _stream_found(record, final_url, content_type, started)
+                return
+            body = await response.content.read(MAX_PLAYLIST_BYTES)
+    except aiohttp.ClientResponseError as e:
+        if not is_icy_status_error(e):
+            raise
+        # A SHOUTcast v1 server answering "ICY 200 OK" is streaming.
+        record["status"] = "ICY"
+        _stream_found(record, url, "", started)
+        return
+
+    record["playlist"] = True
+    text = decode_playlist(body, response.charset)
+    if is_hls(text):
+        record["hls"] = True
+        _stream_found(record, final_url, content_type, started)
+        return
+    entries = parse_playlist(text, final_url)
+    if not entries:
+        record["error"] = "empty playlist"
+        return
+    for entry in entries:
+        try:
+            await _follow(session, entry, record, started, depth + 1)
+        except _NETWORK_ERRORS as e:
+            record["error"] = repr(e)
+            continue
+        if record["ok"]:
+            return
+
+
+def _stream_found(record: dict, final_url: str, content_type: str, started: float) -> None:
+    record["first_byte_ms"] = _ms_since(started)
+    record["final_url"] = final_url
+    record["content_type"] = content_type or None
+    if content_type == "text/html":
+        # A 200 error page, not a stream.
+        record["error"] = "not a stream: text/html"
+        return
+    hints = hints_for_content_type(final_url, content_type) if content_type else None
+    record.update(ok=True, error=None, hints=hints, codec=hints["codec"] if hints else None)
+
+
+async def crawl(
+    stations: dict,
+    report=None,
+    concurrency: int = CRAWL_CONCURRENCY,
+    timeout: float = CRAWL_TIMEOUT,
+) -> dict:
+    """Check every distinct station URL; returns {url: record}.
+
+    Writes one JSONL line per station to report (a text file) as soon as
+    its URL has been checked.
+    """
+    by_url: dict = {}
+    for city, name, url in iter_stations(stations):
+        by_url.setdefault(url, []).append((city, name))
+    pending = iter(by_url)
+    results: dict = {}
+    started = time.monotonic()
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        # One shared iterator: each URL is taken by exactly one worker.
+        for url in pending:
+            record = await check_station(session, url)
+            results[url] = record
+            if report is not None:
+                for city, name in by_url[url]:
+                    report.write(json.dumps({"city": city, "name": name, **record}) + "\n")
+            if len(results) % _PROGRESS_EVERY == 0:
+                elapsed = time.monotonic() - started
+                logging.info(f"Checked {len(results)}/{len(by_url)} URLs in {elapsed:.0f}s")
+
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        connector=aiohttp.TCPConnector(limit=concurrency, limit_per_host=CRAWL_PER_HOST),
+        headers={"User-Agent": "radioglobe-crawl"},
+    ) as session:
+        await asyncio.gather(*(worker(session) for _ in range(min(concurrency, len(by_url)))))
+    return results
+
+
+def prune_stations(stations: dict, results: dict) -> dict:
+    """stations without the ones whose check failed, dropping cities left empty.
+    Stations with no result are kept."""
+    pruned = {}
+    for city, info in stations.items():
+        urls = [
+            entry for entry in info.get("urls", [])
+            if results.get(entry["url"], {}).get("ok", True)
+        ]
+        if urls:
+            pruned[city] = {**info, "urls": urls}
+    return pruned
+
+
+def reorder_stations(stations: dict, results: dict) -> dict:
+    """stations with each city's stations in rank_stations() order:
+    answering ones fastest-first, unchecked ones next, failed ones last."""
+    probes = {
+        url: ProbeResult(
+            url, record["ok"], None,
+            record["first_byte_ms"] / 1000 if record["first_byte_ms"] is not None else None,
+            record["error"], record["content_type"],
+        )
+        for url, record in results.items()
+    }
+    reordered = {}
+    for city, info in stations.items():
+        entries = info.get("urls", [])
+        indexed = [(index, entry["url"]) for index, entry in enumerate(entries)]
+        ranked = rank_stations(indexed, probes)
+        reordered[city] = {**info, "urls": [entries[index] for index, _ in ranked]}
+    return reordered
+
+
+def summarise(results: dict, seconds: float) -> str:
+    ok = sum(record["ok"] for record in results.values())
+    return (
+        f"Checked {len(results)} station URLs in {seconds:.0f}s: "
+        f"{ok} answered, {len(results) - ok} failed"
+    )
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="radioglobe-crawl", description="Check every station in a stations.json."
+    )
+    parser.add_argument("stations", help="stations.json to check")
+    parser.add_argument("--report", help="JSONL health report to write (default: stdout)")
+    parser.add_argument("--output", help="stations file to write with --prune/--reorder applied")
+    parser.add_argument("--prune", action="store_true", help="drop stations that failed")
+    parser.add_argument(
+        "--reorder", action="store_true", help="order each city's stations fastest-first"
+    )
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=CRAWL_TIMEOUT, help="seconds per station")
+    args = parser.parse_args(argv)
+    if (args.prune or args.reorder) != bool(args.output):
+        parser.error("--output needs --prune and/or --reorder, and they need --output")
+
+    logging.basicConfig(format="%(asctime)s %(levelname)s: %(message)s", datefmt="%H:%M:%S",
+                        level=logging.INFO, stream=sys.stderr)
+    with open(args.stations, "r", encoding="utf8") as f:
+        stations = json.load(f)
+
+    started = time.monotonic()
+    report = open(args.report, "w") if args.report else sys.stdout
+    try:
+        results = asyncio.run(crawl(stations, report, args.concurrency, args.timeout))
+    finally:
+        if report is not sys.stdout:
+            report.close()
+    logging.info(summarise(results, time.monotonic() - started))
+
+    if args.output:
+        if args.prune:
+            stations = prune_stations(stations, results)
+        if args.reorder:
+            stations = reorder_stations(stations, results)
+        with open(args.output, "w", encoding="utf8") as f:
+            json.dump(stations, f, indent=2, ensure_ascii=False)
+        logging.info(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -115,6 +115,36 @@ def get_stations_by_city(stations: dict, city_country: str) -> list:
     ]
 
 
+def get_bitrate_ladders(stations: dict) -> dict:
+    """Return {station url: [(bitrate, url), ...], highest bitrate first} for
+    every station that lists bitrate variants, eg:
+    {"url": "http://a/hi", "bitrate": 320000,
+     "variants": [{"url": "http://a/lo", "bitrate": 96000}]}
+
+    The station's own url is one of the tiers; without a "bitrate" of its
+    own (None in the ladder) it's taken to be the highest."""
+    ladders = {}
+    for station_info in stations.values():
+        for entry in station_info.get("urls", []):
+            url, variants = entry.get("url"), entry.get("variants")
+            if not isinstance(url, str) or not isinstance(variants, list):
+                continue
+            tiers = [
+                (variant["bitrate"], variant["url"])
+                for variant in variants
+                if isinstance(variant.get("url"), str)
+                and isinstance(variant.get("bitrate"), int)
+                and variant["url"] != url
+            ]
+            if not tiers:
+                continue
+            own_bitrate = entry.get("bitrate") if isinstance(entry.get("bitrate"), int) else None
+            tiers.append((own_bitrate, url))
+            tiers.sort(key=lambda tier: -tier[0] if tier[0] is not None else float("-inf"))
+            ladders[url] = tiers
+    return ladders
+
+
 def get_coords_by_city(stations: dict, city: str) -> Coordinate:
     """Return a Coordinate for the given city string.
 
@@ -0,0 +1,114 @@
+"""Dead-air detection on the PCM the radio is actually playing.
+
+Some stations keep VLC happily in Playing while sending silence, a bare
+carrier tone or hiss, so neither is_error() nor the stall watchdog (whose
+demux bytes keep arriving) ever trips. DeadAirDetector is fed blocks of
+16-bit mono PCM from hal/pcm_tap.py and classifies each one with two cheap
+measures, computed for all of a block's windows at once with NumPy:
+
+- RMS level (dBFS): below DEAD_AIR_SILENCE_DBFS, offset by the player's
+  volume, is silence. The tap hears the output after the volume control,
+  so a quiet setting would otherwise make quiet programme look silent.
+- Spectral flatness (geometric / arithmetic mean of the power spectrum):
+  near 0 is a single tone, near 0.56 is white noise; speech and music sit
+  well in between.
+
+Only a block whose every window agrees counts, and only the same verdict
+held for DEAD_AIR_HOLD seconds makes the stream dead - a pause in a talk
+show or a sustained note is not dead air.
+
+Needs numpy (`pip install .[deadair]`); App only imports this module when
+a PCM tap is configured.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from .radio_config import (
+    DEAD_AIR_HOLD,
+    DEAD_AIR_NOISE_FLATNESS,
+    DEAD_AIR_SILENCE_DBFS,
+    DEAD_AIR_TONE_FLATNESS,
+    DEAD_AIR_WINDOW,
+)
+
+DEAD_AIR_SILENCE = "silence"
+DEAD_AIR_TONE = "tone"
+DEAD_AIR_NOISE = "noise"
+
+# Keeps log() finite on digital silence.
+_EPSILON = 1e-12
+
+
+def volume_gain_db(volume: int) -> float:
+    """Gain (dB) a player volume of 0-100 applies to what the tap hears.
+
+    VLC's PulseAudio output (and mpv) hand the percentage to PulseAudio as
+    a cubic volume, so 50 is -18 dB, not -6.
+    """
+    if volume <= 0:
+        return -math.inf
+    return 60 * math.log10(volume / 100)
+
+
+def analyse(pcm: bytes, window: int = DEAD_AIR_WINDOW) -> tuple:
+    """(rms_dbfs, flatness) arrays, one entry per whole window of s16le mono pcm."""
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+    count = len(samples) // window
+    frames = samples[: count * window].reshape(count, window)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    rms_dbfs = 20 * np.log10(np.maximum(rms, _EPSILON))
+    power = np.abs(np.fft.rfft(frames * np.hanning(window), axis=1)) ** 2 + _EPSILON
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return rms_dbfs, flatness
+
+
+def classify(
+    rms_dbfs,
+    flatness,
+    silence_dbfs: float = DEAD_AIR_SILENCE_DBFS,
+    tone_flatness: float = DEAD_AIR_TONE_FLATNESS,
+    noise_flatness: float = DEAD_AIR_NOISE_FLATNESS,
+) -> Optional[str]:
+    """The dead-air kind every window agrees on, or None if any window sounds live."""
+    if len(rms_dbfs) == 0:
+        return None
+    if np.all(rms_dbfs < silence_dbfs):
+        return DEAD_AIR_SILENCE
+    if np.all(flatness < tone_flatness):
+        return DEAD_AIR_TONE
+    if np.all(flatness > noise_flatness):
+        return DEAD_AIR_NOISE
+    return None
+
+
+class DeadAirDetector:
+    """Track how long the tapped audio has been dead air of one kind."""
+
+    def __init__(self, hold: float = DEAD_AIR_HOLD, window: int = DEAD_AIR_WINDOW) -> None:
+        self.hold = hold
+        self.window = window
+        self._kind: Optional[str] = None
+        self._since: Optional[float] = None
+
+    def reset(self) -> None:
+        """Forget the current verdict, e.g. after the stream changed."""
+        self._kind = None
+        self._since = None
+
+    def feed(self, pcm: bytes, now: float, volume: int = 100) -> None:
+        """Classify one block of s16le mono PCM that arrived at `now`, played
+        at player volume `volume`."""
+        silence_dbfs = DEAD_AIR_SILENCE_DBFS + volume_gain_db(volume)
+        kind = classify(*analyse(pcm, self.window), silence_dbfs=silence_dbfs)
+        if kind != self._kind:
+            self._kind = kind
+            self._since = now if kind is not None else None
+
+    def dead(self, now: float) -> Optional[str]:
+        """The kind of dead air held for at least `hold` seconds, else None."""
+        if self._since is not None and now - self._since >= self.hold:
+            return self._kind
+        return None
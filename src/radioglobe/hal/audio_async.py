@@ -1,34 +1,281 @@
+import asyncio
+import time
 import vlc
 import logging
+from typing import Optional
+
+from ..constants import AUDIO_BUFFERING, AUDIO_ENDED, AUDIO_ERROR, AUDIO_PLAYING
+from ..radio_config import MEDIA_POOL_SIZE, VLC_FAST_STARTUP
+from ..station_history import StationHistory, hints_for_codec, media_options
+from .media_pool import MediaPool
+from .protocols import AudioEvent
+
+# libvlc event -> AudioEvent.kind bridged onto the asyncio loop
+_VLC_EVENTS = {
+    vlc.EventType.MediaPlayerPlaying: AUDIO_PLAYING,
+    vlc.EventType.MediaPlayerBuffering: AUDIO_BUFFERING,
+    vlc.EventType.MediaPlayerEncounteredError: AUDIO_ERROR,
+    vlc.EventType.MediaPlayerEndReached: AUDIO_ENDED,
+}
+
+_VLC_BASE_ARGS = (
+    "--input-repeat=-1",
+    "--network-caching=2000",  # default only: each media sets its own, see _new_media()
+)
+
+# Fast startup profile: an audio-only radio needs none of VLC's video,
+# subtitle or interface subsystems, and an explicit module priority list
+# for each stage means the first play tries the right module first instead
+# of scoring every loaded plugin. Each list ends in "any", so a stream
+# outside it still falls back to auto-detection. Relies on install.sh
+# having pre-generated the plugin cache (vlc-cache-gen).
+_VLC_FAST_STARTUP_ARGS = (
+    "--intf=dummy",
+    "--no-video",
+    "--no-spu",
+    "--no-osd",
+    "--no-lua",
+    "--no-media-library",
+    "--no-interact",
+    "--access=http,https,any",
+    "--demux=es,adaptive,ogg,playlist,any",
+    "--codec=mpg123,avcodec,vorbis,opus,flac,any",
+    "--aout=pulse,alsa,any",
+)
+
+# Buffering fires once per percent filled, so an unconsumed queue is capped
+# and drops its oldest events rather than growing for the process lifetime.
+_EVENT_QUEUE_SIZE = 256
 
 
 class AudioPlayer:
-    def __init__(self) -> None:
+    def __init__(
+        self, history: Optional[StationHistory] = None, fast_startup: bool = VLC_FAST_STARTUP
+    ) -> None:
         self.instance = None
+        self.fast_startup = fast_startup
+        self.init_time: Optional[float] = None          # seconds vlc.Instance() took
+        self.first_audio_time: Optional[float] = None   # seconds from start() to first Playing
         self.player = None
         self.current_url = None
+        self.events: asyncio.Queue = asyncio.Queue(maxsize=_EVENT_QUEUE_SIZE)
+        self._loop = None
+        self._started_at = 0.0
+        # Runs call(*args) on the thread that owns the players: directly until
+        # AudioWorker wraps this player and points it at the worker thread.
+        self.dispatch = _call
+        # url -> muted MediaPlayer already connected to that stream, see prefetch()
+        self._standby: dict = {}
+        # id(MediaPlayer) -> url it's playing, read from libvlc's event thread
+        self._player_urls: dict = {}
+        # Per-station start-up/rebuffer/failure history that sizes each media's buffer
+        self.history = history if history is not None else StationHistory()
+        # stream url -> the station it was opened for, the history's key
+        self._stations: dict = {}
+        self._play_started: dict = {}   # url -> monotonic time play() opened it
+        self._play_hinted: dict = {}    # url -> whether it was opened with demux/codec hints
+        self._playing: set = set()      # urls that have reached Playing
+        self._rebuffering: set = set()  # playing urls whose buffer has run dry
+        # Media reused across plays of the same URL instead of one leaked per play
+        self.media_pool = MediaPool(self._create_media, MEDIA_POOL_SIZE)
 
     def start(self) -> None:
         """Create the VLC instance and player."""
-        self.instance = vlc.Instance(
-            "--input-repeat=-1",
-            "--network-caching=2000",  # 2 s network buffer absorbs stream jitter
-        )
+        self._loop = asyncio.get_running_loop()
+        self.history.load()
+        args = _VLC_BASE_ARGS + (_VLC_FAST_STARTUP_ARGS if self.fast_startup else ())
+        self._started_at = time.monotonic()
+        self.instance = vlc.Instance(*args)
         if self.instance is None:
             raise RuntimeError("VLC failed to initialise — check VLC installation and options")
-        self.player = self.instance.media_player_new()
+        self.player = self._new_player()
+        self.init_time = time.monotonic() - self._started_at
+        profile = "fast" if self.fast_startup else "full"
+        logging.info(f"🎛️ VLC initialised in {self.init_time * 1000:.0f} ms ({profile} profile)")
+
+    def _new_player(self):
+        """Create a MediaPlayer whose state changes are bridged onto self.events."""
+        player = self.instance.media_player_new()
+        event_manager = player.event_manager()
+        for event_type, kind in _VLC_EVENTS.items():
+            event_manager.event_attach(event_type, self._on_vlc_event, id(player), kind)
+        return player
+
+    def _on_vlc_event(self, event, player_id: int, kind: str) -> None:
+        """Runs on libvlc's event thread: must not call back into libvlc."""
+        value = event.u.new_cache if kind == AUDIO_BUFFERING else None
+        audio_event = AudioEvent(kind, self._player_urls.get(player_id), value)
+        try:
+            self._loop.call_soon_threadsafe(self._post_event, audio_event)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _post_event(self, audio_event: AudioEvent) -> None:
+        # _observe() calls into libvlc and writes history, so it runs with the
+        # commands that swap and release players, not here on the loop.
+        self.dispatch(self._observe, audio_event)
+        if self.events.full():
+            self.events.get_nowait()
+        self.events.put_nowait(audio_event)
+
+    def _observe(self, audio_event: AudioEvent) -> None:
+        """Feed an event into self.history; runs via self.dispatch."""
+        kind, url, value = audio_event
+        if url is None:
+            return
+        # None for a url since dropped by play()/prefetch(): a late event
+        # about a stream no longer wanted, which says nothing of its station.
+        station = self._stations.get(url)
+        if kind == AUDIO_PLAYING:
+            standby = self._standby.get(url)
+            if standby is not None:
+                # libvlc ignores mute until the player has an audio output,
+                # which only exists once playback starts: silence it again now.
+                standby.audio_set_mute(True)
+                standby.audio_set_volume(0)
+            if self.first_audio_time is None:
+                self.first_audio_time = time.monotonic() - self._started_at
+                logging.info(f"🎛️ First audio {self.first_audio_time * 1000:.0f} ms after VLC start")
+            started = self._play_started.pop(url, None)
+            hinted = self._play_hinted.pop(url, False)
+            if started is not None and station is not None:
+                self.history.record_startup(station, time.monotonic() - started, hinted)
+                gain = self.history.hint_gain(station)
+                if gain is not None:
+                    logging.debug(f"⏱️ Hints save {gain * 1000:.0f} ms to Playing: {url}")
+            if not hinted and station is not None:
+                self._learn_hints(url, station)
+            self._playing.add(url)
+            self._rebuffering.discard(url)
+        elif kind == AUDIO_BUFFERING and url in self._playing:
+            # Buffering fires per percent; count each dry spell once.
+            if value is not None and value < 100 and url not in self._rebuffering:
+                self._rebuffering.add(url)
+                if station is not None:
+                    self.history.record_buffering(station)
+            elif value is not None and value >= 100:
+                self._rebuffering.discard(url)
+        elif kind in (AUDIO_ERROR, AUDIO_ENDED):
+            hinted = self._play_hinted.pop(url, False)
+            if station is not None:
+                self.history.record_stall(station)
+                if hinted:
+                    # Failed before Playing with hints: relearn them from scratch.
+                    self.history.record_hints(station, None)
+            self._playing.discard(url)
+
+    def _learn_hints(self, url: str, station: str) -> None:
+        """Record url's demux/codec, under station, from the audio track VLC just opened."""
+        player = self.player if url == self.current_url else self._standby.get(url)
+        media = player.get_media() if player is not None else None
+        if media is None:
+            return
+        for track in media.tracks_get() or ():
+            if track.type == vlc.TrackType.audio:
+                fourcc = track.codec.to_bytes(4, "little").decode("ascii", errors="replace")
+                hints = hints_for_codec(url, fourcc)
+                if hints is not None:
+                    self.history.record_hints(station, hints)
+                return
+
+    def _new_media(self, url: str):
+        """A Media for url with a :network-caching sized from its history, and
+        its learned demux/codec hints so VLC can skip probing."""
+        station = self._stations.get(url, url)
+        caching = self.history.network_caching(station, url)   # before this play counts
+        hints = media_options(self.history.hints(station))
+        self.history.record_play(station)
+        self._play_started[url] = time.monotonic()
+        self._play_hinted[url] = bool(hints)
+        self._playing.discard(url)
+        self._rebuffering.discard(url)
+        logging.debug(f"🛜 network-caching={caching} ms {' '.join(hints)} for {url}")
+        return self.media_pool.get(url, (f":network-caching={caching}", *hints))
+
+    def _create_media(self, url: str, *options):
+        return self.instance.media_new(url, *options)
+
+    def play(self, url: str, station: Optional[str] = None) -> None:
+        """Play a new URL stream, stopping current playback if needed.
+
+        station is the stations.json URL url was derived from (through the
+        relay or a resolved playlist); history is kept under it, so it
+        survives a new relay port or a fresh stream token. It defaults to url.
+
+        If a standby player is already buffering url (see prefetch()), it is
+        swapped in and unmuted instead of opening a fresh connection, and the
+        outgoing player is muted and kept as the standby for its own URL.
+        """
+        self._stations[url] = station or url
+        standby = self._standby.pop(url, None)
+        if standby is not None:
+            outgoing = self.player
+            standby.audio_set_volume(outgoing.audio_get_volume())
+            standby.audio_set_mute(False)
+            self.player = standby
+            if self.current_url is not None and outgoing.is_playing():
+                outgoing.audio_set_mute(True)
+                self._standby[self.current_url] = outgoing
+            else:
+                self._release(outgoing)
+            self.current_url = url
+            self._forget_stations()
+            logging.debug(f"🔊 Playing (pre-buffered): {url}")
+            return
 
-    def play(self, url: str) -> None:
-        """Play a new URL stream, stopping current playback if needed."""
         if self.player.is_playing():
             self.player.stop()
 
         self.current_url = url
-        media = self.instance.media_new(self.current_url)
+        self._forget_stations()
+        self._player_urls[id(self.player)] = url
+        media = self._new_media(self.current_url)
         self.player.set_media(media)
         self.player.play()
         logging.debug(f"🔊 Playing: {url}")
 
+    def prefetch(self, urls: list, stations: Optional[list] = None) -> None:
+        """Keep one muted standby player buffering each of urls.
+
+        stations, if given, lines up with urls as play()'s station does.
+
+        Each standby is muted and set to volume 0 once it reaches Playing;
+        play() restores the volume when it swaps one in.
+
+        Standbys for URLs no longer in urls are stopped and released, so the
+        caller's list is also the connection budget. The current URL is
+        never pre-buffered twice.
+        """
+        for url, station in zip(urls, stations or urls):
+            self._stations.setdefault(url, station or url)
+        wanted = [url for url in urls if url != self.current_url]
+        for url in list(self._standby):
+            if url not in wanted:
+                self._release(self._standby.pop(url))
+        for url in wanted:
+            if url in self._standby:
+                continue
+            standby = self._new_player()
+            self._player_urls[id(standby)] = url
+            # A best effort only: see _observe(), which mutes it for real on Playing.
+            standby.audio_set_mute(True)
+            standby.set_media(self._new_media(url))
+            standby.play()
+            self._standby[url] = standby
+            logging.debug(f"⏳ Pre-buffering: {url}")
+        self._forget_stations()
+
+    def _forget_stations(self) -> None:
+        """Drop station keys for urls no longer playing or on standby."""
+        for url in list(self._stations):
+            if url != self.current_url and url not in self._standby:
+                del self._stations[url]
+
+    def _release(self, player) -> None:
+        self._player_urls.pop(id(player), None)
+        player.stop()
+        player.release()
+
     def change_volume(self, delta: int, min_volume: int = 10, max_volume: int = 100) -> int:
         """Adjust volume by delta, clamped between min and max."""
         current_volume = self.player.audio_get_volume()
@@ -56,7 +303,36 @@ class AudioPlayer:
         state = self.player.get_state()
         return state not in (vlc.State.Playing, vlc.State.Paused)
 
+    def progress(self) -> Optional[dict]:
+        """libvlc's input stats for the current stream, or None if it has none yet.
+
+        demux_read_bytes only grows while audio is actually arriving, so a
+        caller sampling it can spot a stall VLC itself never reports.
+        """
+        media = self.player.get_media()
+        if media is None:
+            return None
+        stats = vlc.MediaStats()
+        if not media.get_stats(stats):
+            return None
+        return {
+            "read_bytes": stats.read_bytes,
+            "input_bitrate": stats.input_bitrate,
+            "demux_read_bytes": stats.demux_read_bytes,
+            "demux_corrupted": stats.demux_corrupted,
+            "lost_abuffers": stats.lost_abuffers,
+        }
+
     async def stop(self) -> None:
-        """Stop playback if something is playing."""
+        """Stop playback if something is playing, release any standbys, and
+        save the station history."""
+        for url in list(self._standby):
+            self._release(self._standby.pop(url))
         if self.player.is_playing():
             self.player.stop()
+        self.media_pool.clear()
+        self.history.save()
+
+
+def _call(call, *args) -> None:
+    call(*args)
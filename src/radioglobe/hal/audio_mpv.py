@@ -0,0 +1,315 @@
+"""Lightweight audio backend: one long-lived mpv process driven over JSON IPC.
+
+python-vlc loads libvlc and its plugins into the app process, which makes
+it by far the largest part of the app's RSS, thread count and start time.
+MpvAudioPlayer implements AudioPlayerProtocol by driving a single
+`mpv --idle` process through its JSON IPC socket instead:
+
+- The process is started once and reused: play() is a `loadfile ...
+  replace`, so switching stations costs no decoder start-up. If mpv dies
+  the current stream gets an AUDIO_ERROR and the next play() restarts it.
+- mpv's events come back on a reader thread and are bridged onto the
+  asyncio loop the same way AudioPlayer bridges libvlc's: start-file/
+  playback-restart/end-file and the paused-for-cache property become
+  AUDIO_PLAYING, AUDIO_BUFFERING, AUDIO_ERROR and AUDIO_ENDED.
+- progress() integrates mpv's demuxer-cache-state raw-input-rate into a
+  byte counter, so the stall watchdog and bitrate tiers work unchanged.
+  Only the updates mpv actually sent count: nothing is extrapolated past
+  the last one, so a stall that silences them stops the counter.
+
+What it trades away: prefetch() buffers nothing (a muted standby would
+mean a second mpv process), and per-stream buffer sizes and demux hints
+from StationHistory are VLC media options with no mpv equivalent here.
+
+Only needs the mpv binary; selected with RADIOGLOBE_AUDIO_BACKEND=mpv
+(hal/factory.py).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Optional, Sequence
+
+from ..constants import AUDIO_BUFFERING, AUDIO_ENDED, AUDIO_ERROR, AUDIO_PLAYING
+from .protocols import AudioEvent
+
+_MPV_ARGS = (
+    "--idle=yes",
+    "--no-config",
+    "--no-terminal",
+    "--no-video",
+    "--audio-display=no",
+    "--ao=pulse,alsa,",
+    "--cache=yes",
+    "--network-timeout=10",
+)
+
+# mpv property -> observe_property id
+_OBSERVED = {"paused-for-cache": 1, "cache-buffering-state": 2, "demuxer-cache-state": 3}
+
+_CONNECT_TIMEOUT = 5.0   # seconds for mpv to create its IPC socket
+_STOP_TIMEOUT = 2.0      # seconds mpv gets to quit before it's killed
+_RATE_SPAN = 1.0         # seconds mpv averages raw-input-rate over
+# Same cap as AudioPlayer's: buffering updates are frequent.
+_EVENT_QUEUE_SIZE = 256
+
+
+class MpvAudioPlayer:
+    def __init__(self, command: Sequence[str] = ("mpv",)) -> None:
+        self.command = tuple(command)
+        self.current_url: Optional[str] = None
+        self.events: asyncio.Queue = asyncio.Queue(maxsize=_EVENT_QUEUE_SIZE)
+        self.init_time: Optional[float] = None          # seconds until the IPC socket answered
+        self.first_audio_time: Optional[float] = None   # seconds from start() to first Playing
+        self.restarts = 0
+        self._stopping = False
+        self._volume = 100
+        self._loop = None
+        self._started_at = 0.0
+        self._dir: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        # Guards the fields below, shared by the worker and reader threads.
+        self._lock = threading.Lock()
+        self._pending: deque = deque()   # urls loadfile'd but not yet started
+        self._entries: dict = {}          # mpv playlist_entry_id -> url
+        self._active: Optional[str] = None
+        self._state = "idle"              # idle/opening/playing/buffering/error/ended
+        self._cache_percent: Optional[float] = None
+        self._read_bytes: Optional[float] = None
+        self._input_rate = 0.0
+        self._rate_at = 0.0
+
+    def start(self) -> None:
+        """Start the mpv process and connect to its IPC socket."""
+        self._loop = asyncio.get_running_loop()
+        self._dir = tempfile.mkdtemp(prefix="radioglobe-mpv-")
+        self._started_at = time.monotonic()
+        self._spawn()
+        self.init_time = time.monotonic() - self._started_at
+        logging.info(f"🎛️ mpv started in {self.init_time * 1000:.0f} ms")
+
+    def _spawn(self) -> None:
+        path = os.path.join(self._dir, "ipc.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+        self._process = subprocess.Popen(
+            [*self.command, f"--input-ipc-server={path}", *_MPV_ARGS],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + _CONNECT_TIMEOUT
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self._process.kill()
+                    raise RuntimeError("mpv failed to start — check the mpv installation")
+                time.sleep(0.01)
+        self._sock = sock
+        reader = threading.Thread(
+            target=self._read_events, args=(sock,), name="mpv-events", daemon=True
+        )
+        reader.start()
+        for name, observe_id in _OBSERVED.items():
+            self._send("observe_property", observe_id, name)
+        self._send("set_property", "volume", self._volume)
+
+    def _alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None and self._sock is not None
+
+    def _send(self, *command) -> None:
+        line = json.dumps({"command": list(command)}) + "\n"
+        with self._send_lock:
+            self._sock.sendall(line.encode())
+
+    def _command(self, *command) -> None:
+        """Send a command, restarting mpv first if it has died."""
+        if not self._alive():
+            self.restarts += 1
+            logging.warning("mpv is not running, restarting it")
+            self._spawn()
+        try:
+            self._send(*command)
+        except OSError:
+            self.restarts += 1
+            logging.warning("mpv IPC failed, restarting mpv")
+            self._spawn()
+            self._send(*command)
+
+    # ------------------------------------------------------------------
+    # mpv -> asyncio bridge (reader thread)
+    # ------------------------------------------------------------------
+
+    def _read_events(self, sock: socket.socket) -> None:
+        """Runs on the mpv-events thread until mpv closes the socket."""
+        with sock.makefile("rb") as lines:
+            try:
+                for line in lines:
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "event" in message:
+                        self._handle(message)
+            except OSError:
+                pass
+        if sock is not self._sock or self._stopping:
+            return  # replaced by a restart, or quit on purpose
+        self._sock = None
+        with self._lock:
+            # Whatever mpv was about to start died with it.
+            self._pending.clear()
+            self._entries.clear()
+            url = self.current_url
+            self._state = "error"
+        if url is not None:
+            self._post(AudioEvent(AUDIO_ERROR, url))
+
+    def _handle(self, message: dict) -> None:
+        event = message["event"]
+        with self._lock:
+            if event == "start-file":
+                url = self._pending.popleft() if self._pending else None
+                self._entries[message.get("playlist_entry_id")] = url
+                self._active = url
+                self._read_bytes = None
+                self._cache_percent = None
+                return
+            if event == "playback-restart":
+                self._set_state(self._active, "playing")
+                self._post(AudioEvent(AUDIO_PLAYING, self._active))
+                return
+            if event == "end-file":
+                url = self._entries.pop(message.get("playlist_entry_id"), self._active)
+                kind = {"error": AUDIO_ERROR, "eof": AUDIO_ENDED}.get(message.get("reason"))
+                if kind is not None:
+                    self._set_state(url, "error" if kind == AUDIO_ERROR else "ended")
+                    self._post(AudioEvent(kind, url))
+                return
+            if event == "property-change":
+                self._property_change(message.get("name"), message.get("data"))
+
+    def _property_change(self, name: str, data) -> None:
+        """Called with self._lock held."""
+        url = self._active
+        if name == "paused-for-cache":
+            if data:
+                self._set_state(url, "buffering")
+                self._post(AudioEvent(AUDIO_BUFFERING, url, self._cache_percent or 0.0))
+            elif self._state == "buffering" and url == self.current_url:
+                self._set_state(url, "playing")
+                self._post(AudioEvent(AUDIO_PLAYING, url))
+        elif name == "cache-buffering-state" and data is not None:
+            self._cache_percent = float(data)
+            if self._state == "buffering":
+                self._post(AudioEvent(AUDIO_BUFFERING, url, self._cache_percent))
+        elif name == "demuxer-cache-state" and isinstance(data, dict):
+            now = time.monotonic()
+            self._input_rate = float(data.get("raw-input-rate") or 0)
+            if self._read_bytes is None:
+                self._read_bytes = 0.0
+            else:
+                # The rate just reported covers (at most) its measuring span
+                # before now; a longer gap since the last update is unaccounted.
+                self._read_bytes += self._input_rate * min(now - self._rate_at, _RATE_SPAN)
+            self._rate_at = now
+
+    def _set_state(self, url: Optional[str], state: str) -> None:
+        if url is not None and url == self.current_url:
+            self._state = state
+
+    def _post(self, audio_event: AudioEvent) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._post_event, audio_event)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _post_event(self, audio_event: AudioEvent) -> None:
+        if audio_event.kind == AUDIO_PLAYING and self.first_audio_time is None:
+            self.first_audio_time = time.monotonic() - self._started_at
+            logging.info(f"🎛️ First audio {self.first_audio_time * 1000:.0f} ms after mpv start")
+        if self.events.full():
+            self.events.get_nowait()
+        self.events.put_nowait(audio_event)
+
+    # ------------------------------------------------------------------
+    # AudioPlayerProtocol
+    # ------------------------------------------------------------------
+
+    def play(self, url: str, station: Optional[str] = None) -> None:
+        """Switch the running mpv to url; mpv keeps no per-station history."""
+        with self._lock:
+            self.current_url = url
+            self._pending.append(url)
+            self._state = "opening"
+        self._command("loadfile", url, "replace")
+        logging.debug(f"🔊 Playing: {url}")
+
+    def prefetch(self, urls: list, stations: Optional[list] = None) -> None:
+        """Not supported: a standby would need a second mpv process."""
+
+    def change_volume(self, delta: int, min_volume: int = 10, max_volume: int = 100) -> int:
+        """Adjust volume by delta, clamped between min and max."""
+        return self.change_volume_level(max(min_volume, min(max_volume, self._volume + delta)))
+
+    def change_volume_level(self, level: int) -> int:
+        """Adjust volume to set level."""
+        logging.debug(f"🔉 Volume changed: {self._volume} -> {level}")
+        self._volume = level
+        self._command("set_property", "volume", level)
+        return level
+
+    def is_error(self) -> bool:
+        """True unless the current stream is playing - as with AudioPlayer,
+        a stream still opening after the caller's grace period has failed."""
+        return self._state != "playing"
+
+    def progress(self) -> Optional[dict]:
+        """Input stats for the current stream, or None until mpv reports its cache."""
+        with self._lock:
+            if self._read_bytes is None or self._active != self.current_url:
+                return None
+            read_bytes = int(self._read_bytes)
+            return {
+                "read_bytes": read_bytes,
+                "demux_read_bytes": read_bytes,
+                "input_bitrate": self._input_rate / 1000,   # kB/s, as libvlc reports it
+            }
+
+    async def stop(self) -> None:
+        """Quit mpv (killing it if it won't) and remove its socket."""
+        self._stopping = True
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            try:
+                self._send("quit")
+            except (OSError, AttributeError):
+                pass
+            try:
+                await asyncio.to_thread(process.wait, _STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                await asyncio.to_thread(process.wait)
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+        if self._dir is not None:
+            path = os.path.join(self._dir, "ipc.sock")
+            if os.path.exists(path):
+                os.unlink(path)
+            os.rmdir(self._dir)
+            self._dir = None
@@ -0,0 +1,262 @@
+"""Run an audio player's blocking calls on a dedicated thread.
+
+AudioPlayer's play()/stop()/volume calls are synchronous libvlc calls; made
+directly on the event loop, a slow stop() on a wedged stream stalls the dial,
+buttons and display with it. AudioWorker owns the player from start() on and
+feeds it from a command queue on its own thread instead, handing App an
+asyncio.Future per command.
+
+Commands that haven't started yet are coalesced latest-wins: five quick dial
+ticks queue one play (of the last URL), a pending volume step merges into
+the next one, and every superseded caller's future resolves with the
+surviving command's result.
+
+The worker is the only thread that touches the player once it has started:
+is_error() and progress() are queued like the commands, and a player with a
+`dispatch` hook (AudioPlayer) has it pointed at the worker, so the work it
+does for its own libvlc events runs here too - in order with play(),
+prefetch() and the releases they do, never racing them.
+
+Hardware-free (threading + asyncio only), like fake.py and protocols.py, so
+it wraps FakeAudioPlayer in the unit tests exactly as it wraps AudioPlayer on
+the device.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from .protocols import AudioPlayerProtocol
+
+_SLOT_PLAY = "play"
+_SLOT_PREFETCH = "prefetch"
+_SLOT_VOLUME = "volume"
+_SLOT_IS_ERROR = "is_error"
+_SLOT_PROGRESS = "progress"
+_SLOT_DISPATCH = "dispatch"   # + a sequence number: dispatched calls never coalesce
+
+
+class _Command:
+    """One queued call: player method name (or a callable) + args, and every
+    future waiting on it."""
+
+    def __init__(
+        self, name: str, args: tuple, future: asyncio.Future, call: Optional[Callable] = None
+    ) -> None:
+        self.name = name
+        self.args = args
+        self.call = call
+        self.futures = [future]
+        self.queued_at = time.monotonic()
+
+
+class AudioWorker:
+    """Serialise an AudioPlayerProtocol's calls onto one worker thread.
+
+    start()/stop() keep the HardwareComponent shape. The wrapped player's own
+    start() still runs on the loop thread (it binds the loop for its event
+    bridge); everything after that goes through the worker.
+    """
+
+    def __init__(self, player: AudioPlayerProtocol) -> None:
+        self.player = player
+        self.events = player.events
+        self.coalesced = 0
+        # command name -> (count, total seconds, max seconds, last seconds)
+        self._latency: dict = {}
+        # slot -> _Command; dicts keep insertion order, so slots run FIFO
+        self._pending: dict = {}
+        self._in_flight: Optional[_Command] = None
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatched = itertools.count()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        if hasattr(self.player, "dispatch"):
+            self.player.dispatch = self._dispatch
+        self._thread = threading.Thread(target=self._run, name="audio-worker", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Finish queued commands, stop the thread, then stop the player."""
+        if self._thread is not None:
+            with self._condition:
+                self._stopping = True
+                self._condition.notify()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        await self.player.stop()
+
+    # ---------------------------------------------------------------------------
+    # Player surface
+    # ---------------------------------------------------------------------------
+
+    @property
+    def current_url(self) -> Optional[str]:
+        """The URL most recently asked to play, even if the worker hasn't got to it yet."""
+        command = self._pending_play()
+        return command.args[0] if command is not None else self.player.current_url
+
+    def is_error(self) -> asyncio.Future:
+        """The player's is_error(), asked on the worker. A play still queued
+        or running counts as not-yet-playing."""
+        if self._pending_play() is not None:
+            return self._done(True)
+        return self._submit(_SLOT_IS_ERROR, "is_error", ())
+
+    def progress(self) -> asyncio.Future:
+        """The player's stream stats, read on the worker; None while a play
+        is still queued or running."""
+        if self._pending_play() is not None:
+            return self._done(None)
+        return self._submit(_SLOT_PROGRESS, "progress", ())
+
+    def play(self, url: str, station: Optional[str] = None) -> asyncio.Future:
+        return self._submit(_SLOT_PLAY, "play", (url, station))
+
+    def prefetch(self, urls: list, stations: Optional[list] = None) -> asyncio.Future:
+        stations = list(stations) if stations is not None else None
+        return self._submit(_SLOT_PREFETCH, "prefetch", (list(urls), stations))
+
+    def change_volume(
+        self, delta: int, min_volume: int = 10, max_volume: int = 100
+    ) -> asyncio.Future:
+        return self._submit(_SLOT_VOLUME, "change_volume", (delta, min_volume, max_volume))
+
+    def change_volume_level(self, level: int) -> asyncio.Future:
+        return self._submit(_SLOT_VOLUME, "change_volume_level", (level,))
+
+    async def wait_idle(self) -> None:
+        """Wait until every command submitted so far has run."""
+        with self._condition:
+            commands = list(self._pending.values())
+            if self._in_flight is not None:
+                commands.append(self._in_flight)
+        futures = [future for command in commands for future in command.futures]
+        if futures:
+            await asyncio.wait(futures)
+
+    def latency_stats(self) -> dict:
+        """Per-command {"count", "mean", "max", "last"} latency (seconds, queued to done)."""
+        return {
+            name: {"count": count, "mean": total / count, "max": worst, "last": last}
+            for name, (count, total, worst, last) in self._latency.items()
+        }
+
+    # ---------------------------------------------------------------------------
+    # Queue
+    # ---------------------------------------------------------------------------
+
+    def _pending_play(self) -> Optional[_Command]:
+        with self._condition:
+            command = self._pending.get(_SLOT_PLAY)
+            if command is None and self._in_flight is not None and self._in_flight.name == "play":
+                command = self._in_flight
+            return command
+
+    def _dispatch(self, call: Callable, *args) -> None:
+        """The wrapped player's dispatch hook: run call(*args) on the worker,
+        after the commands already queued. Dropped once the worker is
+        stopping - the player is about to release everything call could touch."""
+        if self._stopping:
+            return
+        slot = (_SLOT_DISPATCH, next(self._dispatched))
+        self._submit(slot, call.__name__, args, call)
+
+    def _done(self, result) -> asyncio.Future:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        future = self._loop.create_future()
+        future.set_result(result)
+        return future
+
+    def _submit(
+        self, slot, name: str, args: tuple, call: Optional[Callable] = None
+    ) -> asyncio.Future:
+        if self._thread is None:
+            self.start()
+        future = self._loop.create_future()
+        command = _Command(name, args, future, call)
+        with self._condition:
+            superseded = self._pending.get(slot)
+            if superseded is not None:
+                command = self._merge(superseded, command)
+                command.futures = superseded.futures + command.futures
+                command.queued_at = superseded.queued_at
+                self.coalesced += 1
+            self._pending[slot] = command
+            self._condition.notify()
+        return future
+
+    @staticmethod
+    def _merge(older: _Command, newer: _Command) -> _Command:
+        """Combine two commands for the same slot into the one that should run.
+
+        Latest wins, except that a relative volume step on top of a pending
+        one is folded in, so quick presses still add up.
+        """
+        if newer.name != "change_volume":
+            return newer
+        delta, min_volume, max_volume = newer.args
+        if older.name == "change_volume":
+            args = (older.args[0] + delta, min_volume, max_volume)
+            return _Command("change_volume", args, newer.futures[0])
+        if older.name == "change_volume_level":
+            level = max(min_volume, min(max_volume, older.args[0] + delta))
+            return _Command("change_volume_level", (level,), newer.futures[0])
+        return newer
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                slot = next(iter(self._pending))
+                command = self._in_flight = self._pending.pop(slot)
+            result, exception = None, None
+            try:
+                call = command.call or getattr(self.player, command.name)
+                result = call(*command.args)
+            except Exception as e:
+                logging.exception(f"Audio command failed: {command.name}{command.args}")
+                exception = e
+            # Cleared before the futures resolve, so an awaiting caller never
+            # sees its own finished command as still in flight.
+            with self._condition:
+                self._in_flight = None
+            self._resolve(command, result, exception)
+            if command.call is None:
+                self._record_latency(command)
+
+    def _resolve(self, command: _Command, result, exception: Optional[Exception]) -> None:
+        def settle():
+            for future in command.futures:
+                if future.done():
+                    continue
+                if exception is not None:
+                    future.set_exception(exception)
+                    # Already logged above; callers that fire and forget
+                    # shouldn't also get "exception was never retrieved".
+                    future.exception()
+                else:
+                    future.set_result(result)
+
+        try:
+            self._loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _record_latency(self, command: _Command) -> None:
+        elapsed = time.monotonic() - command.queued_at
+        count, total, worst, _ = self._latency.get(command.name, (0, 0.0, 0.0, 0.0))
+        self._latency[command.name] = (count + 1, total + elapsed, max(worst, elapsed), elapsed)
+        logging.debug(f"🎚️ Audio {command.name} took {elapsed * 1000:.1f} ms")
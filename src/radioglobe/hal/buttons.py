@@ -77,13 +77,14 @@ class Button:
 
     def __init__(self, name: str, keycode: int, long_press_threshold: float = 1.0,
                  short_cb: Optional[Callable] = None, long_cb: Optional[Callable] = None,
-                 press_cb: Optional[Callable] = None) -> None:
+                 press_cb: Optional[Callable] = None, recorder=None) -> None:
         self.name = name
         self.keycode = keycode
         self.long_press_threshold = long_press_threshold
         self.short_cb = short_cb
         self.long_cb = long_cb
         self.press_cb = press_cb
+        self.recorder = recorder   # an input_log.InputRecorder, or None
 
         self._device = None
         self._loop = None
@@ -106,6 +107,8 @@ class Button:
         for event in self._device.read():
             if event.type != ecodes.EV_KEY or event.code != self.keycode:
                 continue
+            if self.recorder is not None and event.value in (0, 1):
+                self.recorder.button(self.name, down=event.value == 1)
             if event.value == 1:  # key down
                 self._press_start = time.monotonic()
                 _fire(self.press_cb)
@@ -129,12 +132,17 @@ class Button:
 
 
 class ButtonManager:
-    def __init__(self, button_definitions: list[ButtonDefinition], long_press_threshold: float = 1.0) -> None:
+    def __init__(
+        self,
+        button_definitions: list[ButtonDefinition],
+        long_press_threshold: float = 1.0,
+        recorder=None,
+    ) -> None:
         self.event_queue: asyncio.Queue = asyncio.Queue()
         self.buttons = [
             Button(
                 d.name, d.keycode, long_press_threshold,
-                d.short_cb, d.long_cb, d.press_cb,
+                d.short_cb, d.long_cb, d.press_cb, recorder,
             )
             for d in button_definitions
         ]
@@ -183,6 +191,7 @@ def create_button_manager(
     top: ButtonCallbacks = ButtonCallbacks(),
     mid: ButtonCallbacks = ButtonCallbacks(),
     bottom: ButtonCallbacks = ButtonCallbacks(),
+    recorder=None,
 ) -> ButtonManager:
     """Wire the given callbacks to this board's fixed 4-button layout and
     construct the manager.
@@ -196,4 +205,4 @@ def create_button_manager(
         MID_BUTTON._replace(**mid._asdict()),
         BOTTOM_BUTTON._replace(**bottom._asdict()),
     ]
-    return ButtonManager(button_definitions)
+    return ButtonManager(button_definitions, recorder=recorder)
@@ -8,8 +8,9 @@ _POLARITY = 1  # flip to -1 if on-device verification shows inverted direction
 
 
 class Dial:
-    def __init__(self) -> None:
+    def __init__(self, recorder=None) -> None:
         self.queue: asyncio.Queue[int] = asyncio.Queue()
+        self.recorder = recorder   # an input_log.InputRecorder, or None
         self._device = None
         self._loop = None
 
@@ -31,11 +32,11 @@ class Dial:
 
     def _on_readable(self) -> None:
         for event in self._device.read():
-            if event.type == ecodes.EV_REL and event.code == ecodes.REL_X:
-                if event.value > 0:
-                    self.queue.put_nowait(_POLARITY * 1)
-                elif event.value < 0:
-                    self.queue.put_nowait(_POLARITY * -1)
+            if event.type == ecodes.EV_REL and event.code == ecodes.REL_X and event.value:
+                direction = _POLARITY * (1 if event.value > 0 else -1)
+                if self.recorder is not None:
+                    self.recorder.dial(direction)
+                self.queue.put_nowait(direction)
 
     def start(self) -> None:
         """Locate and open the rotary-encoder device."""
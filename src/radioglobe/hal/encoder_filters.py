@@ -0,0 +1,91 @@
+"""Per-axis smoothing for the positional encoders' readings.
+
+An encoder parked near a cell boundary flickers between neighbouring
+positions, and each flicker used to reach the latch as a new reading. A
+filter sits between the SPI read and the latch, one per axis:
+
+- MedianFilter: the median of the last `window` readings. It drops
+  single-sample spikes outright, and a real move passes after
+  window // 2 samples.
+- KalmanFilter: a 1-D constant-position Kalman filter. It weighs each
+  reading against the estimate by their variances, so noise is averaged
+  away while a sustained move is followed within a few samples.
+- PassThrough: no filtering.
+
+Positions wrap at _ENCODER_RESOLUTION, so both filters work on the signed
+shortest difference between readings (circular_delta): 1023 -> 0 is a
+one-step move, not a 1023-step one.
+"""
+
+from ..database import _ENCODER_RESOLUTION
+
+# EMS22A50 output transition noise is ~0.12 deg RMS, about a third of a step.
+_KALMAN_MEASUREMENT_NOISE = 0.15   # steps^2
+_KALMAN_PROCESS_NOISE = 0.05       # steps^2 per sample the true position may drift
+
+
+def circular_delta(to: int, origin: float) -> float:
+    """Signed shortest difference to - origin, in steps, in [-512, 512)."""
+    half = _ENCODER_RESOLUTION // 2
+    return (to - origin + half) % _ENCODER_RESOLUTION - half
+
+
+class PassThrough:
+    def update(self, value: int) -> int:
+        return value
+
+    def reset(self) -> None:
+        pass
+
+
+class MedianFilter:
+    def __init__(self, window: int = 3) -> None:
+        self.window = window
+        self._values: list = []
+
+    def update(self, value: int) -> int:
+        self._values.append(value)
+        del self._values[: -self.window]
+        # Unwrap around the newest reading so a window straddling 0 sorts sensibly.
+        unwrapped = sorted(value + circular_delta(v, value) for v in self._values)
+        return round(unwrapped[(len(unwrapped) - 1) // 2]) % _ENCODER_RESOLUTION
+
+    def reset(self) -> None:
+        self._values = []
+
+
+class KalmanFilter:
+    def __init__(
+        self,
+        process_noise: float = _KALMAN_PROCESS_NOISE,
+        measurement_noise: float = _KALMAN_MEASUREMENT_NOISE,
+    ) -> None:
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self._estimate = None
+        self._variance = 0.0
+
+    def update(self, value: int) -> int:
+        if self._estimate is None:
+            self._estimate, self._variance = float(value), self.measurement_noise
+        else:
+            self._variance += self.process_noise
+            gain = self._variance / (self._variance + self.measurement_noise)
+            self._estimate += gain * circular_delta(value, self._estimate)
+            self._estimate %= _ENCODER_RESOLUTION
+            self._variance *= 1 - gain
+        return round(self._estimate) % _ENCODER_RESOLUTION
+
+    def reset(self) -> None:
+        self._estimate = None
+
+
+def make_filter(kind: str, median_window: int = 3):
+    """A new filter for one axis: "median", "kalman" or "none"."""
+    if kind == "median":
+        return MedianFilter(median_window)
+    if kind == "kalman":
+        return KalmanFilter()
+    if kind == "none":
+        return PassThrough()
+    raise ValueError(f"Unknown encoder filter {kind!r}; expected 'median', 'kalman' or 'none'")
@@ -0,0 +1,112 @@
+"""Adaptive SPI polling rate for the positional encoders.
+
+A fixed 50 ms poll is too slow while the globe is being spun - a quick
+turn moves the reticule several cells between samples, and latching lags
+behind the hand - and wasteful once it has been left alone, which is most
+of the time. AdaptiveSampler picks the next poll interval from the
+readings themselves:
+
+- moving: a reading more than _MOTION_THRESHOLD steps from the last one
+  switches at once to _FAST_INTERVAL (200 Hz), held for _MOVING_HOLD
+  seconds after the last movement;
+- settled: _INTERVAL (the original 50 ms) once it has stopped;
+- idle: _IDLE_INTERVAL once readings have been steady for _IDLE_AFTER
+  seconds, until the first movement snaps it back to fast.
+
+Failed (parity) reads count as no movement. stats() reports the effective
+sample rate, wake-ups, the time spent at each rate, and how late each
+sample was against the interval asked for - the sampling jitter.
+"""
+
+from typing import Optional
+
+from ..database import _ENCODER_RESOLUTION
+
+_FAST_INTERVAL = 0.005    # s between polls while moving (200 Hz)
+_INTERVAL = 0.05          # s between polls once settled
+_IDLE_INTERVAL = 0.25     # s between polls once idle
+_MOVING_HOLD = 0.5        # s at the fast rate after the last movement
+_IDLE_AFTER = 10.0        # s of steady readings before idling
+_MOTION_THRESHOLD = 1     # steps; one-step flicker is sensor noise, not movement
+
+MODE_MOVING = "moving"
+MODE_SETTLED = "settled"
+MODE_IDLE = "idle"
+
+
+def step_distance(a: int, b: int) -> int:
+    """Distance between two encoder positions, the short way round."""
+    difference = abs(a - b) % _ENCODER_RESOLUTION
+    return min(difference, _ENCODER_RESOLUTION - difference)
+
+
+class AdaptiveSampler:
+    """observe(readings, now) records a sample and returns the interval to sleep."""
+
+    def __init__(
+        self,
+        fast_interval: float = _FAST_INTERVAL,
+        interval: float = _INTERVAL,
+        idle_interval: float = _IDLE_INTERVAL,
+        moving_hold: float = _MOVING_HOLD,
+        idle_after: float = _IDLE_AFTER,
+        motion_threshold: int = _MOTION_THRESHOLD,
+    ) -> None:
+        self.intervals = {
+            MODE_MOVING: fast_interval, MODE_SETTLED: interval, MODE_IDLE: idle_interval,
+        }
+        self.moving_hold = moving_hold
+        self.idle_after = idle_after
+        self.motion_threshold = motion_threshold
+        self.mode = MODE_SETTLED
+        self.wakeups = 0
+        self.movements = 0
+        self._last: Optional[list] = None
+        self._last_motion: Optional[float] = None
+        self._first: Optional[float] = None
+        self._previous: Optional[float] = None
+        self._late_seconds = 0.0
+        self._max_late = 0.0
+        self._seconds = {mode: 0.0 for mode in self.intervals}
+
+    def observe(self, readings: Optional[list], now: float) -> float:
+        if self._first is None:
+            self._first = self._last_motion = now
+        if self._previous is not None:
+            self._seconds[self.mode] += now - self._previous
+            late = max(0.0, now - self._previous - self.intervals[self.mode])
+            self._late_seconds += late
+            self._max_late = max(self._max_late, late)
+        self._previous = now
+        self.wakeups += 1
+
+        if readings:
+            if self._last is not None and any(
+                step_distance(a, b) > self.motion_threshold for a, b in zip(readings, self._last)
+            ):
+                self.movements += 1
+                self._last_motion = now
+            self._last = list(readings)
+
+        still = now - self._last_motion
+        if self.movements and still < self.moving_hold:
+            self.mode = MODE_MOVING
+        elif still >= self.idle_after:
+            self.mode = MODE_IDLE
+        else:
+            self.mode = MODE_SETTLED
+        return self.intervals[self.mode]
+
+    def stats(self) -> dict:
+        """{"mode", "wakeups", "movements", "samples_per_second", "late_ms", "max_late_ms",
+        "seconds": {mode: s}}; late_ms is the mean lateness per sample."""
+        running = self._previous - self._first if self._first is not None else 0.0
+        return {
+            "mode": self.mode,
+            "wakeups": self.wakeups,
+            "movements": self.movements,
+            "samples_per_second": self.wakeups / running if running > 0 else 0.0,
+            "late_ms": self._late_seconds / (self.wakeups - 1) * 1000 if self.wakeups > 1 else None,
+            "max_late_ms": self._max_late * 1000,
+            "seconds": dict(self._seconds),
+        }
@@ -0,0 +1,118 @@
+"""Both positional encoders on persistent SPI handles, read back to back.
+
+Each EMS22A encoder sits on its own chip-select of SPI bus 0 and answers a
+2-byte read with a 10-bit position, 5 status bits and an even parity bit.
+open() opens and configures one spidev handle per chip-select once;
+read() then costs one transfer per encoder, instead of an open, two
+configuration ioctls, a transfer and a close for each, every sample.
+
+Parity comes from a 256-entry table: a word passes when its two bytes have
+the same parity, i.e. the 15 data bits' parity equals bit 0.
+
+stats() reports samples per second, parity failures, per-read latency and
+the SPI syscalls issued, which make the saving over reopening visible.
+"""
+
+import logging
+import time
+from typing import Callable, Optional, Sequence
+
+_SPI_BUS = 0
+_ENCODER_DEVICES = (0, 1)     # chip-selects: latitude, longitude
+_SPI_SPEED_HZ = 1_000_000
+_SPI_MODE = 1
+
+# Syscalls per operation, as spidev issues them.
+_OPEN_SYSCALLS = 3      # open(2) plus the max_speed_hz and mode ioctls
+_CLOSE_SYSCALLS = 1
+_READ_SYSCALLS = 1      # readbytes() is one read(2)
+
+_BYTE_PARITY = bytes(bin(byte).count("1") & 1 for byte in range(256))
+
+
+def parity_ok(high: int, low: int) -> bool:
+    """True if the 16-bit word high:low has even parity across all its bits."""
+    return _BYTE_PARITY[high] == _BYTE_PARITY[low]
+
+
+class EncoderSpi:
+    """One open spidev handle per encoder; read() returns every position, or None."""
+
+    def __init__(
+        self,
+        bus: int = _SPI_BUS,
+        devices: Sequence[int] = _ENCODER_DEVICES,
+        speed_hz: int = _SPI_SPEED_HZ,
+        mode: int = _SPI_MODE,
+        spi_factory: Optional[Callable] = None,
+    ) -> None:
+        self.bus = bus
+        self.devices = tuple(devices)
+        self.speed_hz = speed_hz
+        self.mode = mode
+        self.samples = 0
+        self.parity_errors = 0
+        self.syscalls = 0
+        self._spi_factory = spi_factory
+        self._handles: list = []
+        self._opened = 0.0
+        self._read_seconds = 0.0
+        self._max_read = 0.0
+
+    def open(self) -> None:
+        if self._handles:
+            return
+        factory = self._spi_factory
+        if factory is None:
+            import spidev  # type: ignore
+
+            factory = spidev.SpiDev
+        for device in self.devices:
+            spi = factory()
+            spi.open(self.bus, device)
+            spi.max_speed_hz = self.speed_hz
+            spi.mode = self.mode
+            self._handles.append(spi)
+            self.syscalls += _OPEN_SYSCALLS
+        self._opened = time.monotonic()
+
+    def close(self) -> None:
+        for spi in self._handles:
+            spi.close()
+            self.syscalls += _CLOSE_SYSCALLS
+        self._handles = []
+
+    def read(self) -> Optional[list]:
+        """Each encoder's 10-bit position in device order; None if any word fails parity."""
+        started = time.perf_counter()
+        positions = []
+        for device, spi in zip(self.devices, self._handles):
+            high, low = spi.readbytes(2)
+            self.syscalls += _READ_SYSCALLS
+            if not parity_ok(high, low):
+                self.parity_errors += 1
+                logging.debug(
+                    f"SPI parity check failed for encoder {device} (raw={high << 8 | low:#06x})"
+                )
+                positions = None
+                break
+            positions.append((high << 8 | low) >> 6)
+        elapsed = time.perf_counter() - started
+        self.samples += 1
+        self._read_seconds += elapsed
+        self._max_read = max(self._max_read, elapsed)
+        return positions
+
+    def stats(self) -> dict:
+        """{"samples", "samples_per_second", "parity_errors", "syscalls",
+        "syscalls_per_sample", "read_us", "max_read_us"}; read_us is the mean."""
+        running = time.monotonic() - self._opened if self._opened else 0.0
+        return {
+            "samples": self.samples,
+            "samples_per_second": self.samples / running if running > 0 else 0.0,
+            "parity_errors": self.parity_errors,
+            "syscalls": self.syscalls,
+            "syscalls_per_sample": self.syscalls / self.samples if self.samples else None,
+            "read_us": self._read_seconds / self.samples * 1e6 if self.samples else None,
+            "max_read_us": self._max_read * 1e6,
+        }
@@ -13,9 +13,10 @@ from radioglobe.hal.protocols import (
     PositionalEncodersProtocol,
     RGBLedProtocol,
 )
+from radioglobe.radio_config import AUDIO_BACKEND
 
 
-def build_hardware() -> tuple[
+def build_hardware(recorder=None) -> tuple[
     DialProtocol,
     AudioPlayerProtocol,
     PositionalEncodersProtocol,
@@ -25,12 +26,31 @@ def build_hardware() -> tuple[
     """Construct the real hardware-backed objects App needs.
 
     Returned in App.__init__'s parameter order. Only ever called on a real
-    Pi with the `pi` extra installed.
+    Pi with the `pi` extra installed. recorder, an input_log.InputRecorder,
+    is handed to the dial and encoders; App.run() hands it to the buttons.
     """
-    from radioglobe.hal.audio_async import AudioPlayer
     from radioglobe.hal.dial import Dial
     from radioglobe.hal.display import Display
     from radioglobe.hal.positional_encoders import PositionalEncoders
     from radioglobe.hal.rgb_led import RGBLed
 
-    return Dial(), AudioPlayer(), PositionalEncoders(), Display(), RGBLed()
+    return (
+        Dial(recorder=recorder),
+        build_audio_player(),
+        PositionalEncoders(recorder=recorder),
+        Display(),
+        RGBLed(),
+    )
+
+
+def build_audio_player(backend: str = AUDIO_BACKEND) -> AudioPlayerProtocol:
+    """The AudioPlayerProtocol implementation named by backend (AUDIO_BACKEND)."""
+    if backend == "vlc":
+        from radioglobe.hal.audio_async import AudioPlayer
+
+        return AudioPlayer()
+    if backend == "mpv":
+        from radioglobe.hal.audio_mpv import MpvAudioPlayer
+
+        return MpvAudioPlayer()
+    raise ValueError(f"Unknown audio backend {backend!r} (expected 'vlc' or 'mpv')")
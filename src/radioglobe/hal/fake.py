@@ -13,6 +13,10 @@ import inspect
 import logging
 from typing import Optional
 
+from radioglobe.constants import AUDIO_ERROR
+from radioglobe.database import _ENCODER_RESOLUTION
+from radioglobe.hal.protocols import AudioEvent
+
 
 class FakeDial:
     """Simulate dial turns via push_turn(); real Dial pushes +-1 ints too."""
@@ -42,15 +46,29 @@ class FakePositionalEncoders:
         self.latitude_offset = latitude_offset
         self.longitude_offset = longitude_offset
         self.latch_stickiness = None
+        self.spinning = False
         self.updated = asyncio.Event()
         self.started = False
         self.stopped = False
 
-    def set_position(self, lat: int, lon: int) -> None:
-        """Test hook: simulate a new reading and wake _encoder_loop()."""
+    def set_position(self, lat: int, lon: int, spinning: bool = False) -> None:
+        """Test hook: simulate a new reading, mid-spin or not, and wake _encoder_loop()."""
         self.latitude, self.longitude = lat, lon
+        self.spinning = spinning
         self.updated.set()
 
+    def feed(self, readings: list, now: float) -> bool:
+        """Test hook: a raw sample replayed from an input log (input_log.py).
+
+        Mirrors only the real module's latitude inversion - no filtering,
+        velocity or latch hysteresis; replay into a real PositionalEncoders
+        for those - and wakes _encoder_loop() when the position changes.
+        """
+        position = ((_ENCODER_RESOLUTION - readings[0]) % _ENCODER_RESOLUTION, readings[1])
+        if position != (self.latitude, self.longitude):
+            self.set_position(*position)
+        return False
+
     def zero(self) -> list:
         self.latitude_offset = -self.latitude
         self.longitude_offset = -self.longitude
@@ -69,6 +87,9 @@ class FakePositionalEncoders:
     def is_latched(self) -> bool:
         return self.latch_stickiness is not None
 
+    def is_spinning(self) -> bool:
+        return self.spinning
+
     def get_calibration(self) -> dict:
         return {
             "lat": self.latitude,
@@ -198,12 +219,18 @@ class FakeDisplay:
 
 
 class FakeAudioPlayer:
-    """Records play() calls; error state settable via set_error() for stream-monitor tests."""
+    """Records play() calls; error state settable via set_error(), events via
+    emit(), stream progress via advance()."""
 
     def __init__(self) -> None:
         self.current_url: Optional[str] = None
+        self.events: "asyncio.Queue[AudioEvent]" = asyncio.Queue()
         self.played: list = []
+        self.stations: list = []      # station passed with each play()
+        self.prefetched: list = []
         self.volume = 100
+        # None until advance() is first called: a player without stats
+        self.demux_bytes: Optional[int] = None
         self._error = False
         self.stopped_calls = 0
         self.started = False
@@ -211,11 +238,16 @@ class FakeAudioPlayer:
     def start(self) -> None:
         self.started = True
 
-    def play(self, url: str) -> None:
+    def play(self, url: str, station: Optional[str] = None) -> None:
         self.current_url = url
         self.played.append(url)
+        self.stations.append(station)
         self._error = False
 
+    def prefetch(self, urls: list, stations: Optional[list] = None) -> None:
+        """Records the latest standby set; nothing is actually buffered."""
+        self.prefetched = [url for url in urls if url != self.current_url]
+
     def change_volume(self, delta, min_volume=10, max_volume=100) -> int:
         self.volume = max(min_volume, min(max_volume, self.volume + delta))
         return self.volume
@@ -224,9 +256,32 @@ class FakeAudioPlayer:
         self.volume = level
         return self.volume
 
+    def progress(self) -> Optional[dict]:
+        if self.demux_bytes is None:
+            return None
+        return {
+            "read_bytes": self.demux_bytes,
+            "demux_read_bytes": self.demux_bytes,
+            "input_bitrate": 0.0,
+        }
+
+    def advance(self, nbytes: int = 1024) -> None:
+        """Test hook: simulate nbytes more of the stream being demuxed."""
+        self.demux_bytes = (self.demux_bytes or 0) + nbytes
+
     def set_error(self, is_error: bool) -> None:
-        """Test hook: simulate VLC entering/leaving an error state."""
+        """Test hook: simulate VLC entering/leaving an error state.
+
+        Entering one also queues an AUDIO_ERROR event, as the real player's
+        EncounteredError event would.
+        """
         self._error = is_error
+        if is_error:
+            self.emit(AUDIO_ERROR)
+
+    def emit(self, kind: str, value: Optional[float] = None) -> None:
+        """Test hook: queue a player event for the current URL."""
+        self.events.put_nowait(AudioEvent(kind, self.current_url, value))
 
     def is_error(self) -> bool:
         return self._error
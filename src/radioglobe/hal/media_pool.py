@@ -0,0 +1,83 @@
+"""Bounded LRU pool of VLC Media objects, keyed by URL.
+
+AudioPlayer used to call instance.media_new() on every play and never
+release the old Media, so a long dial session leaked one libvlc media (and
+whatever it had parsed) per flip. MediaPool hands back the same Media when
+a URL is played again with the same options, and release()s the least
+recently used one once it holds more than `capacity`.
+
+A libvlc Media is reference-counted: a MediaPlayer that still has an evicted
+Media set keeps its own reference, so releasing the pool's one never pulls
+it out from under playback.
+
+Hardware-free: the pool only calls the factory it's given and each media's
+release(), so the tests drive it with plain fakes.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Callable
+
+
+class MediaPool:
+    """Cache of media objects built by factory(url, *options), at most capacity at once."""
+
+    def __init__(self, factory: Callable, capacity: int) -> None:
+        self.factory = factory
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0    # pooled media rebuilt because the URL's options changed
+        # url -> (options tuple, media), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str, options: tuple = ()):
+        """The pooled media for url opened with options, creating it if needed."""
+        options = tuple(options)
+        entry = self._entries.get(url)
+        if entry is not None:
+            pooled_options, media = entry
+            if pooled_options == options:
+                self._entries.move_to_end(url)
+                self.hits += 1
+                return media
+            # Options are baked in at media_new(): a changed buffer size or
+            # hint needs a fresh media.
+            del self._entries[url]
+            self._release(media)
+            self.stale += 1
+        self.misses += 1
+        media = self.factory(url, *options)
+        self._entries[url] = (options, media)
+        while len(self._entries) > self.capacity:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+        return media
+
+    def clear(self) -> None:
+        """Release every pooled media."""
+        while self._entries:
+            _, (_, media) = self._entries.popitem(last=False)
+            self._release(media)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale": self.stale,
+        }
+
+    @staticmethod
+    def _release(media) -> None:
+        try:
+            media.release()
+        except Exception:
+            logging.exception("Releasing pooled media failed")
@@ -0,0 +1,105 @@
+"""PCM tap on the audio output, for dead-air detection.
+
+libvlc's audio callbacks would hand us the decoded samples, but they
+replace VLC's output - the app would then have to play them itself. The
+radio's audio already goes through PulseAudio, whose sinks each have a
+monitor source carrying exactly what is being played, so the tap runs
+`parec` on the default sink's monitor and reads raw 16-bit mono PCM from
+its stdout. Playback is untouched and nothing runs on libvlc's threads;
+muted standby players (AudioPlayer.prefetch) contribute nothing to the mix.
+
+Blocks of DEAD_AIR_BLOCK seconds land on `blocks`, a bounded asyncio.Queue
+that drops its oldest block when nobody is reading. If parec exits the tap
+restarts it after a pause; if parec isn't installed the tap logs it once
+and stays idle.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Sequence
+
+from ..radio_config import DEAD_AIR_BLOCK, DEAD_AIR_SAMPLE_RATE
+
+_BYTES_PER_SAMPLE = 2   # s16le mono
+_QUEUE_BLOCKS = 8
+_RESTART_DELAY = 5.0    # seconds before restarting a parec that exited
+
+
+def parec_command(sample_rate: int) -> tuple:
+    return (
+        "parec",
+        "--device=@DEFAULT_MONITOR@",
+        "--format=s16le",
+        f"--rate={sample_rate}",
+        "--channels=1",
+        "--raw",
+        "--client-name=radioglobe-tap",
+    )
+
+
+class PcmTap:
+    def __init__(
+        self,
+        sample_rate: int = DEAD_AIR_SAMPLE_RATE,
+        block_seconds: float = DEAD_AIR_BLOCK,
+        command: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.block_bytes = int(sample_rate * block_seconds) * _BYTES_PER_SAMPLE
+        self.command = tuple(command) if command is not None else parec_command(sample_rate)
+        self.blocks: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_BLOCKS)
+        self.restarts = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._kill()
+
+    def drain(self) -> list:
+        """Every block queued since the last drain, oldest first."""
+        blocks = []
+        while not self.blocks.empty():
+            blocks.append(self.blocks.get_nowait())
+        return blocks
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self.command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+            except FileNotFoundError:
+                logging.warning(f"PCM tap disabled: {self.command[0]} not found")
+                return
+            try:
+                while True:
+                    self._put(await self._process.stdout.readexactly(self.block_bytes))
+            except asyncio.IncompleteReadError:
+                pass
+            await self._kill()
+            self.restarts += 1
+            logging.warning(f"PCM tap exited, restarting in {_RESTART_DELAY:.0f}s")
+            await asyncio.sleep(_RESTART_DELAY)
+
+    def _put(self, block: bytes) -> None:
+        if self.blocks.full():
+            self.blocks.get_nowait()
+        self.blocks.put_nowait(block)
+
+    async def _kill(self) -> None:
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        process.kill()
+        await process.wait()
@@ -1,24 +1,74 @@
 import asyncio
 import logging
+import math
+import os
+import threading
+import time
 from typing import Optional
 
-import spidev  # type: ignore
-
 from ..database import _ENCODER_RESOLUTION
+from ..radio_config import (
+    ENCODER_ENTER_STEPS,
+    ENCODER_FILTER,
+    ENCODER_MEDIAN_WINDOW,
+    ENCODER_THREAD,
+    ENCODER_THREAD_PRIORITY,
+    SPIN_VELOCITY,
+)
+from .encoder_filters import make_filter
+from .encoder_sampling import AdaptiveSampler, step_distance
+from .encoder_spi import EncoderSpi, parity_ok
+
+_VELOCITY_SMOOTHING = 0.1   # s time constant of the velocity estimate
 
 
 class PositionalEncoders:
-    def __init__(self, latitude_offset: int = 0, longitude_offset: int = 0) -> None:
+    def __init__(
+        self,
+        latitude_offset: int = 0,
+        longitude_offset: int = 0,
+        spi: Optional[EncoderSpi] = None,
+        sampler: Optional[AdaptiveSampler] = None,
+        threaded: bool = ENCODER_THREAD,
+        thread_priority: int = ENCODER_THREAD_PRIORITY,
+        filter_kind: str = ENCODER_FILTER,
+        enter_steps: int = ENCODER_ENTER_STEPS,
+        spin_velocity: float = SPIN_VELOCITY,
+        recorder=None,
+    ) -> None:
         self.latch_stickiness = None
         self.latitude = 0
         self.longitude = 0
         self.latitude_offset = latitude_offset
         self.longitude_offset = longitude_offset
         self.updated = asyncio.Event()
-        self.spi = None
+        self.spi = spi if spi is not None else EncoderSpi()
+        self.sampler = sampler if sampler is not None else AdaptiveSampler()
+        self.filters = [make_filter(filter_kind, ENCODER_MEDIAN_WINDOW) for _ in range(2)]
+        self.enter_steps = enter_steps
+        self.spin_velocity = spin_velocity
+        self.velocity = 0.0     # steps/s, smoothed; see _track_velocity()
+        self.spins = 0
+        self.recorder = recorder   # an input_log.InputRecorder, or None
+        self.updates = 0     # times updated was set
+        self.unlatches = 0
+        self.threaded = threaded
+        self.thread_priority = thread_priority
+        self.realtime = False   # the sampling thread got SCHED_FIFO
+        self.coalesced = 0      # thread samples replaced before the loop took them
+        self._unlatch_confirm_count = 0
+        self._published: Optional[list] = None
+        self._spinning = False
+        self._last_sample: Optional[tuple] = None   # (readings, monotonic time)
 
         # Used to safely stop the task
         self._task = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        # The sampling thread's single-slot mailbox: it only ever holds the
+        # latest (readings, time) sample, and a plain attribute swap needs no lock.
+        self._mailbox: Optional[tuple] = None
+        self._drain_pending = False
 
     def zero(self) -> list:
         self.latitude_offset = (_ENCODER_RESOLUTION // 2) - self.latitude
@@ -42,6 +92,10 @@ class PositionalEncoders:
     def is_latched(self) -> bool:
         return self.latch_stickiness is not None
 
+    def is_spinning(self) -> bool:
+        """True while the smoothed velocity is above spin_velocity."""
+        return self._spinning
+
     def get_calibration(self) -> dict:
         """Return the current position/calibration as plain data for persistence."""
         return {
@@ -64,36 +118,23 @@ class PositionalEncoders:
         self.latch_stickiness = True
 
     def check_parity(self, reading: int) -> bool:
-        reading_without_parity_bit = reading >> 1
-        parity_bit = reading & 0b1
-
-        computed_parity = 0
-        while reading_without_parity_bit:
-            computed_parity ^= reading_without_parity_bit & 0b1
-            reading_without_parity_bit >>= 1
-
-        return parity_bit == computed_parity
+        return parity_ok(reading >> 8, reading & 0xFF)
 
     def read_spi(self) -> Optional[list]:
-        BUS = 0
-        readings = []
-
-        for device in [0, 1]:
-            self.spi.open(BUS, device)
-            self.spi.max_speed_hz = 1000000
-            self.spi.mode = 1
-            reading = self.spi.readbytes(2)
-            self.spi.close()
-
-            raw_reading = reading[0] << 8 | reading[1]
+        """Both encoders' positions from one back-to-back read, or None on a parity failure."""
+        readings = self.spi.read()
+        if readings and self.recorder is not None:
+            self.recorder.encoder(readings)
+        return readings
 
-            if self.check_parity(raw_reading):
-                readings.append(raw_reading >> 6)
-            else:
-                logging.debug(f"SPI parity check failed for encoder {device} (raw={raw_reading:#06x})")
-                return None
+    def feed(self, readings: list, now: float) -> bool:
+        """Apply one raw sample, as read_spi() returns it, read at monotonic
+        time now: filter it, then run the latch logic. True if it just unlatched.
 
-        return readings
+        run_encoder() uses this for each read; input_log.InputReplayer uses
+        it to replay a recording without SPI.
+        """
+        return self._handle_readings(self._filter(readings), now)
 
     # Number of consecutive out-of-band readings required before unlatching.
     # Filters single-sample sensor noise (the EMS22A50 datasheet specifies
@@ -102,44 +143,167 @@ class PositionalEncoders:
     UNLATCH_CONFIRM_THRESHOLD = 2
 
     async def run_encoder(self) -> None:
-        unlatch_confirm_count = 0
+        """Poll SPI at the sampler's rate on the event loop."""
         while self._task:
             readings = self.read_spi()
+            interval = self.sampler.observe(readings, time.monotonic())
+            if readings and self.feed(readings, time.monotonic()):
+                continue   # just unlatched: read again at once
+            await asyncio.sleep(interval)
+
+    def _filter(self, readings: list) -> list:
+        return [axis.update(value) for axis, value in zip(self.filters, readings)]
+
+    def _handle_readings(self, readings: list, now: float) -> bool:
+        """Apply one filtered sample, read at monotonic time now, to the latch;
+        True if it just unlatched.
+
+        The latch has hysteresis: while unlatched, updated is set once the
+        reading has moved enter_steps from the last one published (and once
+        after each unlatch or reset_latch()); while latched, it takes a
+        move of more than latch_stickiness steps, on UNLATCH_CONFIRM_THRESHOLD
+        samples in a row, to unlatch. Both are measured the short way round.
+        updated is also set when a spin ends, even if the reading has barely
+        moved since the last one published, so the loop can latch there.
+        """
+        readings = [_ENCODER_RESOLUTION - readings[0], readings[1]]
+        spin_ended = self._track_velocity(readings, now)
+
+        if self.latch_stickiness is None:
+            published = self._published
+            moved = published is None or self._moved(readings, published) >= self.enter_steps
+            if moved or spin_ended:
+                self.latitude = readings[0]
+                self.longitude = readings[1]
+                self._published = readings
+                self._publish()
+            return False
 
+        self._published = None
+        if self._moved(readings, [self.latitude, self.longitude]) > self.latch_stickiness:
+            self._unlatch_confirm_count += 1
+            if self._unlatch_confirm_count >= self.UNLATCH_CONFIRM_THRESHOLD:
+                # Publish where it is now, not the old latch point.
+                self.latch_stickiness = None
+                self.latitude, self.longitude = readings
+                self._published = readings
+                self.unlatches += 1
+                self._publish()
+                self._unlatch_confirm_count = 0
+                return True
+        else:
+            self._unlatch_confirm_count = 0
+        return False
+
+    def _track_velocity(self, readings: list, now: float) -> bool:
+        """Update velocity from the move since the last sample; True if a spin just ended.
+
+        The instantaneous speed is smoothed with a _VELOCITY_SMOOTHING time
+        constant, so sensor flicker doesn't register as a spin and the
+        estimate falls back below spin_velocity ~0.2 s after the globe stops.
+        """
+        if self._last_sample is not None:
+            previous, then = self._last_sample
+            elapsed = now - then
+            if elapsed > 0:
+                speed = self._moved(readings, previous) / elapsed
+                weight = 1 - math.exp(-elapsed / _VELOCITY_SMOOTHING)
+                self.velocity += weight * (speed - self.velocity)
+        self._last_sample = (readings, now)
+
+        was_spinning, self._spinning = self._spinning, self.velocity > self.spin_velocity
+        if self._spinning and not was_spinning:
+            self.spins += 1
+        return was_spinning and not self._spinning
+
+    @staticmethod
+    def _moved(readings: list, origin: list) -> int:
+        return max(step_distance(a, b) for a, b in zip(readings, origin))
+
+    # ---------------------------------------------------------------------------
+    # Sampling thread (threaded=True)
+    # ---------------------------------------------------------------------------
+
+    def _sample_thread(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Read SPI on a fixed cadence, off the event loop, and post each
+        reading to the mailbox; the latch logic still runs on the loop."""
+        self._set_realtime()
+        deadline = time.monotonic()
+        while not self._stopping.is_set():
+            readings = self.read_spi()
+            now = time.monotonic()
+            interval = self.sampler.observe(readings, now)
             if readings:
-                readings[0] = _ENCODER_RESOLUTION - readings[0]
-
-                if self.latch_stickiness is None:
-                    self.latitude = readings[0]
-                    self.longitude = readings[1]
-                    self.updated.set()
-                else:
-                    lat_difference = abs(self.latitude - readings[0]) % _ENCODER_RESOLUTION
-                    lon_difference = abs(self.longitude - readings[1]) % _ENCODER_RESOLUTION
-
-                    if (
-                        lat_difference > self.latch_stickiness
-                        or lon_difference > self.latch_stickiness
-                    ):
-                        unlatch_confirm_count += 1
-                        if unlatch_confirm_count >= self.UNLATCH_CONFIRM_THRESHOLD:
-                            self.latch_stickiness = None
-                            self.updated.set()
-                            unlatch_confirm_count = 0
-                            continue
-                    else:
-                        unlatch_confirm_count = 0
-
-            await asyncio.sleep(0.05)
+                if self._mailbox is not None:
+                    self.coalesced += 1
+                self._mailbox = (self._filter(readings), now)
+                if not self._drain_pending:
+                    self._drain_pending = True
+                    loop.call_soon_threadsafe(self._drain_mailbox)
+            # Next deadline on the cadence; after an overrun, restart it from now.
+            deadline = max(deadline + interval, now)
+            self._stopping.wait(deadline - time.monotonic())
+
+    def _drain_mailbox(self) -> None:
+        self._drain_pending = False
+        sample, self._mailbox = self._mailbox, None
+        if sample is not None:
+            self._handle_readings(*sample)
+
+    def _set_realtime(self) -> None:
+        try:
+            # pid 0 is the calling thread, not the whole process.
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.thread_priority))
+        except (AttributeError, OSError) as e:
+            logging.info(
+                f"Encoder thread at normal priority: SCHED_FIFO not allowed ({e!r}); "
+                "it needs CAP_SYS_NICE or an rtprio limit"
+            )
+        else:
+            self.realtime = True
+
+    def _publish(self) -> None:
+        self.updates += 1
+        self.updated.set()
+
+    def stats(self) -> dict:
+        """The sampler's stats plus "updates", "unlatches", "spins", the thread's
+        "threaded", "realtime" and "coalesced", and the SPI reader's stats under "spi"."""
+        return {
+            **self.sampler.stats(),
+            "updates": self.updates,
+            "unlatches": self.unlatches,
+            "spins": self.spins,
+            "threaded": self.threaded,
+            "realtime": self.realtime,
+            "coalesced": self.coalesced,
+            "spi": self.spi.stats(),
+        }
 
     def start(self) -> None:
-        self.spi = spidev.SpiDev()
-        self._task = asyncio.create_task(self.run_encoder())
+        self.spi.open()
+        if self.threaded:
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._sample_thread,
+                args=(asyncio.get_running_loop(),),
+                name="encoder-sampler",
+                daemon=True,
+            )
+            self._thread.start()
+        else:
+            self._task = asyncio.create_task(self.run_encoder())
 
     async def stop(self) -> None:
+        if self._thread:
+            self._stopping.set()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
         if self._task:
             self._task.cancel()
             try:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        self.spi.close()
+        logging.info(f"Encoders: {self.stats()}")
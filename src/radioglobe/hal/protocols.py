@@ -8,7 +8,7 @@ satisfy these interfaces by shape alone.
 """
 
 import asyncio
-from typing import Optional, Protocol, runtime_checkable
+from typing import NamedTuple, Optional, Protocol, runtime_checkable
 
 from radioglobe.coordinates import Coordinate
 
@@ -39,6 +39,7 @@ class PositionalEncodersProtocol(HardwareComponent, Protocol):
     def get_readings(self) -> tuple: ...
     def latch(self, latitude: int, longitude: int, stickiness: int) -> None: ...
     def is_latched(self) -> bool: ...
+    def is_spinning(self) -> bool: ...
     def get_calibration(self) -> dict: ...
     def restore_calibration(self, state: dict) -> None: ...
 
@@ -72,11 +73,27 @@ class DisplayProtocol(HardwareComponent, Protocol):
     ) -> None: ...
 
 
+class AudioEvent(NamedTuple):
+    """One player state change, as queued on AudioPlayerProtocol.events.
+
+    kind is one of constants.AUDIO_*; url is the stream the event belongs
+    to (standby players report too, so consumers filter on it); value is
+    the buffer fill percentage for AUDIO_BUFFERING, otherwise None.
+    """
+
+    kind: str
+    url: Optional[str]
+    value: Optional[float] = None
+
+
 @runtime_checkable
 class AudioPlayerProtocol(HardwareComponent, Protocol):
     current_url: Optional[str]
+    events: "asyncio.Queue[AudioEvent]"
 
-    def play(self, url: str) -> None: ...
+    def play(self, url: str, station: Optional[str] = None) -> None: ...
+    def prefetch(self, urls: list, stations: Optional[list] = None) -> None: ...
     def change_volume(self, delta, min_volume: int = 10, max_volume: int = 100) -> int: ...
     def change_volume_level(self, level: int) -> int: ...
     def is_error(self) -> bool: ...
+    def progress(self) -> Optional[dict]: ...
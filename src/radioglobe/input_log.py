@@ -0,0 +1,199 @@
+"""Record the globe's raw input on the device and replay it offline.
+
+InputRecorder logs what the hardware modules read, with monotonic
+timestamps: each successful encoder sample (both raw positions, as
+read_spi() returns them, from PositionalEncoders), each dial detent
+(Dial), and each button's down and up edges (Button). It is enabled by
+RADIOGLOBE_INPUT_LOG=<path> and handed to them by the CLI.
+
+The log is a compact binary file: a _MAGIC header, then one fixed 9-byte
+_RECORD per event - kind, microseconds since the previous event, and two
+signed 16-bit values. A button's name is written once, as a _KIND_NAME
+record followed by its UTF-8 bytes, and later edges refer to it by index.
+A gap of over ~71 minutes between two events is shortened to that.
+
+InputReplayer drives the same events into stand-ins: encoder samples into
+anything with feed(readings, now) - FakePositionalEncoders, or a real
+PositionalEncoders that was never start()ed, for its filter, velocity and
+latch logic - detents into FakeDial.push_turn(), and edges into
+FakeButtonManager.inject_event() as "press" on the down edge and
+"short"/"long" on the up edge. Replay runs at the recorded pace, or as
+fast as the event loop allows, yielding once per event; the recorded
+timestamps are passed to feed() either way, so a replay is deterministic.
+"""
+
+import asyncio
+import logging
+import struct
+import threading
+import time
+from typing import NamedTuple, Optional
+
+_MAGIC = b"RGIN\x01"
+_RECORD = struct.Struct("<BIhh")   # kind, us since previous event, value a, value b
+_MAX_GAP_US = 0xFFFFFFFF
+
+KIND_ENCODER = 0        # a, b = raw latitude, longitude positions
+KIND_DIAL = 1           # a = +1/-1
+KIND_BUTTON_DOWN = 2    # a = button name index
+KIND_BUTTON_UP = 3      # a = button name index
+_KIND_NAME = 4          # a = name index, b = UTF-8 length; the name's bytes follow
+
+
+class InputEvent(NamedTuple):
+    time: float           # s since the first event
+    kind: int
+    a: int
+    b: int = 0
+    name: Optional[str] = None   # button events only
+
+
+class InputRecorder:
+    """Appends input events to a log file. Thread-safe: the encoders may
+    sample on their own thread (ENCODER_THREAD)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.records = 0
+        self.bytes = 0
+        self._file = None
+        self._names: dict = {}
+        self._previous: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        self._file = open(self.path, "wb")
+        self._file.write(_MAGIC)
+        self.bytes = len(_MAGIC)
+        logging.info(f"Recording input to {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logging.info(f"Input log: {self.stats()}")
+
+    def encoder(self, readings: list) -> None:
+        self._write(KIND_ENCODER, readings[0], readings[1])
+
+    def dial(self, direction: int) -> None:
+        self._write(KIND_DIAL, direction)
+
+    def button(self, name: str, down: bool) -> None:
+        self._write(KIND_BUTTON_DOWN if down else KIND_BUTTON_UP, name=name)
+
+    def _write(self, kind: int, a: int = 0, b: int = 0, name: Optional[str] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._file is None:
+                return
+            if name is not None:
+                a = self._name_index(name)
+            gap = 0 if self._previous is None else round((now - self._previous) * 1_000_000)
+            self._previous = now
+            self._file.write(_RECORD.pack(kind, min(gap, _MAX_GAP_US), a, b))
+            self.records += 1
+            self.bytes += _RECORD.size
+
+    def _name_index(self, name: str) -> int:
+        if name not in self._names:
+            encoded = name.encode()
+            self._names[name] = len(self._names)
+            self._file.write(_RECORD.pack(_KIND_NAME, 0, self._names[name], len(encoded)))
+            self._file.write(encoded)
+            self.bytes += _RECORD.size + len(encoded)
+        return self._names[name]
+
+    def stats(self) -> dict:
+        return {"records": self.records, "bytes": self.bytes}
+
+
+def read_log(path: str) -> list:
+    """Every InputEvent in a log written by InputRecorder, in order."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a RadioGlobe input log")
+    events = []
+    names: dict = {}
+    elapsed_us = 0
+    offset = len(_MAGIC)
+    while offset + _RECORD.size <= len(data):
+        kind, gap, a, b = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        if kind == _KIND_NAME:
+            names[a] = data[offset:offset + b].decode()
+            offset += b
+            continue
+        elapsed_us += gap
+        name = names.get(a) if kind in (KIND_BUTTON_DOWN, KIND_BUTTON_UP) else None
+        events.append(InputEvent(elapsed_us / 1_000_000, kind, a, b, name))
+    return events
+
+
+class InputReplayer:
+    """Drives recorded events into stand-in hardware; run() returns its stats.
+
+    Any of encoders/dial/buttons may be None to leave that input out.
+    realtime=False replays as fast as possible.
+    """
+
+    def __init__(
+        self,
+        events: list,
+        encoders=None,
+        dial=None,
+        buttons=None,
+        realtime: bool = True,
+        long_press_threshold: float = 1.0,
+    ) -> None:
+        self.events = events
+        self.encoders = encoders
+        self.dial = dial
+        self.buttons = buttons
+        self.realtime = realtime
+        self.long_press_threshold = long_press_threshold
+        self.counts = {"encoder": 0, "dial": 0, "button": 0}
+        self._pressed: dict = {}
+
+    async def run(self) -> dict:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for event in self.events:
+            if self.realtime:
+                await asyncio.sleep(max(0.0, started + event.time - loop.time()))
+            await self._apply(event)
+            if not self.realtime:
+                await asyncio.sleep(0)   # let the consumers react
+        return self.stats(loop.time() - started)
+
+    async def _apply(self, event: InputEvent) -> None:
+        if event.kind == KIND_ENCODER and self.encoders is not None:
+            self.encoders.feed([event.a, event.b], event.time)
+            self.counts["encoder"] += 1
+        elif event.kind == KIND_DIAL and self.dial is not None:
+            self.dial.push_turn(event.a)
+            self.counts["dial"] += 1
+        elif event.kind == KIND_BUTTON_DOWN and self.buttons is not None:
+            self._pressed[event.name] = event.time
+            await self.buttons.inject_event(event.name, "press")
+            self.counts["button"] += 1
+        elif event.kind == KIND_BUTTON_UP and self.buttons is not None:
+            pressed = self._pressed.pop(event.name, None)
+            if pressed is not None:
+                held = event.time - pressed
+                kind = "long" if held >= self.long_press_threshold else "short"
+                await self.buttons.inject_event(event.name, kind)
+
+    def stats(self, seconds: float) -> dict:
+        """{"events", "encoder", "dial", "button", "recorded_seconds", "seconds",
+        "events_per_second"}; button counts presses."""
+        events = sum(self.counts.values())
+        return {
+            "events": events,
+            **self.counts,
+            "recorded_seconds": self.events[-1].time if self.events else 0.0,
+            "seconds": seconds,
+            "events_per_second": events / seconds if seconds > 0 else 0.0,
+        }
@@ -3,11 +3,15 @@ import logging
 import subprocess
 from typing import Optional
 
+from radioglobe.bitrate import BitrateSelector
 from radioglobe.constants import (
-    MODE_CITY, MODE_STATION,
+    AUDIO_ENDED, AUDIO_ERROR, AUDIO_PLAYING, MODE_CITY, MODE_STATION,
     STATUS_CALIBRATE, STATUS_CALIBRATED, STATUS_CALIBRATING, STATUS_SHUTDOWN,
 )
 from radioglobe.coordinates import Coordinate
+from radioglobe.database import get_bitrate_ladders, get_stations_by_city
+from radioglobe.hal.audio_worker import AudioWorker
+from radioglobe.hal.pcm_tap import PcmTap
 from radioglobe.hal.protocols import (
     AudioPlayerProtocol,
     DialProtocol,
@@ -16,12 +20,24 @@ from radioglobe.hal.protocols import (
     RGBLedProtocol,
 )
 from radioglobe.hal.rgb_led import COLOUR_BLUE, COLOUR_GREEN, COLOUR_RED
+from radioglobe.input_log import InputRecorder
 from radioglobe.navigation import Navigator
+from radioglobe.net.dns import DnsCache, hosts_of
+from radioglobe.net.playlist import PlaylistResolver
+from radioglobe.net.probe import StationProber, rank_stations
+from radioglobe.net.relay import StreamRelay
+from radioglobe.net.scheduler import PRIORITY_NEXT, PRIORITY_PREFETCH, NetScheduler
 from radioglobe.radio_config import (
-    BRIEF_DISPLAY_DURATION, DEFAULT_VOLUME, FUZZINESS, LED_FLASH_DIAL, LED_FLASH_LONG,
-    LED_FLASH_SHORT, LOG_LEVEL, MESSAGE_DISPLAY_DURATION, STATE_CACHE_PATH, STICKINESS,
-    STREAM_CHECK_INTERVAL, VOLUME_OFF_LEVEL, VOLUME_ON_LEVEL, VOLUME_STEP,
+    BRIEF_DISPLAY_DURATION, DEAD_AIR_HOLD, DEAD_AIR_MIN_VOLUME, DEFAULT_VOLUME,
+    DNS_WARM_NEIGHBOURS, FUZZINESS,
+    LED_FLASH_DIAL, LED_FLASH_LONG, LED_FLASH_SHORT, MESSAGE_DISPLAY_DURATION,
+    PREBUFFER_DELAY, PREBUFFER_STANDBY_COUNT, PROBE_BUDGET, RECONNECT_ATTEMPTS,
+    RECONNECT_BACKOFF_BASE, RECONNECT_BACKOFF_MAX, STALL_TIMEOUT, STATE_CACHE_PATH,
+    STICKINESS, STREAM_CHECK_INTERVAL, VOLUME_OFF_LEVEL, VOLUME_ON_LEVEL, VOLUME_STEP,
+    WATCHDOG_INTERVAL, WATCHDOG_RECOVERED_AFTER,
 )
+from radioglobe.settle import SettleScheduler
+from radioglobe.watchdog import StallDetector, backoff_delay
 
 
 class App:
@@ -33,14 +49,61 @@ class App:
         display: DisplayProtocol,
         led: RGBLedProtocol,
         nav: Optional[Navigator] = None,
+        resolver: Optional[PlaylistResolver] = None,
+        prober: Optional[StationProber] = None,
+        settle: Optional[SettleScheduler] = None,
+        relay: Optional[StreamRelay] = None,
+        pcm_tap: Optional[PcmTap] = None,
+        dns: Optional[DnsCache] = None,
+        scheduler: Optional[NetScheduler] = None,
+        recorder: Optional[InputRecorder] = None,
     ):
         self.dial = dial
         self.audio_player = audio_player
+        # Every call into the player after start() goes through the worker
+        # thread, so a slow libvlc call never blocks the event loop.
+        self.audio = AudioWorker(audio_player)
         self.encoders = encoders
         self.display = display
         self.led = led
         self.nav = nav if nav is not None else Navigator()
+        self.resolver = resolver
+        self.prober = prober
+        self.relay = relay
+        self.dns = dns
+        # Background network jobs run under the selected city's scope, so
+        # leaving a city cancels them all at once.
+        self.scheduler = scheduler if scheduler is not None else NetScheduler()
+        self.pcm_tap = pcm_tap
+        # Logs the hardware's raw input for offline replay; see input_log.py.
+        self.recorder = recorder
+        self.dead_air = None
+        if pcm_tap is not None:
+            # Deferred: dead_air.py needs numpy, which only the deadair extra installs.
+            from radioglobe.dead_air import DeadAirDetector
+
+            self.dead_air = DeadAirDetector()
+        self.volume = DEFAULT_VOLUME
+        # Tier each multi-bitrate station plays at; see bitrate.py
+        self.bitrate = BitrateSelector(get_bitrate_ladders(self.nav.stations_info))
+        # Dial ticks update the display at once; the stream switch waits for this.
+        self.settle = settle if settle is not None else SettleScheduler()
         self._stream_task: Optional[asyncio.Task] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._resolve_task: Optional[asyncio.Task] = None
+        self._dns_task: Optional[asyncio.Task] = None
+        self._net_city: Optional[str] = None
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._watchdog_task: Optional[asyncio.Task] = None
+        self.watchdog_stats = {
+            "stalls": 0, "reconnects": 0, "step_downs": 0, "failovers": 0, "dead_air": 0,
+        }
+        self._dial_direction = 1
+        # City lookups and stream starts while the globe is turned; per-spin
+        # counts are logged as each spin ends. See _encoder_loop().
+        self.spin_stats = {"spins": 0, "lookups": 0, "skipped": 0, "aborted_starts": 0}
+        self._spin: Optional[dict] = None
+        self._city_starting = False
 
     def save_state(self, cache=STATE_CACHE_PATH):
         self.nav.save_state(self.encoders.get_calibration(), cache)
@@ -51,6 +114,12 @@ class App:
             return
         self.encoders.restore_calibration(encoder_state)
 
+    def _network_services(self) -> list:
+        """The optional network helpers App was given, in start order: the
+        DNS cache first, since the others connect through it."""
+        services = (self.dns, self.resolver, self.prober)
+        return [service for service in services if service is not None]
+
     # ---------------------------------------------------------------------------
     # Helpers
     # ---------------------------------------------------------------------------
@@ -68,55 +137,336 @@ class App:
         """Adjust volume by delta and briefly show the level on the display."""
         if not self.nav.state.is_complete():
             return
-        volume = self.audio_player.change_volume(delta)
-        await self._show_volume_briefly(volume)
+        self.volume = await self.audio.change_volume(delta)
+        await self._show_volume_briefly(self.volume)
 
     async def _update_volume_level(self, level):
         """Set volume to an absolute level and briefly show it on the display."""
         if not self.nav.state.is_complete():
             return
-        volume = self.audio_player.change_volume_level(level)
-        await self._show_volume_briefly(volume)
+        self.volume = await self.audio.change_volume_level(level)
+        await self._show_volume_briefly(self.volume)
+
+    def _stream_url(self, url: str) -> str:
+        """The URL to hand VLC for a station URL: its direct_url(), through
+        the local relay if there is one."""
+        url = self._direct_url(url)
+        if self.relay is not None:
+            url = self.relay.url_for(url)
+        return url
+
+    def _direct_url(self, url: str) -> str:
+        """The station's current bitrate tier's URL, or that one's cached
+        direct stream if known: what the station itself serves."""
+        url = self.bitrate.select(url)
+        if self.resolver is not None:
+            url = self.resolver.cached(url) or url
+        return url
 
     def _play_station(self) -> str:
         """Show and play self.nav.state.station; returns the URL played."""
         coords = self.nav.current_coords
         name, url = self.nav.state.station
         self.display.show_station(coords, self.nav.state.city, name)
-        self.audio_player.play(url)
+        stream_url = self._stream_url(url)
+        self.audio.play(stream_url, station=url)
+        self.bitrate.start_session(url, asyncio.get_running_loop().time())
         logging.info(f"🔊 Now playing: {name} ({self.nav.state.city})")
-        return url
+        self._start_city_jobs()
+        self._schedule_prefetch()
+        return stream_url
+
+    def _start_city_jobs(self):
+        """On a newly selected city, cancel the previous city's background
+        network jobs and start this one's: DNS warming and playlist resolution."""
+        city = self.nav.state.city
+        if city == self._net_city:
+            return
+        if self._net_city is not None:
+            self.scheduler.cancel(self._net_city)
+        self._net_city = city
+        self._warm_city_hosts(city)
+        self._resolve_city_stations(city)
+
+    def _resolve_city_stations(self, city: str):
+        """Resolve every station of the city, at its current tier, in the background."""
+        if self.resolver is None:
+            return
+        urls = [self.bitrate.select(url) for _, url in self.nav.state.stations]
+        self._resolve_task = self.scheduler.spawn(
+            self.resolver.resolve_many(urls, scope=city), scope=city
+        )
+
+    def _warm_city_hosts(self, city: str):
+        """Resolve the hostnames of the city's stations into the DNS cache -
+        then, at lower priority, those of the cities either side of it,
+        which the dial reaches next."""
+        if self.dns is None:
+            return
+        hosts = self._station_hosts(self.nav.state.stations)
+        neighbours = []
+        for other in self.nav.adjacent_cities(DNS_WARM_NEIGHBOURS):
+            neighbours += get_stations_by_city(self.nav.stations_info, other)
+        neighbour_hosts = [host for host in self._station_hosts(neighbours) if host not in hosts]
+        self._dns_task = self.scheduler.spawn(
+            self._warm_hosts(city, hosts, neighbour_hosts), scope=city
+        )
+
+    def _station_hosts(self, stations: list) -> list:
+        """Hostnames the stations' current tiers and their resolved streams connect to."""
+        urls = []
+        for _, url in stations:
+            url = self.bitrate.select(url)
+            direct = self.resolver.cached(url) if self.resolver is not None else None
+            urls += [url, direct] if direct else [url]
+        return hosts_of(urls)
+
+    async def _warm_hosts(self, city: str, hosts: list, neighbour_hosts: list):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        resolved = await self.dns.warm(hosts, scope=city, priority=PRIORITY_NEXT)
+        logging.debug(
+            f"DNS warmed {resolved}/{len(hosts)} hosts for {city} in "
+            f"{(loop.time() - started) * 1000:.0f} ms: {self.dns.stats()}"
+        )
+        await self.dns.warm(neighbour_hosts, scope=city, priority=PRIORITY_PREFETCH)
+
+    def _schedule_prefetch(self):
+        """Refill the audio player's standbys once the new stream has had a head start."""
+        if self._prefetch_task and not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+        self._prefetch_task = asyncio.create_task(self._prefetch_adjacent())
+
+    async def _prefetch_adjacent(self):
+        """Pre-buffer the stations either side of the current one, dial direction first."""
+        await asyncio.sleep(PREBUFFER_DELAY)
+        adjacent = self.nav.adjacent_stations(PREBUFFER_STANDBY_COUNT, self._dial_direction)
+        stations = [url for _, url in adjacent]
+        self.audio.prefetch([self._stream_url(url) for url in stations], stations=stations)
+
+    async def _await_stream_outcome(self, url: str) -> bool:
+        """Wait for url to start playing; returns False if it failed instead.
+
+        Reacts to the player's AUDIO_PLAYING/AUDIO_ERROR/AUDIO_ENDED events
+        as soon as they arrive. A stream that never settles within
+        STREAM_CHECK_INTERVAL (e.g. VLC cycling Opening/Buffering on an
+        unreachable host under --input-repeat=-1) is judged by is_error().
+        """
+        # The grace period starts once the player has actually received the play.
+        await self.audio.wait_idle()
+        if not await self.audio.is_error():
+            return True  # already playing, e.g. a pre-buffered standby
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_CHECK_INTERVAL
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    self.audio.events.get(), max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                return not await self.audio.is_error()
+            if event.url != url:
+                continue  # a previous stream's or a standby's event
+            if event.kind == AUDIO_PLAYING:
+                return True
+            if event.kind in (AUDIO_ERROR, AUDIO_ENDED):
+                return False
 
     async def _monitor_stream(self, expected_url: str):
-        """After a 3 s grace period, remove failed stations and try the next.
+        """Remove failed stations and try the next, as soon as the player reports failure.
 
         Loops until a station plays without error, all stations have been
-        removed, or the user selects a different station.
+        removed, or the user selects a different station. A station that
+        plays is handed on to the stall watchdog for as long as it plays.
         """
         while self.nav.state.stations:
-            await asyncio.sleep(STREAM_CHECK_INTERVAL)
+            playing = await self._await_stream_outcome(expected_url)
 
             # User moved to a different station — stop watching
-            if self.audio_player.current_url != expected_url:
+            if self.audio.current_url != expected_url:
                 return
 
-            if not self.audio_player.is_error():
-                return  # playing fine
+            if playing:
+                self._start_watchdog(expected_url)
+                return
 
             if not self.nav.state.city:
                 return
 
             logging.debug(f"⚠️ Stream error: {expected_url}")
-            asyncio.create_task(self.led.flash(COLOUR_RED, LED_FLASH_LONG))
-            self.nav.remove_failed_station()
-            if not self.nav.state.station:
+            expected_url = self._fail_current_station()
+            if expected_url is None:
                 break
-            expected_url = self._play_station()
 
         logging.debug("⚠️ All stations failed for this city")
 
+    def _fail_current_station(self) -> Optional[str]:
+        """Flag the current station as failed, drop it from the session list
+        and play the next one; returns the URL played, or None if none are left."""
+        asyncio.create_task(self.led.flash(COLOUR_RED, LED_FLASH_LONG))
+        if self.resolver is not None and self.nav.state.station:
+            # The tier URL is the one whose resolution was played.
+            self.resolver.invalidate(self.bitrate.select(self.nav.state.station[1]))
+        self.nav.remove_failed_station()
+        if not self.nav.state.station:
+            return None
+        return self._play_station()
+
+    def _start_watchdog(self, url: str):
+        self._stop_watchdog()
+        self._watchdog_task = asyncio.create_task(self._watch_stream(url))
+
+    def _stop_watchdog(self):
+        task = self._watchdog_task
+        # The watchdog itself starts the next station's monitor when it fails over.
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
+    def _reset_dead_air(self):
+        if self.dead_air is not None:
+            self.pcm_tap.drain()  # audio from before the (re)connect
+            self.dead_air.reset()
+
+    def _check_dead_air(self, now: float) -> Optional[str]:
+        """Feed the tap's new PCM to the dead-air detector; the kind of dead
+        air the stream has been sending for DEAD_AIR_HOLD, else None."""
+        if self.dead_air is None:
+            return None
+        if self.volume < DEAD_AIR_MIN_VOLUME:
+            # Muted or nearly: the tap hears (next to) silence whatever the station sends.
+            self._reset_dead_air()
+            return None
+        for block in self.pcm_tap.drain():
+            self.dead_air.feed(block, now, self.volume)
+        return self.dead_air.dead(now)
+
+    async def _watch_stream(self, url: str):
+        """Watch a playing stream until the user moves on, reconnecting it on stalls.
+
+        A stall (no demux progress or a dry buffer for STALL_TIMEOUT, or an
+        error/end event) is retried with capped, jittered exponential
+        backoff; only after RECONNECT_ATTEMPTS failed reconnects in a row
+        does the station count as failed and the next one play. A station
+        with bitrate variants first steps down a tier instead, on a stall or
+        when its throughput can't keep up with its bitrate. With a PCM
+        tap, a station sending only dead air (silence, a bare tone or hiss)
+        for DEAD_AIR_HOLD is skipped straight away - reconnecting won't help.
+        """
+        loop = asyncio.get_running_loop()
+        station_url = self.nav.state.station[1] if self.nav.state.station else url
+        detector = StallDetector(STALL_TIMEOUT)
+        detector.reset(loop.time())
+        healthy_since = loop.time()
+        attempt = 0
+        has_stats = False
+        self._reset_dead_air()
+        while True:
+            try:
+                event = await asyncio.wait_for(self.audio.events.get(), WATCHDOG_INTERVAL)
+            except asyncio.TimeoutError:
+                event = None
+            if self.audio.current_url != url:
+                return
+            now = loop.time()
+            if event is not None and event.url == url:
+                detector.observe_event(event, now)
+            stats = await self.audio.progress()
+            has_stats = has_stats or stats is not None
+            detector.observe_stats(stats, now)
+            if stats is not None:
+                self.bitrate.observe(stats.get("read_bytes"), now)
+            dead_air = self._check_dead_air(now)
+            if dead_air is not None:
+                logging.warning(f"⚠️ {dead_air.capitalize()} for {DEAD_AIR_HOLD}s, skipping: {url}")
+                self.watchdog_stats["dead_air"] += 1
+                next_url = self._fail_current_station()
+                if next_url is not None:
+                    self._start_monitor_stream(next_url)
+                return
+            too_slow = self.bitrate.too_slow(station_url, now)
+            if not too_slow and not detector.stalled(now, track_bytes=has_stats):
+                self.bitrate.healthy(station_url, now)
+                if attempt and now - healthy_since >= WATCHDOG_RECOVERED_AFTER:
+                    attempt = 0
+                continue
+
+            if self.bitrate.step_down(station_url, now):
+                # A lower tier is a likelier fix than the same URL again.
+                self.watchdog_stats["step_downs"] += 1
+                url = self._stream_url(station_url)
+                reason = "too slow" if too_slow else "stalled"
+                logging.info(f"⚠️ Stream {reason}, stepping down to {url}")
+                self.audio.play(url, station=station_url)
+            else:
+                attempt += 1
+                self.watchdog_stats["stalls"] += 1
+                if attempt > RECONNECT_ATTEMPTS:
+                    logging.warning(
+                        f"⚠️ Stream still stalled after {RECONNECT_ATTEMPTS} reconnects: {url}"
+                    )
+                    self.watchdog_stats["failovers"] += 1
+                    next_url = self._fail_current_station()
+                    if next_url is not None:
+                        self._start_monitor_stream(next_url)
+                    return
+                delay = backoff_delay(attempt, RECONNECT_BACKOFF_BASE, RECONNECT_BACKOFF_MAX)
+                logging.info(
+                    f"⚠️ Stream stalled, reconnecting in {delay:.1f}s "
+                    f"({attempt}/{RECONNECT_ATTEMPTS}, {detector.input_bitrate} in-bitrate): {url}"
+                )
+                await asyncio.sleep(delay)
+                if self.audio.current_url != url:
+                    return
+                self.audio.play(url, station=station_url)
+                self.watchdog_stats["reconnects"] += 1
+            playing = await self._await_stream_outcome(url)
+            if self.audio.current_url != url:
+                return
+            detector.reset(loop.time())
+            healthy_since = loop.time()
+            self._reset_dead_air()
+            if not playing:
+                detector.fail()
+
+    def _start_city_playback(self):
+        """Start playing a newly selected city, probing its stations first if a prober is set."""
+        self._cancel_probe()
+        self._start_city_jobs()
+        if self.prober is None:
+            self._start_monitor_stream(self._play_station())
+            return
+        # The previous city's monitor must not act on the new city's station list.
+        self._stop_watchdog()
+        if self._stream_task and not self._stream_task.done():
+            self._stream_task.cancel()
+        self._probe_task = self.scheduler.spawn(self._probe_and_play(), scope=self.nav.state.city)
+
+    async def _probe_and_play(self):
+        """Probe every station of the selected city for up to PROBE_BUDGET, then
+        play them fastest-first, with dead ones last."""
+        self.display.show_station(self.nav.current_coords, self.nav.state.city, "")
+        # Probe the stations themselves: through the relay, a probe would
+        # open (and time) a relay upstream instead.
+        probe_urls = {self._direct_url(url): url for _, url in self.nav.state.stations}
+        results = await self.prober.probe_all(
+            list(probe_urls), PROBE_BUDGET, scope=self.nav.state.city, priority=PRIORITY_NEXT
+        )
+        ranked = rank_stations(
+            self.nav.state.stations, {probe_urls[url]: result for url, result in results.items()}
+        )
+        answered = sum(result.ok for result in results.values())
+        logging.debug(f"Probed {len(results)}/{len(probe_urls)} stations, {answered} answered")
+        self.nav.reorder_stations(ranked)
+        self._start_monitor_stream(self._play_station())
+
+    def _cancel_probe(self):
+        """Abandon an in-flight city probe, e.g. because the user moved on."""
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+
     def _start_monitor_stream(self, url: str):
-        """Cancel any running stream monitor and start a fresh one for url."""
+        """Cancel any running stream monitor/watchdog and start a fresh monitor for url."""
+        self._stop_watchdog()
         if self._stream_task and not self._stream_task.done():
             self._stream_task.cancel()
         self._stream_task = asyncio.create_task(self._monitor_stream(url))
@@ -125,17 +475,50 @@ class App:
     # Event-driven loops
     # ---------------------------------------------------------------------------
 
+    def _count_spin(self, key: str):
+        self.spin_stats[key] += 1
+        if self._spin is not None:
+            self._spin[key] += 1
+
+    def _city_start_pending(self) -> bool:
+        """True if the last city the encoders latched is still probing or opening its stream."""
+        return self._city_starting and any(
+            task and not task.done() for task in (self._probe_task, self._stream_task)
+        )
+
     async def _encoder_loop(self):
-        """Wake on each encoder update and handle city latching."""
+        """Wake on each encoder update and handle city latching.
+
+        While the globe is spinning, updates are skipped without a city
+        lookup, so cities the reticule merely passes over are never latched
+        or played; the encoders publish once more as the spin ends, and the
+        lookup and latch happen there.
+        """
         while True:
             await self.encoders.updated.wait()
             self.encoders.updated.clear()
 
             if self.encoders.is_latched():
                 continue
+            spinning = self.encoders.is_spinning()
+            if spinning and self._spin is None:
+                self._spin = {"lookups": 0, "skipped": 0, "aborted_starts": 0}
+                self.spin_stats["spins"] += 1
+            if self._city_start_pending():
+                self._count_spin("aborted_starts")
+            self._city_starting = False
+            self._cancel_probe()
+            self.settle.cancel()
+            if spinning:
+                self._count_spin("skipped")
+                continue
 
             coords = self.encoders.get_readings()
             cities = self.nav.refresh_nearby_cities(coords)
+            self._count_spin("lookups")
+            if self._spin is not None:
+                logging.debug(f"🌍 Spin ended: {self._spin}")
+                self._spin = None
 
             if cities:
                 logging.debug(f"latch check: {len(cities)} nearby cities")
@@ -151,10 +534,15 @@ class App:
                     f"📻 Tuning to: city_idx:{self.nav.state.city_idx} "
                     f"{self.nav.state.city} {self.nav.state.station}"
                 )
-                self._start_monitor_stream(self._play_station())
+                self._start_city_playback()
+                self._city_starting = True
 
     async def _dial_loop(self):
-        """Wake on each dial movement and handle station/city navigation."""
+        """Wake on each dial movement and handle station/city navigation.
+
+        The display and LED follow every detent; switching the stream is
+        left to self.settle, so a fast scroll only ever plays where it stops.
+        """
         while True:
             direction = await self.dial.queue.get()
             if not self.nav.state.is_complete():
@@ -163,14 +551,35 @@ class App:
             logging.debug(
                 f"↪️ Dial turned: {'right' if direction > 0 else 'left'} dir:{direction}"
             )
+            self._dial_direction = direction
+            self._cancel_probe()
             if self.nav.state.mode == MODE_STATION:
                 self.nav.next_station(direction)
+                commit = self._commit_station
             elif self.nav.state.mode == MODE_CITY:
                 if not self.nav.next_city_and_select_station(direction):
                     logging.warning(f"No stations for {self.nav.state.city!r} — keeping previous station")
                     continue
+                commit = self._start_city_playback
+            else:
+                continue
 
-            self._start_monitor_stream(self._play_station())
+            # Stations scrolled past must not be monitored (or failed) on
+            # the old stream's behalf, nor have neighbours pre-buffered.
+            self._cancel_stream_tasks()
+            self.display.show_station(
+                self.nav.current_coords, self.nav.state.city, self.nav.state.station[0]
+            )
+            self.settle.tick(commit)
+
+    def _commit_station(self):
+        """Play the station the dial settled on."""
+        self._start_monitor_stream(self._play_station())
+
+    def _cancel_stream_tasks(self):
+        for task in (self._stream_task, self._watchdog_task, self._prefetch_task):
+            if task and not task.done():
+                task.cancel()
 
     # ---------------------------------------------------------------------------
     # Button handlers
@@ -245,18 +654,28 @@ class App:
         # require evdev unless run() is actually called.
         from radioglobe.hal.buttons import ButtonCallbacks, create_button_manager
 
+        if self.recorder is not None:
+            self.recorder.open()
         self.dial.start()
         self.encoders.start()
         self.display.start()
         self.led.start()
         self.audio_player.start()
-        self.audio_player.change_volume_level(DEFAULT_VOLUME)
+        self.audio.start()
+        self.audio.change_volume_level(DEFAULT_VOLUME)
+        for service in self._network_services():
+            service.start()
+        if self.relay is not None:
+            await self.relay.start()
+        if self.pcm_tap is not None:
+            self.pcm_tap.start()
 
         button_manager = create_button_manager(
             jog=ButtonCallbacks(short_cb=self._handle_short_jog, press_cb=self._on_jog_press),
             top=ButtonCallbacks(short_cb=self._handle_short_top, long_cb=self._handle_long_top, press_cb=self._on_sound_press),
             mid=ButtonCallbacks(short_cb=self._handle_short_mid, long_cb=self._handle_long_mid, press_cb=self._on_mid_press),
             bottom=ButtonCallbacks(short_cb=self._handle_short_bottom, long_cb=self._handle_long_bottom, press_cb=self._on_sound_press),
+            recorder=self.recorder,
         )
         button_manager.start()
         asyncio.create_task(button_manager.handle_events())
@@ -306,22 +725,32 @@ class App:
             if dial_task is not None:
                 dial_task.cancel()
         finally:
-            if self._stream_task and not self._stream_task.done():
-                self._stream_task.cancel()
+            self.settle.cancel()
+            background = (
+                self._stream_task, self._watchdog_task, self._prefetch_task,
+                self._resolve_task, self._probe_task, self._dns_task,
+            )
+            for task in background:
+                if task and not task.done():
+                    task.cancel()
+            self.bitrate.end_session(asyncio.get_running_loop().time())
+            if self.relay is not None:
+                await self.relay.stop()
+            if self.pcm_tap is not None:
+                await self.pcm_tap.stop()
+            for service in reversed(self._network_services()):
+                await service.stop()
             # Reverse of the start order above.
-            for hw in [button_manager, self.audio_player, self.led, self.display, self.encoders, self.dial]:
+            hardware = [
+                button_manager, self.audio, self.led, self.display, self.encoders, self.dial,
+            ]
+            for hw in hardware:
                 await hw.stop()
+            if self.recorder is not None:
+                self.recorder.close()
 
 
 if __name__ == "__main__":
-    from radioglobe.hal.factory import build_hardware
-
-    logging.basicConfig(
-        format="%(asctime)s %(levelname)s: %(message)s",
-        datefmt="%H:%M:%S",
-        level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
-    )
-
-    logging.info("Starting RadioGlobe...")
+    from radioglobe.cli import main
 
-    asyncio.run(App(*build_hardware()).run())
+    main()
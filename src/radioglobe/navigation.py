@@ -116,6 +116,41 @@ class Navigator:
         self.state.station = self.state.stations[self.state.station_idx]
         logging.debug(f"📻 Tuning to: station_idx:{self.state.station_idx} {self.state.station}")
 
+    def adjacent_stations(self, count: int, direction: int = 1) -> list:
+        """Stations either side of the current one, nearest-first, for pre-buffering.
+
+        Alternates between the dial direction and the opposite one
+        (+1, -1, +2, -2, ... for direction=1), skipping the current station
+        and any duplicates, and stops after `count` entries.
+        """
+        stations = self.state.stations
+        if not stations or count <= 0:
+            return []
+        step = 1 if direction >= 0 else -1
+        adjacent = []
+        for distance in range(1, len(stations)):
+            for offset in (step * distance, -step * distance):
+                station = stations[(self.state.station_idx + offset) % len(stations)]
+                if station != self.state.station and station not in adjacent:
+                    adjacent.append(station)
+                if len(adjacent) >= count:
+                    return adjacent
+        return adjacent
+
+    def adjacent_cities(self, count: int) -> list:
+        """Up to `count` cities either side of the current one in the nearby
+        list (+1, -1, +2, -2, ...), skipping it and duplicates, for DNS warming."""
+        cities = self.state.cities
+        if not cities or count <= 0:
+            return []
+        adjacent = []
+        for distance in range(1, count + 1):
+            for offset in (distance, -distance):
+                city = cities[(self.state.city_idx + offset) % len(cities)]
+                if city != self.state.city and city not in adjacent:
+                    adjacent.append(city)
+        return adjacent
+
     def next_city(self, direction):
         """Navigate to the next or previous city."""
         if not self.state.cities:
@@ -153,6 +188,14 @@ class Navigator:
         self.state.station_idx = self.state.station_idx % len(self.state.stations)
         self.state.station = self.state.stations[self.state.station_idx]
 
+    def reorder_stations(self, stations: list) -> bool:
+        """Replace the session station list with a reordering of it (e.g. by
+        probe results) and select its new first station.
+
+        Returns False (and clears the current station) if the list is empty.
+        """
+        return self.state.select_station(stations)
+
     def refresh_nearby_cities(self, coords: tuple) -> list:
         """Recompute and store the cities in the search zone around coords."""
         self.state.cities = self.find_cities_near(coords)
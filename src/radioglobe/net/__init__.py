@@ -0,0 +1,24 @@
+"""Network helpers that run alongside playback: nothing here touches hardware.
+
+Every module here uses aiohttp (a core dependency), so unlike radioglobe.hal
+there is no deferred-import factory - importing radioglobe.net is always safe.
+"""
+
+from radioglobe.net.dns import DnsCache, hosts_of
+from radioglobe.net.playlist import PlaylistResolver, parse_playlist
+from radioglobe.net.probe import ProbeResult, StationProber, rank_stations
+from radioglobe.net.relay import RingBuffer, StreamRelay
+from radioglobe.net.scheduler import NetScheduler
+
+__all__ = [
+    "DnsCache",
+    "NetScheduler",
+    "PlaylistResolver",
+    "ProbeResult",
+    "RingBuffer",
+    "StationProber",
+    "StreamRelay",
+    "hosts_of",
+    "parse_playlist",
+    "rank_stations",
+]
@@ -0,0 +1,185 @@
+"""A shared, pre-warmed DNS cache for the network helpers' aiohttp sessions.
+
+The first connection to each station host pays for a DNS lookup - often
+hundreds of milliseconds on a home router - and a city's stations mostly
+share a handful of hosts (lstn.lv, media-ice.musicradio.com, ...). DnsCache
+is an aiohttp resolver that keeps answers for DNS_CACHE_TTL seconds and
+shares them between every session connecting through it (PlaylistResolver,
+StationProber, StreamRelay), and warm() resolves a batch of hosts
+concurrently so App can look up a city's hosts the moment it's selected,
+before the probes and the relay need them.
+
+Concurrent lookups of the same host share one query. Lookups queue by
+priority for one of max_concurrency DNS slots of their own, not for the
+shared scheduler's connection slots: the connections asking for an address
+already hold those, and a lookup queued behind them would never run.
+warm() still runs as scheduler jobs, so a city's scope cancels it. stats()
+reports hits, misses and the mean lookup time a hit saved.
+
+VLC resolves hosts itself, so a station VLC plays directly doesn't use this
+cache; one played through the relay does.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+
+from ..radio_config import DNS_CACHE_TTL, DNS_WARM_CONCURRENCY
+from .scheduler import PRIORITY_LIVE, PRIORITY_PREFETCH, NetScheduler
+
+
+def hosts_of(urls: Iterable[str]) -> list:
+    """The distinct hostnames of urls, in first-seen order, skipping IP literals."""
+    hosts = {}
+    for url in urls:
+        host = urlsplit(url).hostname
+        if not host:
+            continue
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            hosts[host] = None
+    return list(hosts)
+
+
+class DnsCache(AbstractResolver):
+    """TTL cache in front of aiohttp's default resolver.
+
+    start()/stop() follow PlaylistResolver's: constructing one does no I/O,
+    start() creates the underlying resolver and needs a running loop. It is
+    passed to each TCPConnector as `resolver=`, which never closes a
+    resolver it was given, so one instance serves every session.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DNS_CACHE_TTL,
+        max_concurrency: int = DNS_WARM_CONCURRENCY,
+        resolver: Optional[AbstractResolver] = None,
+        scheduler: Optional[NetScheduler] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler if scheduler is not None else NetScheduler()
+        # Priority-ordered DNS query slots, apart from the connection slots
+        self._lookups = NetScheduler(max_concurrency)
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0      # lookups that joined one already in flight
+        self.failures = 0
+        self._lookup_seconds = 0.0
+        self._resolver = resolver
+        self._owns_resolver = resolver is None
+        # (host, family) -> (aiohttp ResolveResults for port 0, monotonic expiry)
+        self._cache: dict = {}
+        self._inflight: dict = {}   # (host, family) -> lookup task
+
+    def start(self) -> None:
+        if self._resolver is None:
+            self._resolver = DefaultResolver()
+
+    async def stop(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
+        self._inflight.clear()
+        if self._owns_resolver and self._resolver is not None:
+            await self._resolver.close()
+            self._resolver = None
+
+    async def close(self) -> None:
+        """AbstractResolver's hook; connectors don't own this cache, so it's a no-op."""
+
+    # ---------------------------------------------------------------------------
+    # Resolution
+    # ---------------------------------------------------------------------------
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list:
+        """aiohttp's resolver interface: host's addresses, from the cache if fresh.
+
+        Looked up at PRIORITY_LIVE, ahead of any queued warm(): the
+        connection asking is already holding a scheduler slot.
+        """
+        return await self._resolve(host, port, family, PRIORITY_LIVE)
+
+    async def _resolve(self, host: str, port: int, family: int, priority: int) -> list:
+        key = (host, family)
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.hits += 1
+            results = entry[0]
+        else:
+            self._cache.pop(key, None)
+            task = self._inflight.get(key)
+            if task is None:
+                self.misses += 1
+                task = asyncio.create_task(self._lookup(host, family, priority))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._lookup_done(key, done))
+            else:
+                self.shared += 1
+            # A cancelled caller mustn't cancel a lookup others are waiting on.
+            results = await asyncio.shield(task)
+        return [{**result, "port": port} for result in results]
+
+    async def warm(
+        self,
+        hosts: Iterable[str],
+        family: int = socket.AF_UNSPEC,
+        scope=None,
+        priority: int = PRIORITY_PREFETCH,
+    ) -> int:
+        """Resolve hosts concurrently into the cache, as scheduler jobs under
+        scope; returns how many resolved.
+
+        family defaults to the one TCPConnector asks for, so warmed entries
+        are the ones the sessions look up.
+        """
+        hosts = list(dict.fromkeys(hosts))
+        jobs = [
+            self.scheduler.spawn(self._resolve(host, 0, family, priority), scope) for host in hosts
+        ]
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for host, result in zip(hosts, results):
+            if isinstance(result, Exception):
+                logging.debug(f"DNS warm failed for {host}: {result!r}")
+        return sum(not isinstance(result, BaseException) for result in results)
+
+    def stats(self) -> dict:
+        """{"hosts", "hits", "misses", "shared", "failures", "lookup_ms"}; lookup_ms is
+        the mean time of a real lookup, i.e. roughly what each hit saved."""
+        lookups = self.misses - self.failures
+        return {
+            "hosts": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "failures": self.failures,
+            "lookup_ms": self._lookup_seconds / lookups * 1000 if lookups > 0 else None,
+        }
+
+    async def _lookup(self, host: str, family: int, priority: int) -> list:
+        async with self._lookups.slot(priority):
+            started = time.monotonic()
+            try:
+                results = await self._resolver.resolve(host, 0, family)
+            except OSError:
+                self.failures += 1
+                raise
+            self._lookup_seconds += time.monotonic() - started
+        self._cache[(host, family)] = (results, time.monotonic() + self.ttl)
+        return results
+
+    def _lookup_done(self, key: tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, so an unawaited failure isn't logged as lost
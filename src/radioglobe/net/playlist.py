@@ -0,0 +1,248 @@
+"""Resolve playlist and redirector station URLs to the final stream URL.
+
+Many stations.json URLs are .pls/.m3u/.m3u8 playlists or redirectors
+(e.g. lstn.lv/bbc.m3u8?...) that VLC has to fetch and parse on every play
+before any audio arrives. PlaylistResolver does that work ahead of time on a
+shared aiohttp session and keeps the answers in a persistent TTL cache, so
+App can hand VLC a direct URL whenever one is already known.
+
+HLS is the exception: an HLS playlist *is* the stream as far as VLC is
+concerned, so it's resolved only as far as its final (post-redirect) URL.
+"""
+
+import asyncio
+import configparser
+import json
+import logging
+import os
+import time
+from typing import Optional
+from urllib.parse import urljoin
+
+import aiohttp
+
+from ..radio_config import (
+    PLAYLIST_CACHE_PATH,
+    PLAYLIST_CACHE_TTL,
+    PLAYLIST_RESOLVE_CONCURRENCY,
+    PLAYLIST_RESOLVE_TIMEOUT,
+)
+from .dns import DnsCache
+from .scheduler import PRIORITY_PREFETCH, NetScheduler
+
+_PLAYLIST_CONTENT_TYPES = (
+    "audio/x-scpls",
+    "audio/scpls",
+    "audio/x-mpegurl",
+    "audio/mpegurl",
+    "application/x-mpegurl",
+    "application/vnd.apple.mpegurl",
+    "application/pls+xml",
+)
+_PLAYLIST_EXTENSIONS = (".pls", ".m3u", ".m3u8")
+
+# Playlists are tiny; anything bigger than this is a stream, not a playlist.
+MAX_PLAYLIST_BYTES = 16 * 1024
+
+# Playlist -> playlist nesting seen in the wild is one level deep at most.
+MAX_PLAYLIST_DEPTH = 3
+
+
+def is_hls(text: str) -> bool:
+    """Whether a fetched .m3u8 body is an HLS playlist rather than a plain m3u list."""
+    return "#EXT-X-" in text
+
+
+def decode_playlist(body: bytes, charset: Optional[str]) -> str:
+    """A playlist body as text, in its declared charset if Python knows it, else UTF-8."""
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def parse_playlist(text: str, base_url: str = "") -> list[str]:
+    """Return the entry URLs of a .pls or .m3u playlist body, in order.
+
+    Relative entries are resolved against base_url. Returns [] for an
+    unrecognised or empty body.
+    """
+    stripped = text.lstrip("﻿").strip()
+    if stripped.lower().startswith("[playlist]"):
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        try:
+            parser.read_string(stripped)
+        except configparser.Error:
+            return []
+        section = next((s for s in parser.sections() if s.lower() == "playlist"), None)
+        if section is None:
+            return []
+        entries = sorted(
+            (int(key[4:]), value.strip())
+            for key, value in parser.items(section)
+            if key.startswith("file") and key[4:].isdigit()
+        )
+        return [urljoin(base_url, value) for _, value in entries if value]
+
+    return [
+        urljoin(base_url, line.strip())
+        for line in stripped.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def looks_like_playlist(url: str, content_type: str) -> bool:
+    """Whether a response with this final URL and Content-Type is a playlist to parse."""
+    path = url.split("?", 1)[0].lower()
+    return content_type in _PLAYLIST_CONTENT_TYPES or path.endswith(_PLAYLIST_EXTENSIONS)
+
+
+class PlaylistResolver:
+    """Follow playlists and redirects to a direct stream URL, with a TTL cache.
+
+    start()/stop() mirror the hardware components' lifecycle: constructing
+    a resolver does no I/O; start() loads the cache and opens the session
+    (it needs a running event loop), stop() closes the session and saves
+    the cache.
+    """
+
+    def __init__(
+        self,
+        cache_path: str = PLAYLIST_CACHE_PATH,
+        ttl: float = PLAYLIST_CACHE_TTL,
+        max_concurrency: int = PLAYLIST_RESOLVE_CONCURRENCY,
+        timeout: float = PLAYLIST_RESOLVE_TIMEOUT,
+        dns: Optional[DnsCache] = None,
+        scheduler: Optional[NetScheduler] = None,
+    ) -> None:
+        self.cache_path = cache_path
+        self.dns = dns
+        self.scheduler = scheduler if scheduler is not None else NetScheduler(max_concurrency)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        # station URL -> (resolved URL, wall-clock expiry); wall-clock rather
+        # than monotonic since the cache outlives the process.
+        self._cache: dict = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._dirty = False
+
+    def start(self) -> None:
+        self.load()
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(
+                limit=self.max_concurrency, resolver=self.dns, use_dns_cache=self.dns is None
+            ),
+        )
+
+    async def stop(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.save()
+
+    # ---------------------------------------------------------------------------
+    # Cache
+    # ---------------------------------------------------------------------------
+
+    def cached(self, url: str) -> Optional[str]:
+        """The cached stream URL for url, or None if unknown or expired."""
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        resolved, expires = entry
+        if expires < time.time():
+            del self._cache[url]
+            self._dirty = True
+            return None
+        return resolved
+
+    def invalidate(self, url: str) -> None:
+        """Forget url's cached answer, e.g. after the resolved stream failed."""
+        if self._cache.pop(url, None) is not None:
+            self._dirty = True
+
+    def load(self) -> None:
+        path = os.path.expanduser(self.cache_path)
+        try:
+            with open(path, "r") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable playlist cache {path}: {e}")
+            return
+        now = time.time()
+        self._cache = {
+            url: (resolved, expires)
+            for url, (resolved, expires) in raw.items()
+            if expires >= now
+        }
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        path = os.path.expanduser(self.cache_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, path)
+        self._dirty = False
+
+    # ---------------------------------------------------------------------------
+    # Resolution
+    # ---------------------------------------------------------------------------
+
+    async def resolve(self, url: str, priority: int = PRIORITY_PREFETCH) -> Optional[str]:
+        """Return the direct stream URL for url, fetching it if not cached.
+
+        Returns None (and caches nothing) if url couldn't be resolved, in
+        which case the caller should just give VLC the original URL.
+        """
+        resolved = self.cached(url)
+        if resolved is not None:
+            return resolved
+        async with self.scheduler.slot(priority):
+            try:
+                resolved = await self._follow(url, 0, priority)
+            except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+                logging.debug(f"Playlist resolve failed for {url}: {e!r}")
+                return None
+        if resolved is not None:
+            self._cache[url] = (resolved, time.time() + self.ttl)
+            self._dirty = True
+        return resolved
+
+    async def resolve_many(
+        self, urls: list, scope=None, priority: int = PRIORITY_PREFETCH
+    ) -> dict:
+        """Resolve urls concurrently (bounded by the scheduler) as jobs under
+        scope; returns url -> result."""
+        results = await asyncio.gather(
+            *(self.scheduler.spawn(self.resolve(url, priority), scope) for url in urls)
+        )
+        self.save()
+        return dict(zip(urls, results))
+
+    async def _follow(self, url: str, depth: int, priority: int) -> Optional[str]:
+        if depth >= MAX_PLAYLIST_DEPTH:
+            return None
+        async with self._session.get(url, allow_redirects=True) as response:
+            response.raise_for_status()
+            final_url = str(response.url)
+            content_type = response.content_type.lower()
+            if not looks_like_playlist(final_url, content_type):
+                # A stream: stop at the headers, never read the body.
+                return final_url if content_type.startswith(("audio/", "application/ogg")) else None
+            body = await response.content.read(MAX_PLAYLIST_BYTES)
+        await self.scheduler.throttle(len(body), priority)
+        text = decode_playlist(body, response.charset)
+        if is_hls(text):
+            return final_url
+        for entry in parse_playlist(text, final_url):
+            resolved = await self._follow(entry, depth + 1, priority)
+            if resolved is not None:
+                return resolved
+        return None
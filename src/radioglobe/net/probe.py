@@ -0,0 +1,156 @@
+"""Concurrent time-to-first-byte probes over a city's stations.
+
+When a city is selected App would otherwise play stations[0] blindly, even
+if it's dead or takes seconds to answer. StationProber opens a lightweight
+request to every station at once on one pooled aiohttp session, measures
+connect time and time to the first body byte, and rank_stations() turns the
+results into a play order: answering stations fastest-first, unprobed ones
+in their original order, failed ones last.
+"""
+
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+from typing import NamedTuple, Optional
+
+import aiohttp
+
+from ..radio_config import PROBE_MAX_CONNECTIONS, PROBE_TIMEOUT
+from .dns import DnsCache
+from .scheduler import PRIORITY_PROBE, NetScheduler
+
+
+class ProbeResult(NamedTuple):
+    url: str
+    ok: bool
+    connect_time: Optional[float] = None     # seconds to TCP connect; None if pooled
+    first_byte_time: Optional[float] = None  # seconds from request to first body byte
+    error: Optional[str] = None
+    content_type: Optional[str] = None       # for hints_for_content_type(), see station_history.py
+
+
+def is_icy_status_error(error: Exception) -> bool:
+    """Whether error is aiohttp rejecting a SHOUTcast v1 "ICY 200 OK" status line.
+
+    aiohttp only accepts HTTP/RTSP/ICE status lines, so an old SHOUTcast
+    server that's happily streaming surfaces as a ClientResponseError -
+    which still proves the server answered with a stream.
+    """
+    return isinstance(error, aiohttp.ClientResponseError) and "ICY" in str(error.message)
+
+
+def rank_stations(stations: list, results: dict) -> list:
+    """Reorder (name, url) stations using {url: ProbeResult}.
+
+    Stations that answered come first, fastest first-byte time first;
+    stations without a result keep their original relative order after
+    them; stations whose probe failed go last. The sort is stable, so ties
+    keep stations.json order.
+    """
+
+    def key(indexed):
+        index, (_, url) = indexed
+        result = results.get(url)
+        if result is None:
+            return (1, 0.0, index)
+        if not result.ok:
+            return (2, 0.0, index)
+        return (0, result.first_byte_time or 0.0, index)
+
+    return [station for _, station in sorted(enumerate(stations), key=key)]
+
+
+async def _on_request_start(session, ctx, params) -> None:
+    ctx.trace_request_ctx.started = time.monotonic()
+
+
+async def _on_connection_create_end(session, ctx, params) -> None:
+    ctx.trace_request_ctx.connected = time.monotonic()
+
+
+class StationProber:
+    """Probe station URLs concurrently on a shared, connection-capped session.
+
+    max_connections is a global cap across every probe in flight, not a
+    per-city one, so overlapping probe_all() calls still can't flood a
+    Pi's Wi-Fi link.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = PROBE_MAX_CONNECTIONS,
+        timeout: float = PROBE_TIMEOUT,
+        dns: Optional[DnsCache] = None,
+        scheduler: Optional[NetScheduler] = None,
+    ) -> None:
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.dns = dns
+        self.scheduler = scheduler if scheduler is not None else NetScheduler(max_connections)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def start(self) -> None:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(_on_request_start)
+        trace_config.on_connection_create_end.append(_on_connection_create_end)
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(
+                limit=self.max_connections, resolver=self.dns, use_dns_cache=self.dns is None
+            ),
+            trace_configs=[trace_config],
+        )
+
+    async def stop(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def probe(self, url: str, priority: int = PRIORITY_PROBE) -> ProbeResult:
+        """Request url and read its first body byte; never raises for network errors."""
+        timing = SimpleNamespace(started=time.monotonic(), connected=None)
+        try:
+            async with self.scheduler.slot(priority):
+                async with self._session.get(url, trace_request_ctx=timing) as response:
+                    response.raise_for_status()
+                    chunk = await response.content.readany()
+                    content_type = response.headers.get("Content-Type")
+                    result = self._result(url, timing, content_type)
+                await self.scheduler.throttle(len(chunk), priority)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if is_icy_status_error(e):
+                return self._result(url, timing)
+            logging.debug(f"Probe failed for {url}: {e!r}")
+            return ProbeResult(url, False, error=repr(e))
+        return result
+
+    @staticmethod
+    def _result(
+        url: str, timing: SimpleNamespace, content_type: Optional[str] = None
+    ) -> ProbeResult:
+        now = time.monotonic()
+        connect_time = timing.connected - timing.started if timing.connected else None
+        return ProbeResult(url, True, connect_time, now - timing.started, None, content_type)
+
+    async def probe_all(
+        self, urls: list, budget: float, scope=None, priority: int = PRIORITY_PROBE
+    ) -> dict:
+        """Probe urls concurrently as jobs under scope, waiting at most budget seconds.
+
+        Returns {url: ProbeResult} for the probes that finished in time;
+        the rest are cancelled and simply absent from the result. Being
+        cancelled itself (e.g. the user moved on) cancels every probe.
+        """
+        tasks = {
+            self.scheduler.spawn(self.probe(url, priority), scope): url
+            for url in dict.fromkeys(urls)
+        }
+        if not tasks:
+            return {}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=budget)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return {tasks[task]: task.result() for task in done if not task.cancelled()}
@@ -0,0 +1,337 @@
+"""Localhost HTTP relay between VLC and the station, with a ring buffer per stream.
+
+Without it every VLC (re)start opens a fresh connection to the station and
+waits for its server-side burst before any audio plays. StreamRelay holds the
+upstream connection itself and keeps the most recent RELAY_BUFFER_SECONDS of
+the stream in a fixed-size ring buffer, so a client that connects - VLC
+restarting after an error, or the user dialling back to a station they just
+left - is fed the whole buffer at once while the upstream keeps (or gets
+back) its connection.
+
+Upstreams are pooled: one lingers for RELAY_LINGER seconds after its last
+client leaves, so a brief flip away and back reuses it, and at most
+RELAY_MAX_UPSTREAMS are held at once. Per-stream throughput and stall
+counters are available from stats().
+
+Only direct streams are relayed. Playlists and HLS need VLC to see the
+original URL, and SHOUTcast v1 servers ("ICY 200 OK", which aiohttp can't
+parse) are redirected straight back to the station.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+from urllib.parse import quote
+
+import aiohttp
+from aiohttp import web
+
+from ..radio_config import (
+    RELAY_BUFFER_SECONDS,
+    RELAY_LINGER,
+    RELAY_MAX_UPSTREAMS,
+    RELAY_STALL_TIMEOUT,
+)
+from .dns import DnsCache
+from .scheduler import PRIORITY_LIVE, NetScheduler
+from .probe import is_icy_status_error
+
+_NOT_RELAYED_EXTENSIONS = (".pls", ".m3u", ".m3u8", ".asx", ".xspf")
+
+# Sizing fallback when a station doesn't advertise icy-br.
+_DEFAULT_BITRATE_KBPS = 192
+_CHUNK_SIZE = 16 * 1024
+_RECONNECT_BACKOFF = (0.5, 1.0, 2.0, 5.0)
+
+
+class RingBuffer:
+    """The last `capacity` bytes of a stream, addressed by absolute offset.
+
+    Readers keep their own offset into the stream; read_from() clamps an
+    offset that's fallen out of the buffer to the oldest byte still held.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.total = 0   # bytes ever written = absolute offset of the next byte
+        self._data = bytearray(capacity)
+
+    @property
+    def start(self) -> int:
+        """Absolute offset of the oldest byte still buffered."""
+        return max(0, self.total - self.capacity)
+
+    def write(self, chunk: bytes) -> None:
+        if len(chunk) > self.capacity:
+            self.total += len(chunk) - self.capacity  # overwritten before ever buffered
+            chunk = chunk[-self.capacity:]
+        position = self.total % self.capacity
+        head = min(len(chunk), self.capacity - position)
+        self._data[position:position + head] = chunk[:head]
+        self._data[:len(chunk) - head] = chunk[head:]
+        self.total += len(chunk)
+
+    def read_from(self, offset: int) -> tuple:
+        """Return (bytes from offset to the newest byte, new offset)."""
+        offset = max(offset, self.start)
+        if offset >= self.total:
+            return b"", self.total
+        begin = offset % self.capacity
+        end = self.total % self.capacity
+        if begin < end:
+            return bytes(self._data[begin:end]), self.total
+        return bytes(self._data[begin:] + self._data[:end]), self.total
+
+
+class _Upstream:
+    """One station connection feeding a RingBuffer, reconnecting on stalls."""
+
+    def __init__(self, url: str, session: aiohttp.ClientSession, scheduler: NetScheduler) -> None:
+        self.url = url
+        self.session = session
+        self.scheduler = scheduler
+        self.buffer: Optional[RingBuffer] = None
+        self.content_type = "application/octet-stream"
+        self.clients = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.stalls = 0
+        self.reconnects = 0
+        self.icy = False            # SHOUTcast v1: can't be relayed
+        self.failed: Optional[str] = None
+        self.connected_at = time.monotonic()
+        self.idle_since: Optional[float] = time.monotonic()
+        self.ready = asyncio.Event()     # set once the first bytes (or a failure) arrive
+        self._data = asyncio.Event()     # replaced on every write; readers wait on it
+        self._task = asyncio.create_task(self._pump())
+
+    async def close(self) -> None:
+        # Wakes any client still attached so its handler can finish.
+        self.failed = self.failed or "closed"
+        self._notify()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def wait_data(self) -> None:
+        await self._data.wait()
+
+    def _notify(self) -> None:
+        self._data.set()
+        self._data = asyncio.Event()
+
+    async def _pump(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                await self._read_stream()
+                reason = "ended"
+            except asyncio.TimeoutError:
+                reason = "stalled"
+            except aiohttp.ClientError as e:
+                if is_icy_status_error(e):
+                    self.icy = True
+                    self.ready.set()
+                    return
+                reason = repr(e)
+                if self.buffer is None:
+                    # Never got a byte: report it rather than retrying forever.
+                    self.failed = reason
+                    self.ready.set()
+                    self._notify()
+                    return
+            self.stalls += 1
+            delay = _RECONNECT_BACKOFF[min(attempt, len(_RECONNECT_BACKOFF) - 1)]
+            attempt += 1
+            logging.debug(f"Relay upstream {reason}, reconnecting in {delay}s: {self.url}")
+            await asyncio.sleep(delay)
+            self.reconnects += 1
+
+    async def _read_stream(self) -> None:
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=RELAY_STALL_TIMEOUT,
+                                        sock_read=RELAY_STALL_TIMEOUT)
+        slot = self.scheduler.slot(PRIORITY_LIVE)
+        async with slot, self.session.get(self.url, timeout=timeout) as response:
+            response.raise_for_status()
+            if self.buffer is None:
+                self.content_type = response.headers.get("Content-Type", self.content_type)
+                bitrate = response.headers.get("icy-br", "").split(",")[0].strip()
+                kbps = int(bitrate) if bitrate.isdigit() else _DEFAULT_BITRATE_KBPS
+                self.buffer = RingBuffer(int(RELAY_BUFFER_SECONDS * kbps * 1000 / 8))
+            async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                self.buffer.write(chunk)
+                self.bytes_in += len(chunk)
+                self.ready.set()
+                self._notify()
+
+    def stats(self) -> dict:
+        uptime = max(time.monotonic() - self.connected_at, 1e-6)
+        return {
+            "clients": self.clients,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "throughput": self.bytes_in / uptime,   # bytes/s since connect
+            "buffered": self.buffer.total - self.buffer.start if self.buffer else 0,
+            "stalls": self.stalls,
+            "reconnects": self.reconnects,
+        }
+
+
+def is_relayable(url: str) -> bool:
+    """Whether url looks like a direct stream the relay can carry."""
+    path = url.split("?", 1)[0].lower()
+    return url.startswith(("http://", "https://")) and not path.endswith(_NOT_RELAYED_EXTENSIONS)
+
+
+class StreamRelay:
+    """Serve http://127.0.0.1:<port>/stream?url=<station> from pooled, buffered upstreams.
+
+    Unlike PlaylistResolver/StationProber, start() is a coroutine: binding
+    the listening socket needs the running loop.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        linger: float = RELAY_LINGER,
+        max_upstreams: int = RELAY_MAX_UPSTREAMS,
+        dns: Optional[DnsCache] = None,
+        scheduler: Optional[NetScheduler] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.dns = dns
+        # Upstreams count against the shared connection cap but never wait on it.
+        self.scheduler = scheduler if scheduler is not None else NetScheduler()
+        self.linger = linger
+        self.max_upstreams = max_upstreams
+        self._upstreams: dict = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(resolver=self.dns, use_dns_cache=self.dns is None)
+        )
+        app = web.Application()
+        app.router.add_get("/stream", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]   # the real port when port=0
+        self._reaper = asyncio.create_task(self._reap())
+        logging.debug(f"Stream relay listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for upstream in list(self._upstreams.values()):
+            await upstream.close()
+        self._upstreams.clear()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def url_for(self, url: str) -> str:
+        """The relay URL VLC should play for url, or url itself if it can't be relayed."""
+        if self._runner is None or not is_relayable(url):
+            return url
+        upstream = self._upstreams.get(url)
+        if upstream is not None and upstream.icy:
+            return url
+        return f"http://{self.host}:{self.port}/stream?url={quote(url, safe='')}"
+
+    def stats(self) -> dict:
+        """{station url: {"clients", "bytes_in", "bytes_out", "throughput", "buffered",
+        "stalls", "reconnects"}} for every pooled upstream."""
+        return {url: upstream.stats() for url, upstream in self._upstreams.items()}
+
+    # ---------------------------------------------------------------------------
+    # Pool
+    # ---------------------------------------------------------------------------
+
+    def _acquire(self, url: str) -> _Upstream:
+        upstream = self._upstreams.get(url)
+        if upstream is None or upstream.failed:
+            if upstream is not None:
+                asyncio.create_task(upstream.close())
+            upstream = _Upstream(url, self._session, self.scheduler)
+            self._upstreams[url] = upstream
+            self._evict()
+        upstream.clients += 1
+        upstream.idle_since = None
+        return upstream
+
+    def _release(self, upstream: _Upstream) -> None:
+        upstream.clients -= 1
+        if upstream.clients == 0:
+            upstream.idle_since = time.monotonic()
+
+    def _evict(self) -> None:
+        """Close the longest-idle upstreams beyond max_upstreams."""
+        idle = sorted(
+            (u for u in self._upstreams.values() if u.clients == 0 and u.idle_since is not None),
+            key=lambda u: u.idle_since,
+        )
+        while len(self._upstreams) > self.max_upstreams and idle:
+            self._drop(idle.pop(0))
+
+    def _drop(self, upstream: _Upstream) -> None:
+        self._upstreams.pop(upstream.url, None)
+        asyncio.create_task(upstream.close())
+        logging.debug(f"Relay closed upstream: {upstream.url}")
+
+    async def _reap(self) -> None:
+        """Close upstreams nobody has listened to for `linger` seconds."""
+        while True:
+            await asyncio.sleep(max(self.linger / 2, 0.05))
+            now = time.monotonic()
+            for upstream in list(self._upstreams.values()):
+                if upstream.clients == 0 and now - upstream.idle_since >= self.linger:
+                    self._drop(upstream)
+
+    # ---------------------------------------------------------------------------
+    # Client side
+    # ---------------------------------------------------------------------------
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        url = request.query.get("url")
+        if not url or not is_relayable(url):
+            raise web.HTTPBadRequest()
+        upstream = self._acquire(url)
+        try:
+            try:
+                await asyncio.wait_for(upstream.ready.wait(), RELAY_STALL_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise web.HTTPGatewayTimeout()
+            if upstream.icy:
+                raise web.HTTPTemporaryRedirect(url)
+            if upstream.failed:
+                raise web.HTTPBadGateway(text=upstream.failed)
+
+            response = web.StreamResponse(headers={"Content-Type": upstream.content_type})
+            await response.prepare(request)
+            # Start at the oldest buffered byte: the whole buffer goes out at once.
+            offset = upstream.buffer.start
+            while True:
+                chunk, offset = upstream.buffer.read_from(offset)
+                if chunk:
+                    await response.write(chunk)
+                    upstream.bytes_out += len(chunk)
+                    continue
+                if upstream.failed:
+                    break
+                await upstream.wait_data()
+            return response
+        finally:
+            self._release(upstream)
@@ -0,0 +1,161 @@
+"""One scheduler for every background network job: priorities, a connection
+cap, a bandwidth budget and per-city cancellation.
+
+Playlist resolution, station probes, DNS warming and the relay all share a
+Pi's Wi-Fi with the stream that's actually playing. NetScheduler is the one
+place they queue:
+
+- slot(priority) is a connection slot under a global cap. Waiters are served
+  strictly by priority - PRIORITY_LIVE, then PRIORITY_NEXT (what the user
+  is about to hear), PRIORITY_PREFETCH, PRIORITY_PROBE - and FIFO within
+  one. Live playback never waits, but does count against the cap.
+- throttle(nbytes, priority) charges bytes a job read to a token bucket:
+  prefetch and probe traffic together is paced to NET_BACKGROUND_BANDWIDTH,
+  live and next-up traffic is only counted.
+- spawn(coro, scope) runs a job as a task under a scope - App uses the
+  selected city - and cancel(scope) cancels all of that scope's jobs at
+  once when the user moves on.
+
+Each helper (PlaylistResolver, StationProber, DnsCache, StreamRelay) builds
+a private scheduler when it isn't given one; cli.py passes them all the
+same one.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import Coroutine, Hashable, Optional
+
+from ..radio_config import NET_BACKGROUND_BANDWIDTH, NET_MAX_CONNECTIONS
+
+PRIORITY_LIVE = 0       # the stream playing now
+PRIORITY_NEXT = 1       # what plays next: the selected city's probes and hosts
+PRIORITY_PREFETCH = 2   # work ahead: playlist resolution, neighbouring cities
+PRIORITY_PROBE = 3      # health probes with no listener waiting
+
+_PRIORITY_NAMES = {
+    PRIORITY_LIVE: "live",
+    PRIORITY_NEXT: "next",
+    PRIORITY_PREFETCH: "prefetch",
+    PRIORITY_PROBE: "probe",
+}
+
+
+class NetScheduler:
+    """Priority-ordered connection slots, a background token bucket and job scopes."""
+
+    def __init__(
+        self,
+        max_connections: int = NET_MAX_CONNECTIONS,
+        bandwidth: float = NET_BACKGROUND_BANDWIDTH,
+    ) -> None:
+        self.max_connections = max_connections
+        self.bandwidth = bandwidth    # bytes/s for prefetch + probe traffic; 0 = unlimited
+        self.active = 0
+        self.cancelled = 0
+        self.throttled = 0.0          # seconds background jobs spent paced
+        self.bytes = {name: 0 for name in _PRIORITY_NAMES.values()}
+        self._waiters: list = []      # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._scopes: dict = {}       # scope -> set of tasks
+        self._tokens = float(bandwidth)
+        self._refilled: Optional[float] = None
+
+    # ---------------------------------------------------------------------------
+    # Connection slots
+    # ---------------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Hold one of max_connections slots, waiting behind higher priorities."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._wake()
+
+    async def _acquire(self, priority: int) -> None:
+        if priority == PRIORITY_LIVE:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot on.
+                self.active -= 1
+                self._wake()
+            raise
+
+    def _wake(self) -> None:
+        while self._waiters and self.active < self.max_connections:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # its waiter was cancelled
+            self.active += 1
+            future.set_result(None)
+
+    # ---------------------------------------------------------------------------
+    # Bandwidth
+    # ---------------------------------------------------------------------------
+
+    async def throttle(self, nbytes: int, priority: int) -> None:
+        """Account nbytes read by a job; background jobs sleep off any overdraft."""
+        self.bytes[_PRIORITY_NAMES[priority]] += nbytes
+        if priority <= PRIORITY_NEXT or self.bandwidth <= 0:
+            return
+        now = asyncio.get_running_loop().time()
+        if self._refilled is not None:
+            refill = (now - self._refilled) * self.bandwidth
+            self._tokens = min(self.bandwidth, self._tokens + refill)
+        self._refilled = now
+        self._tokens -= nbytes
+        if self._tokens < 0:
+            delay = -self._tokens / self.bandwidth
+            self.throttled += delay
+            await asyncio.sleep(delay)
+
+    # ---------------------------------------------------------------------------
+    # Scopes
+    # ---------------------------------------------------------------------------
+
+    def spawn(self, coro: Coroutine, scope: Optional[Hashable] = None) -> asyncio.Task:
+        """Run coro as a task, cancelled by cancel(scope) if a scope is given."""
+        task = asyncio.create_task(coro)
+        if scope is not None:
+            self._scopes.setdefault(scope, set()).add(task)
+            task.add_done_callback(lambda done: self._forget(scope, done))
+        return task
+
+    def cancel(self, scope: Hashable) -> int:
+        """Cancel every unfinished job spawned under scope; returns how many."""
+        tasks = [task for task in self._scopes.pop(scope, ()) if not task.done()]
+        for task in tasks:
+            task.cancel()
+        self.cancelled += len(tasks)
+        if tasks:
+            logging.debug(f"Cancelled {len(tasks)} network jobs for {scope}")
+        return len(tasks)
+
+    def _forget(self, scope: Hashable, task: asyncio.Task) -> None:
+        tasks = self._scopes.get(scope)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._scopes[scope]
+
+    def stats(self) -> dict:
+        """{"active", "waiting", "cancelled", "throttled", "bytes": {priority name: n}}."""
+        return {
+            "active": self.active,
+            "waiting": sum(not future.done() for _, _, future in self._waiters),
+            "cancelled": self.cancelled,
+            "throttled": self.throttled,
+            "bytes": dict(self.bytes),
+        }
@@ -29,9 +29,144 @@ VOLUME_OFF_LEVEL = 0
 BRIEF_DISPLAY_DURATION = 0.5   # volume level / final shutdown display hold
 MESSAGE_DISPLAY_DURATION = 2   # startup splash, calibrating, shutdown message hold
 
-# Stream health check grace period (seconds)
+# Longest wait (seconds) for a new stream to report Playing before its state
+# is checked directly - player error events end the wait sooner.
 STREAM_CHECK_INTERVAL = 3
 
+# Per-station network buffer (ms), chosen on every play from that stream's
+# history of start-up jitter, rebuffers and failures (see station_history.py).
+NETWORK_CACHING_DEFAULT = 2000   # stations with no history yet
+NETWORK_CACHING_MIN = 500        # a steady stream's floor
+NETWORK_CACHING_HLS_MIN = 1500   # HLS floor - each segment fetch needs headroom
+NETWORK_CACHING_MAX = 6000
+STATION_HISTORY_PATH = "~/cache/station_history.json"
+STATION_HISTORY_MAX_RECORDS = 1000    # most recently played stations kept on save
+STATION_HISTORY_MAX_AGE_DAYS = 90     # ... and only those played this recently
+
+# Start VLC with only the audio modules a radio needs (see audio_async.py's
+# _VLC_FAST_STARTUP_ARGS). RADIOGLOBE_VLC_FULL=1 falls back to VLC's defaults.
+VLC_FAST_STARTUP = os.environ.get("RADIOGLOBE_VLC_FULL") != "1"
+
+# Audio backend built by hal/factory.py: "vlc" (python-vlc, in process) or
+# "mpv" (one mpv process over JSON IPC - smaller, but no pre-buffering).
+AUDIO_BACKEND = os.environ.get("RADIOGLOBE_AUDIO_BACKEND", "vlc")
+
+# VLC Media objects kept for reuse when flipping back to a recent station;
+# the least recently played is released beyond this.
+MEDIA_POOL_SIZE = 8
+
+# Stall watchdog: a playing stream is watched for as long as it plays. One
+# whose demux progress stops (or that rebuffers) for STALL_TIMEOUT is
+# reconnected with exponential backoff (base x 2^n, capped, 50-100% jitter);
+# after RECONNECT_ATTEMPTS failed reconnects in a row the next station plays.
+WATCHDOG_INTERVAL = 0.5          # seconds between progress samples
+STALL_TIMEOUT = 2.0              # seconds without progress that count as a stall
+RECONNECT_BACKOFF_BASE = 1.0     # seconds before the first reconnect
+RECONNECT_BACKOFF_MAX = 15.0     # longest wait between reconnects
+RECONNECT_ATTEMPTS = 3
+WATCHDOG_RECOVERED_AFTER = 30    # seconds of clean playback that reset the attempt count
+
+# Bitrate tiers, for stations that list bitrate "variants" in stations.json:
+# a station starts at its highest allowed tier and the watchdog steps it down
+# one tier on a stall, or when its delivered throughput over BITRATE_WINDOW
+# is below BITRATE_HEADROOM x the tier's bitrate. BITRATE_STEP_UP_AFTER
+# seconds without trouble lets the station's next play go one tier back up.
+BITRATE_WINDOW = 20            # seconds of throughput measured before judging a tier
+BITRATE_HEADROOM = 0.75        # fraction of its bitrate a tier must be delivered at
+BITRATE_STEP_UP_AFTER = 120    # healthy seconds before a station may go back up a tier
+
+# Stream pre-buffering: muted standby players kept connected to the stations
+# either side of the current one, so a dial step swaps to a warm stream.
+# Each standby holds its own network connection - 0 disables pre-buffering.
+PREBUFFER_STANDBY_COUNT = 2
+PREBUFFER_DELAY = 1.0  # seconds after a play before refilling standbys
+
+# Playlist resolution: .pls/.m3u/redirector station URLs are resolved to the
+# direct stream URL in the background and cached on disk, so VLC can skip the
+# playlist fetch on later plays.
+PLAYLIST_CACHE_PATH = "~/cache/playlists.json"
+PLAYLIST_CACHE_TTL = 6 * 60 * 60   # seconds; redirector targets can carry expiring tokens
+PLAYLIST_RESOLVE_CONCURRENCY = 4   # simultaneous playlist fetches
+PLAYLIST_RESOLVE_TIMEOUT = 5       # seconds per playlist fetch
+
+# Network scheduling: playlist resolution, probes, DNS warming and the relay
+# share one scheduler (net/scheduler.py) so background jobs queue behind the
+# live stream and the user's next station.
+NET_MAX_CONNECTIONS = 8                  # simultaneous connections across all helpers
+NET_BACKGROUND_BANDWIDTH = 128 * 1024    # bytes/s for prefetch and probe traffic (0 = unlimited)
+
+# DNS warming: when a city is selected, the hostnames of its stations (and of
+# the cities either side of it in the dial's city list) are resolved at once
+# into a shared TTL cache that the resolver, prober and relay connect through.
+DNS_CACHE_TTL = 5 * 60       # seconds a resolved host is reused
+DNS_WARM_CONCURRENCY = 8     # simultaneous lookups
+DNS_WARM_NEIGHBOURS = 1      # nearby cities warmed either side of the selected one
+
+# Station probing: when a city is selected, all its stations are probed at once
+# and the fastest to answer is played first instead of stations[0].
+PROBE_BUDGET = 1.0          # seconds to wait for probes before playing anyway
+PROBE_TIMEOUT = 3           # seconds per probe
+PROBE_MAX_CONNECTIONS = 8   # simultaneous probe connections, across all probes
+
+# Stream relay: VLC plays stations through a localhost relay that keeps the
+# last few seconds of each stream buffered, so a VLC restart or a quick flip
+# back to a station starts from the buffer. Opt in with RADIOGLOBE_RELAY=1.
+RELAY_ENABLED = os.environ.get("RADIOGLOBE_RELAY") == "1"
+RELAY_BUFFER_SECONDS = 10   # audio kept per stream (sized from icy-br, else 192 kbps)
+RELAY_LINGER = 30           # seconds an upstream stays connected with no listener
+RELAY_MAX_UPSTREAMS = 4     # station connections the relay holds at once
+RELAY_STALL_TIMEOUT = 5     # seconds without data before an upstream reconnects
+
+# Dead-air detection: a PCM tap on the PulseAudio output monitor (parec) feeds
+# the audio actually playing to dead_air.py, and a station that has sent only
+# silence, a bare tone or hiss for DEAD_AIR_HOLD seconds is skipped like a
+# failed one. Opt in with RADIOGLOBE_DEAD_AIR=1; needs numpy (the deadair extra).
+DEAD_AIR_ENABLED = os.environ.get("RADIOGLOBE_DEAD_AIR") == "1"
+DEAD_AIR_SAMPLE_RATE = 16000    # Hz, mono - plenty to tell programme from dead air
+DEAD_AIR_BLOCK = 0.5            # seconds of audio per analysed block
+DEAD_AIR_WINDOW = 1024          # samples per RMS/FFT window (64 ms)
+DEAD_AIR_HOLD = 15              # seconds of one kind of dead air before skipping
+DEAD_AIR_SILENCE_DBFS = -55     # RMS below this is silence, at full volume
+DEAD_AIR_MIN_VOLUME = 30        # below this volume (muted included) dead air isn't judged
+DEAD_AIR_TONE_FLATNESS = 1e-4   # spectral flatness below this is a bare tone
+DEAD_AIR_NOISE_FLATNESS = 0.4   # ... and above this is hiss (white noise is ~0.56)
+
+# Dial settling: the display follows every dial detent, but the stream only
+# switches once the dial has been idle for an adaptive window - a few of the
+# current spin's own tick gaps, clamped to these bounds (seconds).
+DIAL_SETTLE_MIN = 0.15     # a single deliberate click
+DIAL_SETTLE_MAX = 0.6      # a slow, hesitant scroll
+DIAL_SETTLE_FACTOR = 2.5   # settle window = smoothed tick gap x this
+
+# Encoder signal processing: each axis's readings pass through a filter -
+# "median" (of the last ENCODER_MEDIAN_WINDOW), "kalman" or "none" - before
+# the latch sees them, and while unlatched a new position is only published
+# (and looked up) once it has moved ENCODER_ENTER_STEPS from the last one.
+# Unlatching still takes a move of more than STICKINESS steps.
+ENCODER_FILTER = "median"
+ENCODER_MEDIAN_WINDOW = 3
+ENCODER_ENTER_STEPS = 2
+
+# Spinning the globe: while the reticule moves faster than SPIN_VELOCITY
+# (encoder steps per second, smoothed over ~0.1 s), App skips city lookups,
+# so the cities it passes over are never latched or played. It looks up and
+# latches once, where the reticule slows below the threshold. 1024 steps is
+# one turn, so 60 steps/s is about 21 deg/s.
+SPIN_VELOCITY = 60.0
+
+# Encoder sampling thread: read the globe's SPI encoders on a dedicated
+# thread, at SCHED_FIFO priority where allowed, so event-loop stalls (a slow
+# libvlc call, an LCD write) don't jitter the sampling. Opt in with
+# RADIOGLOBE_ENCODER_THREAD=1; without CAP_SYS_NICE or an rtprio limit the
+# thread runs at normal priority.
+ENCODER_THREAD = os.environ.get("RADIOGLOBE_ENCODER_THREAD") == "1"
+ENCODER_THREAD_PRIORITY = 10   # SCHED_FIFO priority (1-99)
+
+# Input recording: RADIOGLOBE_INPUT_LOG=<path> logs every raw encoder
+# sample, dial detent and button edge to a binary file, for replaying the
+# session offline with input_log.InputReplayer. Unset: no recording.
+INPUT_LOG_PATH = os.environ.get("RADIOGLOBE_INPUT_LOG")
+
 # LED flash durations (seconds)
 LED_FLASH_SHORT = 0.2   # button press feedback (brief since frequent)
 LED_FLASH_LONG = 0.5    # city latch / stream error indication
@@ -0,0 +1,111 @@
+"""Defer an action until a burst of input ticks has settled.
+
+Each dial detent used to switch streams on the spot, so scrolling past eight
+stations opened and tore down eight connections. SettleScheduler lets the
+caller react to every tick cheaply (display, LED) and run the expensive part
+once, after the dial has been idle for a settle window.
+
+The window adapts to how fast the dial is being turned: an exponential
+moving average of the gaps between ticks in the current burst, times
+`factor`, clamped to [min_window, max_window]. A lone detent after a pause
+commits after min_window; a fast spin waits a few of its own tick gaps, so a
+hesitation mid-scroll doesn't commit a station the user is passing through.
+
+No hardware dependencies - only the asyncio loop's call_later().
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from .radio_config import DIAL_SETTLE_FACTOR, DIAL_SETTLE_MAX, DIAL_SETTLE_MIN
+
+
+class SettleScheduler:
+    """Run the latest tick's callback once ticks stop for an adaptive window."""
+
+    def __init__(
+        self,
+        min_window: float = DIAL_SETTLE_MIN,
+        max_window: float = DIAL_SETTLE_MAX,
+        factor: float = DIAL_SETTLE_FACTOR,
+        alpha: float = 0.5,
+    ) -> None:
+        self.min_window = min_window
+        self.max_window = max_window
+        self.factor = factor
+        self.alpha = alpha
+        self.commits = 0
+        self.ticks_skipped = 0   # ticks whose callback was superseded by a later one
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._interval: Optional[float] = None   # EMA of the current burst's tick gaps
+        self._last_tick: Optional[float] = None
+        self._burst_start: Optional[float] = None
+        # (count, total, max, last) seconds from the burst's last tick to its commit
+        self._latency = (0, 0.0, 0.0, 0.0)
+
+    @property
+    def pending(self) -> bool:
+        return self._handle is not None
+
+    @property
+    def window(self) -> float:
+        """The settle window the next commit will wait for."""
+        if self._interval is None:
+            return self.min_window
+        return max(self.min_window, min(self.max_window, self._interval * self.factor))
+
+    def tick(self, callback: Callable[[], None]) -> None:
+        """Record one input tick and (re)arm the commit of callback.
+
+        A tick arriving while a commit is pending replaces that commit's
+        callback - only the last one in a burst ever runs.
+        """
+        now = time.monotonic()
+        if self._last_tick is None or now - self._last_tick > self.max_window:
+            # First tick after a pause starts a new burst.
+            self._interval = None
+            self._burst_start = now
+        else:
+            gap = now - self._last_tick
+            self._interval = gap if self._interval is None else (
+                self.alpha * gap + (1 - self.alpha) * self._interval
+            )
+        self._last_tick = now
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self.ticks_skipped += 1
+        loop = asyncio.get_running_loop()
+        self._handle = loop.call_later(self.window, self._commit, callback)
+
+    def cancel(self) -> None:
+        """Drop a pending commit, e.g. because something else took over playback."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _commit(self, callback: Callable[[], None]) -> None:
+        self._handle = None
+        elapsed = time.monotonic() - self._last_tick
+        count, total, worst, _ = self._latency
+        self._latency = (count + 1, total + elapsed, max(worst, elapsed), elapsed)
+        self.commits += 1
+        logging.debug(
+            f"Dial settled after {elapsed * 1000:.0f} ms "
+            f"(burst {(self._last_tick - self._burst_start) * 1000:.0f} ms)"
+        )
+        callback()
+
+    def latency_stats(self) -> dict:
+        """Tick-to-commit latency: {"count", "mean", "max", "last"} seconds, plus skip counts."""
+        count, total, worst, last = self._latency
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "max": worst,
+            "last": last,
+            "commits": self.commits,
+            "ticks_skipped": self.ticks_skipped,
+        }
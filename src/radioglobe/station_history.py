@@ -0,0 +1,273 @@
+"""Per-stream playback history, used to size VLC's network buffer per station.
+
+A single --network-caching value is a compromise: a steady Icecast MP3 stream
+could start in well under a second with a small buffer, while a flaky HLS
+stream stutters even at 2 s. StationHistory records, per station, how long
+each play took to start and how often it rebuffered or failed, and
+choose_network_caching() turns that into a per-media :network-caching value.
+
+Records are keyed by the station's URL in stations.json, not the URL VLC
+actually opens: that one goes through the relay (a new port every boot)
+or is a resolved stream URL that may carry an expiring token. save() keeps
+only the STATION_HISTORY_MAX_RECORDS most recently played stations, and
+none unplayed for STATION_HISTORY_MAX_AGE_DAYS.
+
+Counts decay on every play (HISTORY_DECAY), so a station that was flaky last
+month and has been solid since earns its short buffer back.
+
+It also keeps each stream's demux/codec hints - learned from the tracks of
+its first successful play, or from a probe's Content-Type - which AudioPlayer
+passes as :demux/:codec options so later plays skip VLC's auto-detection.
+Start-up times are tracked separately for hinted and unhinted plays, so
+hint_gain() can report what the hints actually bought.
+
+No hardware dependencies: AudioPlayer feeds it from its libvlc event bridge.
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from typing import Optional
+
+from .radio_config import (
+    NETWORK_CACHING_DEFAULT,
+    NETWORK_CACHING_HLS_MIN,
+    NETWORK_CACHING_MAX,
+    NETWORK_CACHING_MIN,
+    STATION_HISTORY_MAX_AGE_DAYS,
+    STATION_HISTORY_MAX_RECORDS,
+    STATION_HISTORY_PATH,
+)
+
+# Weight kept by past plays each time a station is played again.
+HISTORY_DECAY = 0.8
+# Extra buffer per rebuffer/failure per play, and per second of start-up jitter.
+_MS_PER_REBUFFER = 1000
+_MS_PER_STALL = 1500
+_JITTER_MULTIPLIER = 3
+# Buffer sizes are rounded up to this step (ms), so small drifts in the
+# history don't change the media options - and so a pooled media stays reusable.
+_CACHING_STEP = 250
+
+
+# Audio codec fourcc (as libvlc reports it) -> the demux/decoder modules that
+# handle it as a bare Icecast/SHOUTcast stream.
+_CODEC_HINTS = {
+    "mpga": {"demux": "es", "codec": "mpg123"},
+    "mp3 ": {"demux": "es", "codec": "mpg123"},
+    "mp4a": {"demux": "es", "codec": "avcodec"},   # AAC/AAC+ in ADTS
+    "vorb": {"demux": "ogg", "codec": "vorbis"},
+    "opus": {"demux": "ogg", "codec": "opus"},
+    "flac": {"demux": "flac", "codec": "flac"},
+}
+_CONTENT_TYPE_CODECS = {
+    "audio/mpeg": "mpga",
+    "audio/mp3": "mpga",
+    "audio/aac": "mp4a",
+    "audio/aacp": "mp4a",
+    "audio/x-aac": "mp4a",
+    "audio/ogg": "vorb",
+    "application/ogg": "vorb",
+    "audio/opus": "opus",
+    "audio/flac": "flac",
+}
+
+
+def _is_hls(url: str) -> bool:
+    return url.split("?", 1)[0].lower().endswith(".m3u8")
+
+
+def _new_record() -> dict:
+    return {
+        "plays": 0.0, "buffering": 0.0, "stalls": 0.0, "startup": None, "jitter": 0.0,
+        "hints": None, "startup_hinted": None, "startup_unhinted": None,
+        "last_played": None,
+    }
+
+
+def hints_for_codec(url: str, fourcc: str) -> Optional[dict]:
+    """{"demux", "codec"} module hints for a stream carrying fourcc, or None if unknown.
+
+    HLS keeps VLC's adaptive demux whatever the segments carry.
+    """
+    hints = _CODEC_HINTS.get(fourcc)
+    if hints is None:
+        return None
+    if _is_hls(url):
+        return {"demux": "adaptive", "codec": hints["codec"]}
+    return dict(hints)
+
+
+def hints_for_content_type(url: str, content_type: str) -> Optional[dict]:
+    """Hints from an offline probe's Content-Type header, or None if it says nothing useful."""
+    fourcc = _CONTENT_TYPE_CODECS.get(content_type.split(";", 1)[0].strip().lower())
+    return hints_for_codec(url, fourcc) if fourcc else None
+
+
+def media_options(hints: Optional[dict]) -> list:
+    """VLC media options for hints. Each ends in ",any" so a stale hint
+    falls back to auto-detection instead of failing the play."""
+    if not hints:
+        return []
+    return [f":{key}={hints[key]},any" for key in ("demux", "codec") if hints.get(key)]
+
+
+def choose_network_caching(url: str, record: Optional[dict]) -> int:
+    """The :network-caching value (ms) to open url with, given its history record.
+
+    Unknown stations get NETWORK_CACHING_DEFAULT. Known ones start from
+    NETWORK_CACHING_MIN and earn extra buffer for their start-up jitter and
+    for each rebuffer or failure per (decayed) play, clamped to
+    NETWORK_CACHING_MAX. HLS never goes below NETWORK_CACHING_HLS_MIN, since
+    a segment fetch needs the headroom whatever the history says.
+    """
+    floor = NETWORK_CACHING_HLS_MIN if _is_hls(url) else NETWORK_CACHING_MIN
+    if not record or record["plays"] < 1:
+        return max(floor, NETWORK_CACHING_DEFAULT)
+    per_play = 1 / record["plays"]
+    caching = (
+        NETWORK_CACHING_MIN
+        + _JITTER_MULTIPLIER * record["jitter"] * 1000
+        + _MS_PER_REBUFFER * record["buffering"] * per_play
+        + _MS_PER_STALL * record["stalls"] * per_play
+    )
+    caching = math.ceil(caching / _CACHING_STEP) * _CACHING_STEP
+    return int(max(floor, min(NETWORK_CACHING_MAX, caching)))
+
+
+class StationHistory:
+    """Stall/rebuffer/start-up history per station URL, persisted as JSON."""
+
+    def __init__(
+        self,
+        path: str = STATION_HISTORY_PATH,
+        max_records: int = STATION_HISTORY_MAX_RECORDS,
+        max_age: float = STATION_HISTORY_MAX_AGE_DAYS * 86400,
+    ) -> None:
+        self.path = path
+        self.max_records = max_records
+        self.max_age = max_age
+        self._records: dict = {}
+        self._dirty = False
+
+    def get(self, url: str) -> Optional[dict]:
+        return self._records.get(url)
+
+    def network_caching(self, station: str, url: Optional[str] = None) -> int:
+        """The buffer for a play of station; url is the URL actually opened
+        (default: station's own), which decides the HLS floor."""
+        return choose_network_caching(url or station, self._records.get(station))
+
+    def _record(self, url: str) -> dict:
+        self._dirty = True
+        return self._records.setdefault(url, _new_record())
+
+    def record_play(self, url: str) -> None:
+        """A new play of url starts: age its counts by HISTORY_DECAY."""
+        record = self._record(url)
+        record["last_played"] = time.time()
+        record["plays"] = record["plays"] * HISTORY_DECAY + 1
+        record["buffering"] *= HISTORY_DECAY
+        record["stalls"] *= HISTORY_DECAY
+
+    def record_startup(self, url: str, seconds: float, hinted: bool = False) -> None:
+        """url reached Playing `seconds` after play(); updates the smoothed
+        start-up time and its mean absolute deviation (the jitter), and the
+        smoothed start-up of hinted or unhinted plays."""
+        record = self._record(url)
+        side = "startup_hinted" if hinted else "startup_unhinted"
+        record[side] = self._smooth(record.get(side), seconds)
+        if record["startup"] is None:
+            record["startup"] = seconds
+            return
+        deviation = abs(seconds - record["startup"])
+        record["jitter"] = record["jitter"] * HISTORY_DECAY + deviation * (1 - HISTORY_DECAY)
+        record["startup"] = self._smooth(record["startup"], seconds)
+
+    @staticmethod
+    def _smooth(average: Optional[float], sample: float) -> float:
+        if average is None:
+            return sample
+        return average * HISTORY_DECAY + sample * (1 - HISTORY_DECAY)
+
+    def hints(self, url: str) -> Optional[dict]:
+        record = self._records.get(url)
+        return record.get("hints") if record else None
+
+    def record_hints(self, url: str, hints: Optional[dict]) -> None:
+        """Store url's demux/codec hints; None clears them (e.g. after a hinted play failed)."""
+        record = self._record(url)
+        if record.get("hints") != hints:
+            record["hints"] = hints
+            logging.debug(f"Stream hints for {url}: {hints}")
+
+    def hint_gain(self, url: str) -> Optional[float]:
+        """Seconds of start-up the hints save url (unhinted - hinted), once both are known."""
+        record = self._records.get(url)
+        if not record or None in (record.get("startup_hinted"), record.get("startup_unhinted")):
+            return None
+        return record["startup_unhinted"] - record["startup_hinted"]
+
+    def hint_report(self) -> dict:
+        """{url: hint_gain(url)} for every stream that has been played both ways."""
+        gains = {url: self.hint_gain(url) for url in self._records}
+        return {url: gain for url, gain in gains.items() if gain is not None}
+
+    def record_buffering(self, url: str) -> None:
+        """url ran its buffer dry after it had started playing."""
+        self._record(url)["buffering"] += 1
+
+    def record_stall(self, url: str) -> None:
+        """url errored or ended - a live stream never should."""
+        self._record(url)["stalls"] += 1
+
+    def load(self) -> None:
+        path = os.path.expanduser(self.path)
+        try:
+            with open(path, "r") as f:
+                # Older files predate some fields; fill them in.
+                self._records = {
+                    url: {**_new_record(), **record} for url, record in json.load(f).items()
+                }
+            # Records from before last_played age out from now.
+            now = time.time()
+            for record in self._records.values():
+                if record["last_played"] is None:
+                    record["last_played"] = now
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable station history {path}: {e}")
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.prune()
+        path = os.path.expanduser(self.path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._records, f)
+        os.replace(tmp, path)
+        self._dirty = False
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop records unplayed for max_age, then all but the max_records
+        most recently played; returns how many were dropped."""
+        now = time.time() if now is None else now
+        kept = sorted(
+            (
+                (url, record) for url, record in self._records.items()
+                if now - (record["last_played"] or now) <= self.max_age
+            ),
+            key=lambda item: item[1]["last_played"] or now,
+            reverse=True,
+        )[: self.max_records]
+        dropped = len(self._records) - len(kept)
+        if dropped:
+            self._records = dict(kept)
+            self._dirty = True
+            logging.debug(f"Station history: pruned {dropped} stale records")
+        return dropped
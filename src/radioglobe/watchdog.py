@@ -0,0 +1,99 @@
+"""Stall detection and reconnect backoff for a stream that is already playing.
+
+App._monitor_stream only watches a stream until it first reaches Playing.
+A network blip or an upstream restart ten minutes later leaves the radio
+silent (or VLC quietly looping under --input-repeat=-1) with nothing
+noticing. StallDetector is fed the player's libvlc stats and events for the
+whole time a stream plays and says when it has stalled; backoff_delay()
+spaces out the reconnects that follow.
+
+Pure logic with no asyncio or hardware - App owns the loop that feeds it.
+"""
+
+import random
+from typing import Callable, Optional
+
+from .constants import AUDIO_BUFFERING, AUDIO_ENDED, AUDIO_ERROR, AUDIO_PLAYING
+from .hal.protocols import AudioEvent
+
+
+def backoff_delay(
+    attempt: int, base: float, cap: float, rng: Callable[[], float] = random.random
+) -> float:
+    """Seconds to wait before reconnect `attempt` (1-based).
+
+    Exponential (base, 2*base, 4*base, ...) capped at cap, then scaled by
+    a random 50-100% so a whole room of radios dropped by the same
+    upstream restart doesn't reconnect in lockstep.
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay * (0.5 + rng() / 2)
+
+
+class StallDetector:
+    """Decide whether a playing stream has stalled.
+
+    A stream counts as stalled once its demux byte counter hasn't moved,
+    or it has been rebuffering, for stall_timeout seconds; an error or
+    end-of-stream event stalls it at once.
+    """
+
+    def __init__(self, stall_timeout: float) -> None:
+        self.stall_timeout = stall_timeout
+        self.input_bitrate: Optional[float] = None
+        self._last_bytes: Optional[int] = None
+        self._last_progress: Optional[float] = None
+        self._buffering_since: Optional[float] = None
+        self._failed = False
+
+    def reset(self, now: float) -> None:
+        """Start afresh, e.g. after a reconnect: the byte counter starts over."""
+        self._last_bytes = None
+        self._last_progress = now
+        self._buffering_since = None
+        self._failed = False
+
+    def fail(self) -> None:
+        """Mark the stream stalled now, e.g. because a reconnect didn't play."""
+        self._failed = True
+
+    def observe_stats(self, stats: Optional[dict], now: float) -> None:
+        """Feed one AudioPlayerProtocol.progress() sample (None: no stats right now)."""
+        if self._last_progress is None:
+            self._last_progress = now
+        if stats is None:
+            return
+        self.input_bitrate = stats.get("input_bitrate")
+        demux_bytes = stats.get("demux_read_bytes")
+        if demux_bytes is not None and demux_bytes != self._last_bytes:
+            self._last_bytes = demux_bytes
+            self._last_progress = now
+
+    def observe_event(self, event: AudioEvent, now: float) -> None:
+        """Feed one player event already known to belong to the watched stream."""
+        if event.kind == AUDIO_BUFFERING:
+            if event.value is not None and event.value < 100:
+                if self._buffering_since is None:
+                    self._buffering_since = now
+            else:
+                self._buffering_since = None
+        elif event.kind == AUDIO_PLAYING:
+            self._buffering_since = None
+        elif event.kind in (AUDIO_ERROR, AUDIO_ENDED):
+            self._failed = True
+
+    def stalled(self, now: float, track_bytes: bool = True) -> bool:
+        """Whether the stream should be reconnected.
+
+        track_bytes=False judges by events alone, for a player that
+        doesn't report demux stats.
+        """
+        if self._failed:
+            return True
+        if self._buffering_since is not None and now - self._buffering_since >= self.stall_timeout:
+            return True
+        return (
+            track_bytes
+            and self._last_progress is not None
+            and now - self._last_progress >= self.stall_timeout
+        )
@@ -9,7 +9,8 @@ Can be used to add and update the stations json file.
 
 2. If the city exists any new stations will be added to the list of stations
 
-3. If the city & station name exists, the station URL will be updated
+3. If the city & station name exists, the station URL (and its bitrate
+   variants, if any) will be updated
 
 Note: Updating station names is not supported as these are used as the key
 
@@ -54,6 +55,12 @@ def run(stations_json, new_stations_json):
                         if s["name"] == station["name"]:
                             print("Updating station URL: ", s["name"], s["url"])
                             s["url"] = station["url"]
+                            # Bitrate variants belong to the URL they were listed with
+                            for key in ("bitrate", "variants"):
+                                if key in station:
+                                    s[key] = station[key]
+                                else:
+                                    s.pop(key, None)
 
     with open(stations_json, "w", encoding="utf8") as f:
         json.dump(stations_dict, f, indent=2, ensure_ascii=False)
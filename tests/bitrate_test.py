@@ -0,0 +1,82 @@
+import unittest
+
+from radioglobe.bitrate import BitrateSelector
+
+STATION = "http://a/hi"
+LADDER = {STATION: [(320000, STATION), (128000, "http://a/mid"), (48000, "http://a/lo")]}
+
+
+def feed(selector, seconds, bps, start=0.0, step=0.5):
+    """Feed `seconds` of read_bytes samples delivered at bps, starting at `start`."""
+    read_bytes = 0
+    t = start
+    while t <= start + seconds:
+        selector.observe(read_bytes, t)
+        read_bytes += int(bps * step / 8)
+        t += step
+    return t - step
+
+
+class TestBitrateSelector(unittest.TestCase):
+    def test_unknown_station_plays_its_own_url(self):
+        selector = BitrateSelector(LADDER)
+        self.assertEqual(selector.select("http://other"), "http://other")
+        self.assertEqual(selector.select(STATION), STATION)
+
+    def test_throughput_needs_a_full_window(self):
+        selector = BitrateSelector(LADDER, window=10)
+        end = feed(selector, 5, 320000)
+        self.assertIsNone(selector.throughput(end))
+        end = feed(selector, 8, 320000, start=end + 0.5)
+        self.assertAlmostEqual(selector.throughput(end), 320000, delta=20000)
+
+    def test_slow_delivery_steps_down(self):
+        selector = BitrateSelector(LADDER, window=10, headroom=0.75)
+        selector.start_session(STATION, 0.0)
+        end = feed(selector, 12, 200000)
+        self.assertTrue(selector.too_slow(STATION, end))
+        self.assertTrue(selector.step_down(STATION, end))
+        self.assertEqual(selector.select(STATION), "http://a/mid")
+        # Measurement restarts at the new tier.
+        self.assertFalse(selector.too_slow(STATION, end))
+
+    def test_cannot_step_below_lowest_tier(self):
+        selector = BitrateSelector(LADDER)
+        self.assertTrue(selector.step_down(STATION, 0.0))
+        self.assertTrue(selector.step_down(STATION, 0.0))
+        self.assertFalse(selector.step_down(STATION, 0.0))
+        self.assertEqual(selector.select(STATION), "http://a/lo")
+
+    def test_healthy_play_steps_back_up_for_next_play(self):
+        selector = BitrateSelector(LADDER, step_up_after=60)
+        selector.step_down(STATION, 0.0)
+        selector.healthy(STATION, 30.0)
+        self.assertEqual(selector.select(STATION), "http://a/mid")
+        selector.healthy(STATION, 61.0)
+        self.assertEqual(selector.select(STATION), STATION)
+
+    def test_step_up_leaves_the_playing_tier_alone(self):
+        selector = BitrateSelector(LADDER, window=10, headroom=0.75, step_up_after=60)
+        selector.step_down(STATION, 0.0)
+        selector.start_session(STATION, 0.0)
+        end = feed(selector, 70, 110000)   # fine for 128 kbps, far too slow for 320
+        selector.healthy(STATION, end)
+        self.assertEqual(selector.select(STATION), STATION)
+        self.assertFalse(selector.too_slow(STATION, end))
+        # Only one tier per play, however long it stays healthy.
+        selector.healthy(STATION, end + 120)
+        self.assertEqual(selector.select(STATION), STATION)
+        # A stall still steps down from the tier actually playing.
+        self.assertTrue(selector.step_down(STATION, end))
+        self.assertEqual(selector.select(STATION), "http://a/lo")
+
+    def test_session_report_weights_tiers_by_time(self):
+        selector = BitrateSelector(LADDER)
+        selector.start_session(STATION, 0.0)
+        selector.step_down(STATION, 10.0)
+        report = selector.end_session(40.0)
+        self.assertEqual(report["tiers"], {320000: 10.0, 128000: 30.0})
+        self.assertAlmostEqual(report["bitrate"], (320000 * 10 + 128000 * 30) / 40)
+        self.assertEqual(report["step_downs"], 1)
+        self.assertEqual(list(selector.sessions), [report])
+        self.assertIsNone(selector.end_session(41.0))
@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from radioglobe.crawl import crawl, main, prune_stations, reorder_stations
+
+
+def make_crawl_app():
+    async def stream(request):
+        return web.Response(body=b"\xff\xfb" * 64, content_type="audio/mpeg")
+
+    async def aac(request):
+        return web.Response(body=b"\xff\xf1" * 64, content_type="audio/aacp")
+
+    async def pls(request):
+        # The first entry is dead; the crawler should fall through to the second.
+        text = "[playlist]\nFile1=/dead.mp3\nFile2=/stream.mp3\n"
+        return web.Response(text=text, content_type="audio/x-scpls")
+
+    async def hls(request):
+        return web.Response(
+            text="#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=128000\nlow.m3u8\n",
+            content_type="application/vnd.apple.mpegurl",
+        )
+
+    async def odd_charset(request):
+        return web.Response(
+            body=b"#EXTM3U\n/stream.mp3\n",
+            headers={"Content-Type": "audio/x-mpegurl; charset=x-unknown"},
+        )
+
+    async def html(request):
+        return web.Response(text="<html>Station moved</html>", content_type="text/html")
+
+    async def dead(request):
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/stream.mp3", stream)
+    app.router.add_get("/aac", aac)
+    app.router.add_get("/list.pls", pls)
+    app.router.add_get("/hls.m3u8", hls)
+    app.router.add_get("/odd.m3u", odd_charset)
+    app.router.add_get("/moved", html)
+    app.router.add_get("/dead.mp3", dead)
+    return app
+
+
+class TestCrawl(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_crawl_app())
+        await self.server.start_server()
+        url = lambda path: str(self.server.make_url(path))  # noqa: E731
+        self.stations = {
+            "London,GB": {"coords": {"n": 51.5, "e": -0.1}, "urls": [
+                {"name": "Dead", "url": url("/dead.mp3")},
+                {"name": "Playlist", "url": url("/list.pls")},
+                {"name": "AAC", "url": url("/aac"), "bitrate": 64000},
+            ]},
+            "Paris,FR": {"coords": {"n": 48.9, "e": 2.3}, "urls": [
+                {"name": "HLS", "url": url("/hls.m3u8")},
+                {"name": "Moved", "url": url("/moved")},
+                {"name": "Same playlist", "url": url("/list.pls")},
+            ]},
+            "Nowhere,XX": {"coords": {"n": 0, "e": 0}, "urls": [
+                {"name": "Dead too", "url": url("/dead.mp3")},
+            ]},
+        }
+        self.url = url
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_records_each_station_once_per_url(self):
+        report = io.StringIO()
+        results = await crawl(self.stations, report, concurrency=4, timeout=5)
+        self.assertEqual(len(results), 5)
+        lines = [json.loads(line) for line in report.getvalue().splitlines()]
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(
+            {line["name"] for line in lines if line["url"] == self.url("/list.pls")},
+            {"Playlist", "Same playlist"},
+        )
+
+        playlist = results[self.url("/list.pls")]
+        self.assertTrue(playlist["ok"])
+        self.assertTrue(playlist["playlist"])
+        self.assertEqual(playlist["final_url"], self.url("/stream.mp3"))
+        self.assertEqual(playlist["codec"], "mpg123")
+        self.assertIsNotNone(playlist["first_byte_ms"])
+
+        aac = results[self.url("/aac")]
+        self.assertEqual(aac["content_type"], "audio/aacp")
+        self.assertEqual(aac["hints"], {"demux": "es", "codec": "avcodec"})
+        hls = results[self.url("/hls.m3u8")]
+        self.assertTrue(hls["ok"] and hls["hls"])
+
+        dead = results[self.url("/dead.mp3")]
+        self.assertFalse(dead["ok"])
+        self.assertEqual(dead["status"], 404)
+        moved = results[self.url("/moved")]
+        self.assertFalse(moved["ok"])
+        self.assertEqual(moved["error"], "not a stream: text/html")
+
+    async def test_unknown_charset_is_checked_like_any_playlist(self):
+        self.stations["Paris,FR"]["urls"].append({"name": "Odd", "url": self.url("/odd.m3u")})
+        results = await crawl(self.stations, concurrency=4, timeout=5)
+        odd = results[self.url("/odd.m3u")]
+        self.assertTrue(odd["ok"])
+        self.assertEqual(odd["final_url"], self.url("/stream.mp3"))
+        self.assertTrue(results[self.url("/aac")]["ok"])
+
+    async def test_prune_and_reorder(self):
+        results = await crawl(self.stations, concurrency=2, timeout=5)
+        results[self.url("/aac")]["first_byte_ms"] = 1.0   # fastest in London
+
+        pruned = prune_stations(self.stations, results)
+        self.assertEqual(list(pruned), ["London,GB", "Paris,FR"])
+        self.assertEqual([s["name"] for s in pruned["London,GB"]["urls"]], ["Playlist", "AAC"])
+
+        reordered = reorder_stations(self.stations, results)
+        london = [s["name"] for s in reordered["London,GB"]["urls"]]
+        self.assertEqual(london, ["AAC", "Playlist", "Dead"])
+        self.assertEqual(reordered["London,GB"]["urls"][0]["bitrate"], 64000)
+        self.assertEqual(reordered["Paris,FR"]["urls"][-1]["name"], "Moved")
+
+
+class TestMain(unittest.TestCase):
+    def test_requires_output_with_prune(self):
+        with self.assertRaises(SystemExit):
+            main(["stations.json", "--prune"])
+
+    def test_writes_report_and_pruned_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stations = os.path.join(tmp, "stations.json")
+            with open(stations, "w") as f:
+                # Port 9 (discard) refuses connections: a dead station with no server needed.
+                json.dump({"Nowhere,XX": {"coords": {"n": 0, "e": 0}, "urls": [
+                    {"name": "Dead", "url": "http://127.0.0.1:9/live"},
+                ]}}, f)
+            report, output = os.path.join(tmp, "health.jsonl"), os.path.join(tmp, "out.json")
+            main([stations, "--report", report, "--output", output, "--prune", "--timeout", "2"])
+            with open(report) as f:
+                self.assertFalse(json.loads(f.readline())["ok"])
+            with open(output) as f:
+                self.assertEqual(json.load(f), {})
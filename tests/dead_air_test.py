@@ -0,0 +1,95 @@
+import unittest
+
+import pytest
+
+np = pytest.importorskip("numpy", reason="Requires numpy (the deadair extra)")
+
+from radioglobe.dead_air import (  # noqa: E402
+    DEAD_AIR_NOISE,
+    DEAD_AIR_SILENCE,
+    DEAD_AIR_TONE,
+    DeadAirDetector,
+    analyse,
+    classify,
+)
+
+RATE = 16000
+
+
+def pcm(samples) -> bytes:
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def seconds(n: float = 0.5):
+    return np.arange(int(RATE * n)) / RATE
+
+
+def programme(n: float = 0.5):
+    """Stand-in for speech/music: a few harmonics plus some broadband energy."""
+    t = seconds(n)
+    rng = np.random.default_rng(0)
+    voiced = sum(0.1 * np.sin(2 * np.pi * f * t) for f in (180, 360, 540, 900))
+    return voiced * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t)) + 0.02 * rng.standard_normal(len(t))
+
+
+class TestClassify(unittest.TestCase):
+    def test_one_entry_per_whole_window(self):
+        rms_dbfs, flatness = analyse(pcm(np.zeros(2500)), window=1024)
+        self.assertEqual(len(rms_dbfs), 2)
+        self.assertEqual(len(flatness), 2)
+
+    def test_silence(self):
+        self.assertEqual(classify(*analyse(pcm(np.zeros(8000)))), DEAD_AIR_SILENCE)
+        quiet = 0.0005 * np.random.default_rng(1).standard_normal(8000)
+        self.assertEqual(classify(*analyse(pcm(quiet))), DEAD_AIR_SILENCE)
+
+    def test_carrier_tone(self):
+        tone = 0.5 * np.sin(2 * np.pi * 1000 * seconds())
+        self.assertEqual(classify(*analyse(pcm(tone))), DEAD_AIR_TONE)
+
+    def test_hiss(self):
+        hiss = 0.2 * np.random.default_rng(2).standard_normal(8000)
+        self.assertEqual(classify(*analyse(pcm(hiss))), DEAD_AIR_NOISE)
+
+    def test_programme_is_live(self):
+        self.assertIsNone(classify(*analyse(pcm(programme()))))
+
+
+class TestDeadAirDetector(unittest.TestCase):
+    def test_dead_only_after_hold(self):
+        detector = DeadAirDetector(hold=10)
+        silence = pcm(np.zeros(8000))
+        detector.feed(silence, 0.0)
+        detector.feed(silence, 9.0)
+        self.assertIsNone(detector.dead(9.0))
+        self.assertEqual(detector.dead(10.0), DEAD_AIR_SILENCE)
+
+    def test_live_block_restarts_the_clock(self):
+        detector = DeadAirDetector(hold=10)
+        detector.feed(pcm(np.zeros(8000)), 0.0)
+        detector.feed(pcm(programme()), 5.0)
+        detector.feed(pcm(np.zeros(8000)), 6.0)
+        self.assertIsNone(detector.dead(12.0))
+        self.assertEqual(detector.dead(16.0), DEAD_AIR_SILENCE)
+
+    def test_reset_forgets_verdict(self):
+        detector = DeadAirDetector(hold=1)
+        detector.feed(pcm(np.zeros(8000)), 0.0)
+        detector.reset()
+        self.assertIsNone(detector.dead(5.0))
+
+    def test_quiet_programme_at_low_volume_is_live(self):
+        # Soft programme (about -44 dBFS at full volume) played at volume 40,
+        # as the tap hears it after PulseAudio's cubic volume: around -68 dBFS.
+        volume = 40
+        heard = programme() * 0.07 * (volume / 100) ** 3
+        self.assertEqual(classify(*analyse(pcm(heard))), DEAD_AIR_SILENCE)   # the fixed threshold
+        detector = DeadAirDetector(hold=1)
+        detector.feed(pcm(heard), 0.0, volume)
+        detector.feed(pcm(heard), 5.0, volume)
+        self.assertIsNone(detector.dead(5.0))
+
+    def test_silence_at_low_volume_is_still_dead(self):
+        detector = DeadAirDetector(hold=1)
+        detector.feed(pcm(np.zeros(8000)), 0.0, 40)
+        self.assertEqual(detector.dead(1.0), DEAD_AIR_SILENCE)
@@ -0,0 +1,357 @@
+"""A local stand-in for internet radio broadcasters, for offline streaming tests.
+
+FakeRadioServer serves, on 127.0.0.1:
+
+  /stream.mp3           endless MP3 with Icecast's icy-* headers (and
+                        in-band StreamTitle metadata when the client sends
+                        Icy-MetaData: 1) - silent 128 kbps frames, or a
+                        looped MP3 file if given one
+  /stream.wav           endless WAV of a bundled vlc/wav file, same headers
+  /station.pls          a .pls playlist for /stream.mp3
+  /station.m3u          an .m3u playlist for /stream.mp3
+  /hls/master.m3u8      an HLS master playlist for a live sliding-window
+  /hls/live.m3u8        media playlist of 2 s packed-MP3 segments
+  /redirect/PATH        302 to /PATH
+
+Audio is paced at its bitrate after a burst-on-connect, like Icecast. Faults
+are set per server (Faults) and per request from the query string, so one
+server can play healthy and broken stations side by side:
+
+  delay=S         wait S seconds before answering
+  status=N        answer with HTTP status N instead of the stream
+  kbps=N          cap throughput at N kbps (below the bitrate, the player underruns)
+  burst=S         seconds of audio sent at once on connect
+  stall_after=S   stop sending after S seconds of streaming ...
+  stall_for=S     ... for S seconds, then carry on
+  fail_after=S    drop the connection after S seconds of streaming
+
+Playlists and redirects answer at once and pass their query string on to
+the URL they point at: /station.pls?stall_after=2 lists a stalling stream.
+
+No MP3 encoder is needed: MP3 mounts serve silent frames unless given a file,
+and the bundled WAVs are served as WAV, which VLC and mpv both stream.
+
+run: python tests/fake_radio_server.py [--port 8000] [--mp3 FILE] [--wav FILE] [--delay S] ...
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import os
+import struct
+import wave
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlencode
+
+from aiohttp import web
+
+DEFAULT_WAV = os.path.join(os.path.dirname(__file__), "..", "vlc", "wav", "piano2.wav")
+ICY_METAINT = 16000          # audio bytes between in-band metadata blocks
+HLS_SEGMENT_FRAMES = 77      # ~2 s of MP3 frames per HLS segment
+HLS_WINDOW = 3               # segments in the live media playlist
+_CHUNK_SECONDS = 0.1         # audio written per paced write
+
+# One silent MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, mono, no CRC.
+# All-zero side info means no main data, which decoders play as silence.
+_MP3_FRAME = b"\xff\xfb\x90\xc4" + bytes(413)
+_MP3_FRAME_SECONDS = 1152 / 44100
+
+
+@dataclass
+class Faults:
+    """How a stream misbehaves; every field can be overridden from the query string."""
+
+    delay: float = 0.0
+    status: int = 200
+    kbps: Optional[float] = None
+    burst: float = 2.0
+    stall_after: Optional[float] = None
+    stall_for: float = 0.0
+    fail_after: Optional[float] = None
+
+    def with_query(self, query) -> "Faults":
+        changes = {}
+        for field in dataclasses.fields(self):
+            if field.name in query:
+                convert = int if field.name == "status" else float
+                changes[field.name] = convert(query[field.name])
+        return dataclasses.replace(self, **changes)
+
+
+@dataclass
+class _Audio:
+    content_type: str
+    header: bytes            # sent once, before the looped body
+    body: bytes
+    bytes_per_second: float
+
+
+def _silent_mp3(seconds: float) -> bytes:
+    return _MP3_FRAME * max(1, round(seconds / _MP3_FRAME_SECONDS))
+
+
+def _load_wav(path: str) -> _Audio:
+    with wave.open(path, "rb") as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        body = f.readframes(f.getnframes())
+    byte_rate = rate * channels * width
+    # An endless stream: RIFF and data sizes at their maximum, as streaming encoders send.
+    header = (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt "
+        + struct.pack("<IHHIIHH", 16, 1, channels, rate, byte_rate, channels * width, width * 8)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+    return _Audio("audio/wav", header, body, byte_rate)
+
+
+class FakeRadioServer:
+    """An aiohttp server playing broadcaster; use as `async with FakeRadioServer() as server`.
+
+    requests records every path requested, in order, so a benchmark can
+    count connections (hedged requests, retries, failovers).
+    """
+
+    def __init__(
+        self,
+        faults: Optional[Faults] = None,
+        wav: str = DEFAULT_WAV,
+        mp3: Optional[str] = None,
+        mp3_kbps: int = 128,
+        name: str = "RadioGlobe Test FM",
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.faults = faults if faults is not None else Faults()
+        self.name = name
+        self.host = host
+        self.port = port
+        self.requests: list = []
+        self._wav = wav
+        if mp3 is None:
+            byte_rate = len(_MP3_FRAME) / _MP3_FRAME_SECONDS
+            self._mp3 = _Audio("audio/mpeg", b"", _silent_mp3(10), byte_rate)
+        else:
+            with open(mp3, "rb") as f:
+                self._mp3 = _Audio("audio/mpeg", b"", f.read(), mp3_kbps * 125)
+        self._audio: dict = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._started = 0.0
+
+    async def start(self) -> None:
+        self._audio = {"mp3": self._mp3, "wav": await asyncio.to_thread(_load_wav, self._wav)}
+        app = web.Application()
+        app.router.add_get("/stream.{format:mp3|wav}", self._stream)
+        app.router.add_get("/station.pls", self._pls)
+        app.router.add_get("/station.m3u", self._m3u)
+        app.router.add_get("/hls/master.m3u8", self._hls_master)
+        app.router.add_get("/hls/live.m3u8", self._hls_media)
+        app.router.add_get(r"/hls/{sequence:\d+}.mp3", self._hls_segment)
+        app.router.add_get("/redirect/{path:.+}", self._redirect)
+        self._runner = web.AppRunner(app, handle_signals=False)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        self._started = asyncio.get_running_loop().time()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeRadioServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def url(self, path: str = "/stream.mp3", **faults) -> str:
+        """http://host:port/path, with faults as its query string."""
+        query = f"?{urlencode(faults)}" if faults else ""
+        return f"http://{self.host}:{self.port}{path}{query}"
+
+    # ---------------------------------------------------------------------------
+    # Streams
+    # ---------------------------------------------------------------------------
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append(request.path)
+        faults = self.faults.with_query(request.query)
+        audio = self._audio[request.match_info["format"]]
+        await self._answer(faults)
+        metaint = ICY_METAINT if request.headers.get("Icy-MetaData") == "1" else None
+        headers = {
+            "Content-Type": audio.content_type,
+            "Cache-Control": "no-cache",
+            "icy-name": self.name,
+            "icy-genre": "Test",
+            "icy-br": str(round(audio.bytes_per_second / 125)),
+        }
+        if metaint:
+            headers["icy-metaint"] = str(metaint)
+        response = web.StreamResponse(headers=headers)
+        await response.prepare(request)
+        writer = _IcyWriter(response, metaint, f"StreamTitle='{self.name}';")
+        await writer.write(audio.header)
+        await self._play(request, writer, audio, faults)
+        return response
+
+    async def _answer(self, faults: Faults) -> None:
+        if faults.delay:
+            await asyncio.sleep(faults.delay)
+        if faults.status != 200:
+            raise _status(faults.status)
+
+    async def _play(
+        self, request: web.Request, writer: "_IcyWriter", audio: _Audio, faults: Faults
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        rate = audio.bytes_per_second
+        burst = min(len(audio.body), int(rate * faults.burst))
+        if faults.kbps and faults.kbps * 125 < rate:
+            rate, burst = faults.kbps * 125, 0   # a slow link can't burst either
+        chunk = max(1, int(rate * _CHUNK_SECONDS))
+        body, offset = audio.body, 0
+        stalled = False
+        started = loop.time()
+        sent = 0
+        while True:
+            elapsed = loop.time() - started
+            if faults.fail_after is not None and elapsed >= faults.fail_after:
+                request.transport.abort()   # an abrupt drop, not a clean end of stream
+                return
+            if not stalled and faults.stall_after is not None and elapsed >= faults.stall_after:
+                stalled = True
+                await asyncio.sleep(faults.stall_for)
+                started += faults.stall_for
+                continue
+            size = burst if sent == 0 and burst else chunk
+            data = body[offset: offset + size]
+            if len(data) < size:
+                offset = size - len(data)
+                data += body[:offset]
+            else:
+                offset += size
+            await writer.write(data)
+            sent += len(data)
+            # Sleep until the bytes sent so far are due at the capped rate.
+            due = started + max(0, sent - burst) / rate
+            await asyncio.sleep(max(0.0, due - loop.time()))
+
+    # ---------------------------------------------------------------------------
+    # Playlists and redirects
+    # ---------------------------------------------------------------------------
+
+    def _passed_on(self, request: web.Request, path: str) -> str:
+        query = f"?{request.query_string}" if request.query_string else ""
+        return f"http://{self.host}:{self.port}{path}{query}"
+
+    async def _pls(self, request: web.Request) -> web.Response:
+        self.requests.append(request.path)
+        text = (
+            f"[playlist]\nNumberOfEntries=1\nFile1={self._passed_on(request, '/stream.mp3')}\n"
+            f"Title1={self.name}\nLength1=-1\nVersion=2\n"
+        )
+        return web.Response(text=text, content_type="audio/x-scpls")
+
+    async def _m3u(self, request: web.Request) -> web.Response:
+        self.requests.append(request.path)
+        text = f"#EXTM3U\n#EXTINF:-1,{self.name}\n{self._passed_on(request, '/stream.mp3')}\n"
+        return web.Response(text=text, content_type="audio/x-mpegurl")
+
+    async def _redirect(self, request: web.Request) -> web.Response:
+        self.requests.append(request.path)
+        raise web.HTTPFound(self._passed_on(request, "/" + request.match_info["path"]))
+
+    async def _hls_master(self, request: web.Request) -> web.Response:
+        self.requests.append(request.path)
+        text = (
+            "#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=128000,CODECS=\"mp4a.40.34\"\n"
+            f"{self._passed_on(request, '/hls/live.m3u8')}\n"
+        )
+        return web.Response(text=text, content_type="application/vnd.apple.mpegurl")
+
+    async def _hls_media(self, request: web.Request) -> web.Response:
+        self.requests.append(request.path)
+        seconds = HLS_SEGMENT_FRAMES * _MP3_FRAME_SECONDS
+        latest = int((asyncio.get_running_loop().time() - self._started) / seconds)
+        first = max(0, latest - HLS_WINDOW + 1)
+        lines = [
+            "#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{round(seconds) + 1}",
+            f"#EXT-X-MEDIA-SEQUENCE:{first}",
+        ]
+        for sequence in range(first, latest + 1):
+            lines += [f"#EXTINF:{seconds:.3f},", self._passed_on(request, f"/hls/{sequence}.mp3")]
+        return web.Response(
+            text="\n".join(lines) + "\n", content_type="application/vnd.apple.mpegurl"
+        )
+
+    async def _hls_segment(self, request: web.Request) -> web.Response:
+        self.requests.append(request.path)
+        await self._answer(self.faults.with_query(request.query))
+        return web.Response(body=_MP3_FRAME * HLS_SEGMENT_FRAMES, content_type="audio/mpeg")
+
+
+def _status(status: int) -> web.HTTPException:
+    error = web.HTTPException()
+    error.set_status(status)
+    return error
+
+
+class _IcyWriter:
+    """Writes audio to a response, inserting a metadata block every metaint bytes."""
+
+    def __init__(self, response: web.StreamResponse, metaint: Optional[int], title: str) -> None:
+        self._response = response
+        self._metaint = metaint
+        self._until_meta = metaint
+        padded = title.encode()
+        padded += bytes(-len(padded) % 16)
+        self._meta = bytes([len(padded) // 16]) + padded
+
+    async def write(self, data: bytes) -> None:
+        if not self._metaint:
+            await self._response.write(data)
+            return
+        while data:
+            part, data = data[: self._until_meta], data[self._until_meta:]
+            await self._response.write(part)
+            self._until_meta -= len(part)
+            if self._until_meta == 0:
+                await self._response.write(self._meta)
+                self._until_meta = self._metaint
+
+
+async def _serve(args) -> None:
+    faults = Faults(
+        delay=args.delay, kbps=args.kbps, stall_after=args.stall_after,
+        stall_for=args.stall_for, fail_after=args.fail_after,
+    )
+    async with FakeRadioServer(faults, wav=args.wav, mp3=args.mp3, port=args.port) as server:
+        paths = ("/stream.mp3", "/stream.wav", "/station.pls", "/station.m3u", "/hls/master.m3u8")
+        for path in paths:
+            print(server.url(path))
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fake internet radio stations locally.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--wav", default=DEFAULT_WAV, help="WAV file for /stream.wav")
+    parser.add_argument("--mp3", help="MP3 file to loop on /stream.mp3 (default: silence)")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each answer")
+    parser.add_argument("--kbps", type=float, help="throughput cap")
+    parser.add_argument("--stall-after", type=float, help="seconds of streaming before a stall")
+    parser.add_argument("--stall-for", type=float, default=0.0, help="length of the stall")
+    parser.add_argument("--fail-after", type=float, help="seconds of streaming before a drop")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+import unittest
+
+import aiohttp
+
+from radioglobe.net.playlist import PlaylistResolver, is_hls, parse_playlist
+from tests.fake_radio_server import ICY_METAINT, Faults, FakeRadioServer
+
+
+class TestFakeRadioServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeRadioServer(Faults(burst=0.5))
+        await self.server.start()
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.stop()
+
+    async def test_mp3_stream_has_icy_headers_and_metadata(self):
+        headers = {"Icy-MetaData": "1"}
+        async with self.session.get(self.server.url(burst=2), headers=headers) as response:
+            self.assertEqual(response.content_type, "audio/mpeg")
+            self.assertEqual(response.headers["icy-br"], "128")
+            self.assertEqual(int(response.headers["icy-metaint"]), ICY_METAINT)
+            data = await response.content.readexactly(ICY_METAINT + 1)
+        self.assertEqual(data[:2], b"\xff\xfb")
+        self.assertGreater(data[-1], 0)   # the metadata block's length byte
+
+    async def test_wav_stream_is_an_endless_wav_paced_after_the_burst(self):
+        # Timed from before the request: the server's pacing starts once the
+        # request arrives, so a slow client can't eat into the paced part.
+        started = time.monotonic()
+        async with self.session.get(self.server.url("/stream.wav")) as response:
+            self.assertEqual(response.content_type, "audio/wav")
+            header = await response.content.readexactly(44)
+            self.assertEqual((header[:4], header[8:12]), (b"RIFF", b"WAVE"))
+            byte_rate = int.from_bytes(header[28:32], "little")
+            await response.content.readexactly(int(byte_rate * 0.8))
+            # 0.5 s came in the burst; the next 0.3 s are paced.
+            self.assertGreater(time.monotonic() - started, 0.2)
+
+    async def test_playlists_and_redirects_resolve_to_the_stream(self):
+        resolver = PlaylistResolver()
+        resolver.start()
+        try:
+            for path in ("/station.pls", "/station.m3u", "/redirect/station.pls"):
+                self.assertEqual(
+                    await resolver.resolve(self.server.url(path, delay=0.1)),
+                    self.server.url("/stream.mp3", delay=0.1),
+                )
+        finally:
+            await resolver.stop()
+
+    async def test_hls_playlists_list_live_segments(self):
+        async with self.session.get(self.server.url("/hls/master.m3u8")) as response:
+            master = await response.text()
+        self.assertTrue(is_hls(master))
+        [media_url] = parse_playlist(master)
+        async with self.session.get(media_url) as response:
+            segments = parse_playlist(await response.text())
+        async with self.session.get(segments[-1]) as response:
+            self.assertEqual((await response.content.read(2)), b"\xff\xfb")
+
+    async def test_delay_and_status_faults(self):
+        started = time.monotonic()
+        async with self.session.get(self.server.url(delay=0.2, status=503)) as response:
+            self.assertEqual(response.status, 503)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    async def test_stall_then_resume(self):
+        url = self.server.url(burst=0, stall_after=0.1, stall_for=0.3)
+        async with self.session.get(url) as response:
+            await response.content.readany()
+            started = time.monotonic()
+            gaps = []
+            while time.monotonic() - started < 0.6:
+                before = time.monotonic()
+                await response.content.readany()
+                gaps.append(time.monotonic() - before)
+        self.assertGreater(max(gaps), 0.2)
+
+    async def test_fail_after_drops_the_connection(self):
+        with self.assertRaises(aiohttp.ClientPayloadError):
+            async with self.session.get(self.server.url(fail_after=0.2)) as response:
+                await asyncio.wait_for(response.read(), 2)
+        self.assertEqual(self.server.requests, ["/stream.mp3"])
@@ -0,0 +1,52 @@
+import unittest
+
+from radioglobe.database import get_bitrate_ladders
+
+
+class TestGetBitrateLadders(unittest.TestCase):
+    def setUp(self):
+        self.sample_stations = {
+            "London,GB": {
+                "coords": {"n": 51.5, "e": -0.1},
+                "urls": [
+                    {
+                        "name": "BBC Radio 1",
+                        "url": "http://a/one?bitrate=320000",
+                        "bitrate": 320000,
+                        "variants": [
+                            {"url": "http://a/one?bitrate=48000", "bitrate": 48000},
+                            {"url": "http://a/one?bitrate=128000", "bitrate": 128000},
+                        ],
+                    },
+                    {"name": "Single", "url": "http://b/live"},
+                ],
+            },
+            "Elsewhere,XY": {
+                "coords": {"n": 0, "e": 0},
+                "urls": [
+                    {
+                        "name": "No Own Bitrate",
+                        "url": "http://c/hi",
+                        "variants": [{"url": "http://c/lo", "bitrate": 64000}, {"url": "bad"}],
+                    },
+                ],
+            },
+        }
+
+    def test_tiers_sorted_highest_first(self):
+        ladders = get_bitrate_ladders(self.sample_stations)
+        self.assertEqual(
+            ladders["http://a/one?bitrate=320000"],
+            [
+                (320000, "http://a/one?bitrate=320000"),
+                (128000, "http://a/one?bitrate=128000"),
+                (48000, "http://a/one?bitrate=48000"),
+            ],
+        )
+
+    def test_station_without_bitrate_is_the_top_tier(self):
+        ladders = get_bitrate_ladders(self.sample_stations)
+        self.assertEqual(ladders["http://c/hi"], [(None, "http://c/hi"), (64000, "http://c/lo")])
+
+    def test_single_bitrate_stations_have_no_ladder(self):
+        self.assertNotIn("http://b/live", get_bitrate_ladders(self.sample_stations))
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# audio_async.py imports vlc at module scope - stub it before importing
+# radioglobe.hal.audio_async so this test can run on any machine, as
+# buttons_test.py does for evdev. The VLC instance itself is replaced by
+# FakeVlcInstance below, so the stub only needs to satisfy the import.
+sys.modules.setdefault("vlc", MagicMock())
+
+from radioglobe.constants import AUDIO_ERROR, AUDIO_PLAYING  # noqa: E402
+from radioglobe.hal.audio_async import AudioPlayer  # noqa: E402
+from radioglobe.hal.audio_worker import AudioWorker  # noqa: E402
+from radioglobe.hal.protocols import AudioEvent  # noqa: E402
+from radioglobe.station_history import HISTORY_DECAY, StationHistory  # noqa: E402
+
+
+class FakeVlcPlayer:
+    """A libvlc MediaPlayer whose mute/volume only take effect once it has an
+    audio output, which, as in libvlc, is created when playback starts.
+    Records the thread of each mute/volume call, and any after release()."""
+
+    def __init__(self) -> None:
+        self.has_aout = False
+        self.muted = False
+        self.volume = 100
+        self.media = None
+        self.playing = False
+        self.released = False
+        self.threads: set = set()
+        self.used_after_release: list = []
+
+    def _use(self, name: str) -> None:
+        self.threads.add(threading.current_thread().name)
+        if self.released:
+            self.used_after_release.append(name)
+
+    def event_manager(self):
+        return MagicMock()
+
+    def set_media(self, media) -> None:
+        self.media = media
+
+    def play(self) -> None:
+        self.playing = True
+
+    def start_audio(self) -> None:
+        """Test hook: the audio output appears, audible at its defaults."""
+        self.has_aout = True
+
+    def audio_set_mute(self, muted: bool) -> None:
+        self._use("audio_set_mute")
+        if self.has_aout:
+            self.muted = muted
+
+    def audio_set_volume(self, volume: int) -> None:
+        self._use("audio_set_volume")
+        if self.has_aout:
+            self.volume = volume
+
+    def audio_get_volume(self) -> int:
+        return self.volume
+
+    def is_playing(self) -> bool:
+        return self.playing
+
+    def audible(self) -> bool:
+        return self.has_aout and not self.muted and self.volume > 0
+
+    def stop(self) -> None:
+        self.playing = False
+
+    def release(self) -> None:
+        self.released = True
+
+    def get_media(self):
+        self._use("get_media")
+        return None
+
+
+class FakeVlcInstance:
+    def __init__(self) -> None:
+        self.players: list = []
+
+    def media_player_new(self) -> FakeVlcPlayer:
+        self.players.append(FakeVlcPlayer())
+        return self.players[-1]
+
+    def media_new(self, url, *options):
+        return MagicMock(url=url, options=options)
+
+
+def make_player() -> AudioPlayer:
+    path = os.path.join(tempfile.mkdtemp(), "history.json")
+    player = AudioPlayer(history=StationHistory(path=path))
+    player._loop = asyncio.get_running_loop()
+    player.instance = FakeVlcInstance()
+    player.player = player._new_player()
+    return player
+
+
+class TestStandbyMute(unittest.IsolatedAsyncioTestCase):
+    async def test_standby_is_silent_once_it_starts_playing(self):
+        player = make_player()
+        player.player.start_audio()
+        player.play("http://live.example/stream")
+        player.prefetch(["http://next.example/stream"])
+        standby = player._standby["http://next.example/stream"]
+
+        standby.start_audio()   # muting before play() did nothing
+        player._post_event(AudioEvent(AUDIO_PLAYING, "http://next.example/stream"))
+
+        self.assertFalse(standby.audible())
+        self.assertTrue(player.player.audible())
+
+    async def test_swapped_in_standby_plays_at_the_current_volume(self):
+        player = make_player()
+        player.player.start_audio()
+        player.player.audio_set_volume(60)
+        player.play("http://live.example/stream")
+        player.prefetch(["http://next.example/stream"])
+        standby = player._standby["http://next.example/stream"]
+        standby.start_audio()
+        player._post_event(AudioEvent(AUDIO_PLAYING, "http://next.example/stream"))
+
+        player.play("http://next.example/stream")
+        self.assertIs(player.player, standby)
+        self.assertTrue(standby.audible())
+        self.assertEqual(standby.volume, 60)
+
+
+class TestWorkerOwnership(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.player = make_player()
+        self.worker = AudioWorker(self.player)
+        self.worker.start()
+        await self.worker.play("http://live.example/stream")
+        await self.worker.prefetch(["http://next.example/stream"])
+        self.standby = self.player._standby["http://next.example/stream"]
+        self.standby.start_audio()
+        self.standby.threads.clear()
+
+    async def asyncTearDown(self):
+        await self.worker.stop()
+
+    async def test_events_are_observed_on_the_worker(self):
+        self.player._post_event(AudioEvent(AUDIO_PLAYING, "http://next.example/stream"))
+        await self.worker.wait_idle()
+        self.assertEqual(self.standby.threads, {"audio-worker"})
+        self.assertFalse(self.standby.audible())
+
+    async def test_an_event_after_a_release_never_touches_the_released_player(self):
+        self.worker.prefetch([])
+        self.player._post_event(AudioEvent(AUDIO_PLAYING, "http://next.example/stream"))
+        await self.worker.wait_idle()
+        self.assertTrue(self.standby.released)
+        self.assertEqual(self.standby.used_after_release, [])
+
+
+class TestStationKeyedHistory(unittest.IsolatedAsyncioTestCase):
+    async def test_history_follows_the_station_across_relay_ports(self):
+        player = make_player()
+        player.play("http://127.0.0.1:40001/s?u=1", station="http://station.example/live")
+        player.play("http://127.0.0.1:40002/s?u=1", station="http://station.example/live")
+
+        record = player.history.get("http://station.example/live")
+        self.assertAlmostEqual(record["plays"], HISTORY_DECAY + 1)
+        self.assertIsNone(player.history.get("http://127.0.0.1:40002/s?u=1"))
+
+    async def test_prefetched_stream_records_under_its_station(self):
+        player = make_player()
+        player.play("http://live.example/stream", station="http://live.example/")
+        player.prefetch(["http://cdn.example/x?token=1"], stations=["http://next.example/"])
+        player._observe(AudioEvent(AUDIO_ERROR, "http://cdn.example/x?token=1"))
+
+        self.assertEqual(player.history.get("http://next.example/")["stalls"], 1)
+        self.assertIsNone(player.history.get("http://cdn.example/x?token=1"))
+
+    async def test_late_event_for_a_dropped_stream_is_not_recorded(self):
+        player = make_player()
+        player.play("http://old.example/stream", station="http://old.example/")
+        player.play("http://new.example/stream", station="http://new.example/")
+        player._observe(AudioEvent(AUDIO_ERROR, "http://old.example/stream"))
+
+        self.assertEqual(player.history.get("http://old.example/")["stalls"], 0)
+        self.assertIsNone(player.history.get("http://old.example/stream"))
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from radioglobe.constants import AUDIO_ENDED, AUDIO_ERROR, AUDIO_PLAYING
+from radioglobe.hal.audio_mpv import MpvAudioPlayer
+from radioglobe.hal.factory import build_audio_player
+from radioglobe.hal.protocols import AudioPlayerProtocol
+
+FAKE_MPV = (sys.executable, os.path.join(os.path.dirname(__file__), "fake_mpv.py"))
+
+
+class TestMpvAudioPlayer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "commands.jsonl")
+        os.environ["FAKE_MPV_LOG"] = self.log
+        self.player = MpvAudioPlayer(command=FAKE_MPV)
+        self.player.start()
+
+    async def asyncTearDown(self):
+        await self.player.stop()
+        os.environ.pop("FAKE_MPV_LOG", None)
+        self.tmp.cleanup()
+
+    async def next_event(self, kind):
+        while True:
+            event = await asyncio.wait_for(self.player.events.get(), 2)
+            if event.kind == kind:
+                return event
+
+    def commands(self):
+        with open(self.log) as f:
+            return [json.loads(line) for line in f]
+
+    def test_satisfies_protocol(self):
+        self.assertIsInstance(MpvAudioPlayer(), AudioPlayerProtocol)
+
+    async def test_play_reports_playing_for_the_url(self):
+        self.assertTrue(self.player.is_error())
+        self.player.play("http://a/live")
+        event = await self.next_event(AUDIO_PLAYING)
+        self.assertEqual(event.url, "http://a/live")
+        self.assertFalse(self.player.is_error())
+        self.assertIsNotNone(self.player.first_audio_time)
+
+    async def test_switching_reuses_one_process(self):
+        process = self.player._process
+        self.player.play("http://a/one")
+        await self.next_event(AUDIO_PLAYING)
+        self.player.play("http://a/two")
+        event = await self.next_event(AUDIO_PLAYING)
+        self.assertEqual(event.url, "http://a/two")
+        self.assertIs(self.player._process, process)
+        loads = [c for c in self.commands() if c[0] == "loadfile"]
+        self.assertEqual(loads, [
+            ["loadfile", "http://a/one", "replace"], ["loadfile", "http://a/two", "replace"],
+        ])
+
+    async def test_failed_and_ended_streams_are_reported(self):
+        self.player.play("http://a/fail")
+        self.assertEqual((await self.next_event(AUDIO_ERROR)).url, "http://a/fail")
+        self.assertTrue(self.player.is_error())
+        self.player.play("http://a/eof")
+        self.assertEqual((await self.next_event(AUDIO_ENDED)).url, "http://a/eof")
+        self.assertTrue(self.player.is_error())
+
+    async def test_volume_is_clamped_and_sent(self):
+        self.assertEqual(self.player.change_volume_level(50), 50)
+        self.assertEqual(self.player.change_volume(70), 100)
+        self.assertEqual(self.player.change_volume(-95), 10)
+        await asyncio.sleep(0.05)
+        volumes = [c[2] for c in self.commands() if c[:2] == ["set_property", "volume"]]
+        self.assertEqual(volumes[-3:], [50, 100, 10])
+
+    async def test_progress_counts_input_bytes(self):
+        self.assertIsNone(self.player.progress())
+        self.player.play("http://a/live")
+        await self.next_event(AUDIO_PLAYING)
+        await asyncio.sleep(0.15)
+        first = self.player.progress()
+        await asyncio.sleep(0.1)
+        second = self.player.progress()
+        self.assertGreater(second["read_bytes"], first["read_bytes"])
+        self.assertEqual(second["input_bitrate"], 16.0)
+
+    async def test_progress_stops_when_cache_updates_stop(self):
+        self.player.play("http://a/live")
+        await self.next_event(AUDIO_PLAYING)
+        await asyncio.sleep(0.1)
+        self.player._send("stall")
+        await asyncio.sleep(0.05)
+        stalled = self.player.progress()
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.player.progress()["read_bytes"], stalled["read_bytes"])
+
+    async def test_dead_mpv_reports_error_and_restarts_on_next_play(self):
+        self.player.play("http://a/live")
+        await self.next_event(AUDIO_PLAYING)
+        self.player._send("crash")
+        self.assertEqual((await self.next_event(AUDIO_ERROR)).url, "http://a/live")
+        await asyncio.sleep(0.05)
+        self.player.play("http://a/again")
+        self.assertEqual((await self.next_event(AUDIO_PLAYING)).url, "http://a/again")
+        self.assertEqual(self.player.restarts, 1)
+
+
+class TestBuildAudioPlayer(unittest.TestCase):
+    def test_mpv_backend(self):
+        self.assertIsInstance(build_audio_player("mpv"), MpvAudioPlayer)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            build_audio_player("gstreamer")
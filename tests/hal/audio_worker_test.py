@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import unittest
+
+from radioglobe.hal.audio_worker import AudioWorker
+from radioglobe.hal.fake import FakeAudioPlayer
+
+
+class GatedAudioPlayer(FakeAudioPlayer):
+    """FakeAudioPlayer whose play() blocks until released, like a slow libvlc stop()."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def play(self, url, station=None):
+        self.entered.set()
+        self.release.wait(timeout=5)
+        super().play(url, station)
+
+
+class FailingAudioPlayer(FakeAudioPlayer):
+    def play(self, url, station=None):
+        raise RuntimeError("libvlc refused")
+
+
+class ThreadRecordingAudioPlayer(FakeAudioPlayer):
+    """FakeAudioPlayer with AudioPlayer's dispatch hook, recording which
+    thread each call ran on."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.dispatch = lambda call, *args: call(*args)
+
+    def _record(self, name):
+        self.calls.append((name, threading.current_thread().name))
+
+    def record_call(self, _):
+        self._record("record_call")
+
+    def play(self, url, station=None):
+        self._record("play")
+        super().play(url, station)
+
+    def is_error(self):
+        self._record("is_error")
+        return super().is_error()
+
+    def progress(self):
+        self._record("progress")
+        return super().progress()
+
+
+class TestAudioWorker(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        if isinstance(self.player, GatedAudioPlayer):
+            self.player.release.set()
+        await self.worker.stop()
+
+    def make_worker(self, player):
+        self.player = player
+        self.worker = AudioWorker(player)
+        self.worker.start()
+        return self.worker
+
+    async def test_queued_plays_coalesce_to_latest(self):
+        worker = self.make_worker(GatedAudioPlayer())
+        first = worker.play("url0")
+        await asyncio.to_thread(self.player.entered.wait, 5)
+        futures = [worker.play(f"url{i}") for i in range(1, 6)]
+        self.assertEqual(worker.current_url, "url5")
+        self.assertTrue(await worker.is_error())
+        self.player.release.set()
+        await asyncio.gather(first, *futures)
+        self.assertEqual(self.player.played, ["url0", "url5"])
+        self.assertEqual(worker.coalesced, 4)
+        self.assertFalse(await worker.is_error())
+
+    async def test_volume_steps_merge(self):
+        worker = self.make_worker(GatedAudioPlayer())
+        worker.play("url0")
+        await asyncio.to_thread(self.player.entered.wait, 5)
+        worker.change_volume_level(50)
+        worker.change_volume(10)
+        last = worker.change_volume(10)
+        self.player.release.set()
+        self.assertEqual(await last, 70)
+        self.assertEqual(self.player.volume, 70)
+
+    async def test_latency_stats_recorded(self):
+        worker = self.make_worker(FakeAudioPlayer())
+        await worker.play("url0")
+        await worker.change_volume(10)
+        stats = worker.latency_stats()
+        self.assertEqual(stats["play"]["count"], 1)
+        self.assertEqual(stats["change_volume"]["count"], 1)
+        self.assertGreaterEqual(stats["play"]["max"], stats["play"]["mean"])
+
+    async def test_player_exception_reaches_future(self):
+        worker = self.make_worker(FailingAudioPlayer())
+        with self.assertLogs(level="ERROR"):
+            with self.assertRaises(RuntimeError):
+                await worker.play("url0")
+        # The worker survives a failed command.
+        self.assertEqual(await worker.change_volume_level(30), 30)
+
+    async def test_stop_stops_wrapped_player(self):
+        worker = self.make_worker(FakeAudioPlayer())
+        await worker.play("url0")
+        await worker.stop()
+        self.assertEqual(self.player.stopped_calls, 1)
+
+    async def test_queries_and_dispatched_calls_run_on_the_worker_in_order(self):
+        player = ThreadRecordingAudioPlayer()
+        worker = self.make_worker(player)
+        await worker.play("url0")
+        player.dispatch(player.record_call, "event")
+        self.assertFalse(await worker.is_error())
+        player.advance()
+        self.assertIsNotNone(await worker.progress())
+        self.assertEqual(
+            [name for name, _ in player.calls], ["play", "record_call", "is_error", "progress"]
+        )
+        self.assertEqual({thread for _, thread in player.calls}, {"audio-worker"})
+
+    async def test_dispatch_is_dropped_once_stopping(self):
+        player = ThreadRecordingAudioPlayer()
+        worker = self.make_worker(player)
+        await worker.play("url0")
+        await worker.stop()
+        player.dispatch(player.record_call, "late event")
+        self.assertEqual([name for name, _ in player.calls], ["play"])
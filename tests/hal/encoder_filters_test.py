@@ -0,0 +1,92 @@
+import random
+import unittest
+
+from radioglobe.hal.encoder_filters import (
+    KalmanFilter,
+    MedianFilter,
+    PassThrough,
+    circular_delta,
+    make_filter,
+)
+from radioglobe.hal.positional_encoders import PositionalEncoders
+
+
+def boundary_trace(samples: int, centre: float = 100.5, seed: int = 1) -> list:
+    """Raw readings of a globe parked on a cell boundary: the EMS22A50's
+    ~0.34-step RMS transition noise, plus an occasional 3-step glitch."""
+    rng = random.Random(seed)
+    trace = []
+    for index in range(samples):
+        glitch = 3 if index % 97 == 50 else 0
+        trace.append((round(centre + rng.gauss(0, 0.34)) + glitch) % 1024)
+    return trace
+
+
+def run_trace(encoders: PositionalEncoders, latitudes: list, interval: float = 0.05) -> None:
+    start = encoders._last_sample[1] + interval if encoders._last_sample else 0.0
+    for index, latitude in enumerate(latitudes):
+        encoders._handle_readings(encoders._filter([latitude, 700]), start + index * interval)
+
+
+class TestFilters(unittest.TestCase):
+    def test_circular_delta_takes_the_short_way_round(self):
+        self.assertEqual(circular_delta(0, 1023), 1)
+        self.assertEqual(circular_delta(1023, 0), -1)
+        self.assertEqual(circular_delta(600, 100), 500)
+        self.assertEqual(circular_delta(100, 700), 424)
+
+    def test_median_drops_a_spike_and_passes_a_step(self):
+        median = MedianFilter(3)
+        self.assertEqual([median.update(v) for v in (100, 100, 140, 100, 100, 120, 120)],
+                         [100, 100, 100, 100, 100, 100, 120])
+
+    def test_median_across_the_wrap(self):
+        median = MedianFilter(3)
+        self.assertEqual([median.update(v) for v in (1022, 1023, 0, 2)], [1022, 1022, 1023, 0])
+
+    def test_kalman_follows_a_step_and_wraps(self):
+        kalman = KalmanFilter()
+        outputs = [kalman.update(v) for v in [1020] * 5 + [4] * 8]
+        self.assertEqual(outputs[0], 1020)
+        self.assertEqual(outputs[-1], 4)
+
+    def test_make_filter(self):
+        self.assertIsInstance(make_filter("none"), PassThrough)
+        self.assertEqual(make_filter("median", 5).window, 5)
+        with self.assertRaises(ValueError):
+            make_filter("bessel")
+
+
+class TestBoundaryNoiseTrace(unittest.TestCase):
+    """A minute of 20 Hz readings parked on a cell boundary: the raw pipeline
+    (no filter, publish on every change) against the filtered one."""
+
+    trace = boundary_trace(1200)
+
+    def test_fewer_lookups_while_unlatched(self):
+        updates = {}
+        for kind, enter in (("none", 1), ("median", 2), ("kalman", 2)):
+            encoders = PositionalEncoders(filter_kind=kind, enter_steps=enter)
+            run_trace(encoders, self.trace)
+            updates[kind] = encoders.updates
+        self.assertGreater(updates["none"], 200)
+        self.assertLessEqual(updates["median"], 2)
+        self.assertLessEqual(updates["kalman"], 2)
+
+    def test_no_unlatch_while_parked_across_the_wrap(self):
+        # Latched on the 1023/0 seam, where the old latch measured a 1023-step move.
+        trace = boundary_trace(1200, centre=1023.5)
+        for kind in ("none", "median", "kalman"):
+            encoders = PositionalEncoders(filter_kind=kind)
+            run_trace(encoders, trace[:5])
+            encoders.latch(*encoders.get_readings(), stickiness=2)
+            run_trace(encoders, trace[5:])
+            self.assertEqual(encoders.unlatches, 0, kind)
+
+    def test_a_real_move_still_unlatches(self):
+        encoders = PositionalEncoders(filter_kind="median")
+        run_trace(encoders, [100] * 5)
+        encoders.latch(*encoders.get_readings(), stickiness=2)
+        run_trace(encoders, [110] * 4)
+        self.assertEqual(encoders.unlatches, 1)
+        self.assertEqual(encoders.latitude, 1024 - 110)
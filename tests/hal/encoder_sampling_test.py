@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+from radioglobe.hal.encoder_sampling import (
+    MODE_IDLE,
+    MODE_MOVING,
+    MODE_SETTLED,
+    AdaptiveSampler,
+    step_distance,
+)
+from radioglobe.hal.encoder_spi import EncoderSpi
+from radioglobe.hal.positional_encoders import PositionalEncoders
+from tests.hal.encoder_spi_test import FakeSpiDev, word
+
+
+class TestAdaptiveSampler(unittest.TestCase):
+    def setUp(self):
+        self.sampler = AdaptiveSampler(
+            fast_interval=0.005, interval=0.05, idle_interval=0.25, moving_hold=0.5, idle_after=10
+        )
+
+    def test_step_distance_wraps(self):
+        self.assertEqual(step_distance(1020, 3), 7)
+        self.assertEqual(step_distance(3, 1020), 7)
+
+    def test_movement_snaps_to_fast_then_settles_then_idles(self):
+        self.assertEqual(self.sampler.observe([100, 100], 0.0), 0.05)
+        self.assertEqual(self.sampler.observe([101, 100], 0.05), 0.05)   # one-step noise
+        self.assertEqual(self.sampler.observe([110, 100], 0.1), 0.005)
+        self.assertEqual(self.sampler.mode, MODE_MOVING)
+        self.assertEqual(self.sampler.observe([110, 100], 0.5), 0.005)
+        self.assertEqual(self.sampler.observe([110, 100], 0.7), 0.05)
+        self.assertEqual(self.sampler.mode, MODE_SETTLED)
+        self.assertEqual(self.sampler.observe(None, 10.2), 0.25)
+        self.assertEqual(self.sampler.mode, MODE_IDLE)
+        self.assertEqual(self.sampler.observe([500, 100], 10.3), 0.005)
+
+    def test_stats_report_time_at_each_rate(self):
+        for now in (0.0, 0.05, 0.1):
+            self.sampler.observe([0, 0], now)
+        self.sampler.observe([50, 0], 0.2)
+        stats = self.sampler.stats()
+        self.assertEqual((stats["wakeups"], stats["movements"], stats["mode"]), (4, 1, MODE_MOVING))
+        self.assertAlmostEqual(stats["seconds"][MODE_SETTLED], 0.2)
+        self.assertAlmostEqual(stats["samples_per_second"], 20)
+
+
+class TestPositionalEncodersPolling(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        FakeSpiDev.calls = []
+        FakeSpiDev.replies = {0: [word(24)], 1: [word(512)]}
+        sampler = AdaptiveSampler(
+            fast_interval=0.001, interval=0.005, idle_interval=0.01,
+            moving_hold=0.02, idle_after=0.05,
+        )
+        self.encoders = PositionalEncoders(spi=EncoderSpi(spi_factory=FakeSpiDev), sampler=sampler)
+        self.encoders.start()
+
+    async def asyncTearDown(self):
+        await self.encoders.stop()
+
+    async def next_update(self):
+        await asyncio.wait_for(self.encoders.updated.wait(), 1)
+        self.encoders.updated.clear()
+
+    async def test_steady_readings_are_published_once(self):
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.encoders.updates, 1)
+        self.assertEqual(self.encoders.sampler.mode, MODE_IDLE)
+
+    async def test_new_positions_and_reset_latch_are_published(self):
+        await self.next_update()
+        FakeSpiDev.replies[0] = [word(40)]
+        await self.next_update()
+        self.assertEqual(self.encoders.latitude, 1024 - 40)
+        self.assertEqual(self.encoders.sampler.mode, MODE_MOVING)
+
+        self.encoders.latch(*self.encoders.get_readings(), stickiness=100)
+        await asyncio.sleep(0.02)
+        self.encoders.reset_latch()
+        await self.next_update()   # the unchanged reading, once, so the loop can re-latch
+        self.assertEqual(self.encoders.updates, 3)
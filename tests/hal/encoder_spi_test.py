@@ -0,0 +1,82 @@
+import unittest
+
+from radioglobe.hal.encoder_spi import EncoderSpi, parity_ok
+from radioglobe.hal.positional_encoders import PositionalEncoders
+
+
+def word(position: int) -> list:
+    """A 2-byte EMS22A reply for position, with status bits clear and even parity."""
+    raw = position << 6
+    raw |= bin(raw).count("1") & 1
+    return [raw >> 8, raw & 0xFF]
+
+
+class FakeSpiDev:
+    """Records spidev calls; readbytes() replies from a per-device list of words,
+    repeating the last one once the rest are used up."""
+
+    replies: dict = {}
+    calls: list = []
+
+    def open(self, bus, device):
+        self.device = device
+        self.calls.append(("open", bus, device))
+
+    def readbytes(self, n):
+        self.calls.append(("read", self.device))
+        replies = self.replies[self.device]
+        return replies.pop(0) if len(replies) > 1 else replies[0]
+
+    def close(self):
+        self.calls.append(("close", self.device))
+
+
+class TestParity(unittest.TestCase):
+    def test_table_matches_the_bit_loop_for_every_word(self):
+        for raw in range(1 << 16):
+            data, computed = raw >> 1, 0
+            while data:
+                computed ^= data & 1
+                data >>= 1
+            self.assertEqual(parity_ok(raw >> 8, raw & 0xFF), (raw & 1) == computed)
+
+
+class TestEncoderSpi(unittest.TestCase):
+    def setUp(self):
+        FakeSpiDev.calls = []
+        FakeSpiDev.replies = {0: [word(100), word(7)], 1: [word(1023), word(8)]}
+        self.spi = EncoderSpi(spi_factory=FakeSpiDev)
+
+    def test_handles_opened_once_and_read_back_to_back(self):
+        self.spi.open()
+        self.spi.open()
+        self.assertEqual(self.spi.read(), [100, 1023])
+        self.assertEqual(self.spi.read(), [7, 8])
+        self.spi.close()
+        self.assertEqual(
+            FakeSpiDev.calls,
+            [("open", 0, 0), ("open", 0, 1), ("read", 0), ("read", 1),
+             ("read", 0), ("read", 1), ("close", 0), ("close", 1)],
+        )
+        stats = self.spi.stats()
+        self.assertEqual((stats["samples"], stats["syscalls"]), (2, 12))
+        self.assertIsNotNone(stats["read_us"])
+
+    def test_parity_failure_returns_none_and_is_counted(self):
+        FakeSpiDev.replies[0][0] = [word(100)[0], word(100)[1] ^ 1]
+        self.spi.open()
+        self.assertIsNone(self.spi.read())
+        self.assertEqual(self.spi.stats()["parity_errors"], 1)
+
+
+class TestPositionalEncodersSpi(unittest.IsolatedAsyncioTestCase):
+    async def test_start_opens_and_stop_closes_the_handles(self):
+        FakeSpiDev.calls = []
+        FakeSpiDev.replies = {0: [word(24)], 1: [word(512)]}
+        encoders = PositionalEncoders(spi=EncoderSpi(spi_factory=FakeSpiDev))
+        encoders.start()
+        await encoders.updated.wait()
+        self.assertEqual((encoders.latitude, encoders.longitude), (1000, 512))
+        await encoders.stop()
+        self.assertEqual(sum(call[0] == "open" for call in FakeSpiDev.calls), 2)
+        self.assertEqual(FakeSpiDev.calls[-2:], [("close", 0), ("close", 1)])
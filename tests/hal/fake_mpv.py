@@ -0,0 +1,78 @@
+"""Stand-in for `mpv --idle --input-ipc-server=PATH`, for audio_mpv_test.py.
+
+Speaks just enough of mpv's JSON IPC: loadfile starts a file (failing it
+if the URL contains "fail", ending it if it contains "eof"), reports cache
+state while "playing" (until a "stall" command silences it), and quit
+exits. Every command line received is
+appended to the file named by FAKE_MPV_LOG, if set.
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+
+
+def main() -> None:
+    path = next(arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--input-ipc-server="))
+    log = os.environ.get("FAKE_MPV_LOG")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    conn, _ = server.accept()
+    conn.settimeout(0.02)
+    entry_id = 0
+    playing = False
+    buffered = b""
+
+    def send(message: dict) -> None:
+        conn.sendall((json.dumps(message) + "\n").encode())
+
+    while True:
+        try:
+            data = conn.recv(4096)
+            if not data:
+                return
+            buffered += data
+        except socket.timeout:
+            if playing:
+                send({"event": "property-change", "id": 3, "name": "demuxer-cache-state",
+                      "data": {"raw-input-rate": 16000}})
+            continue
+        while b"\n" in buffered:
+            line, buffered = buffered.split(b"\n", 1)
+            command = json.loads(line)["command"]
+            if log:
+                with open(log, "a") as f:
+                    f.write(json.dumps(command) + "\n")
+            send({"error": "success", "data": None})
+            if command[0] == "quit":
+                return
+            if command[0] == "crash":
+                os._exit(1)
+            if command[0] == "stall":
+                playing = False
+                continue
+            if command[0] != "loadfile":
+                continue
+            if entry_id:
+                send({"event": "end-file", "reason": "stop", "playlist_entry_id": entry_id})
+            entry_id += 1
+            url = command[1]
+            send({"event": "start-file", "playlist_entry_id": entry_id})
+            if "fail" in url:
+                playing = False
+                send({"event": "end-file", "reason": "error", "playlist_entry_id": entry_id})
+                continue
+            send({"event": "file-loaded"})
+            send({"event": "playback-restart"})
+            playing = True
+            if "eof" in url:
+                time.sleep(0.05)
+                playing = False
+                send({"event": "end-file", "reason": "eof", "playlist_entry_id": entry_id})
+
+
+if __name__ == "__main__":
+    main()
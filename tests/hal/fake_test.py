@@ -1,6 +1,7 @@
 import asyncio
 import unittest
 
+from radioglobe.constants import AUDIO_ERROR, AUDIO_PLAYING
 from radioglobe.hal.buttons import ButtonDefinition
 from radioglobe.hal.fake import (
     FakeAudioPlayer,
@@ -121,6 +122,20 @@ class TestFakeAudioPlayer(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(player.played, ["http://example.com/stream"])
         self.assertFalse(player.is_error())
 
+    def test_prefetch_records_standbys_excluding_current(self):
+        player = FakeAudioPlayer()
+        player.play("urlA")
+        player.prefetch(["urlA", "urlB", "urlC"])
+        self.assertEqual(player.prefetched, ["urlB", "urlC"])
+
+    def test_set_error_and_emit_queue_events_for_current_url(self):
+        player = FakeAudioPlayer()
+        player.play("urlA")
+        player.emit(AUDIO_PLAYING)
+        player.set_error(True)
+        self.assertEqual(player.events.get_nowait()[:2], (AUDIO_PLAYING, "urlA"))
+        self.assertEqual(player.events.get_nowait()[:2], (AUDIO_ERROR, "urlA"))
+
     def test_change_volume_clamps(self):
         player = FakeAudioPlayer()
         player.volume = 95
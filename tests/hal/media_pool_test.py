@@ -0,0 +1,177 @@
+import tracemalloc
+import unittest
+
+from radioglobe.hal.media_pool import MediaPool
+from radioglobe.radio_config import MEDIA_POOL_SIZE
+from tests.hal.audio_async_test import FakeVlcInstance, FakeVlcPlayer, make_player
+
+
+class FakeMedia:
+    live = 0
+
+    def __init__(self, url, *options):
+        self.url = url
+        self.options = options
+        self.released = False
+        FakeMedia.live += 1
+
+    def release(self):
+        assert not self.released, "media released twice"
+        self.released = True
+        FakeMedia.live -= 1
+
+
+class RefCountedMedia(FakeMedia):
+    """A libvlc Media: freed when the last of media_new()'s and each
+    MediaPlayer's references is released."""
+
+    def __init__(self, url, *options):
+        super().__init__(url, *options)
+        self.refs = 1
+
+    def retain(self):
+        assert not self.released, "media used after it was freed"
+        self.refs += 1
+
+    def release(self):
+        self.refs -= 1
+        if self.refs == 0:
+            super().release()
+
+
+class NullEventManager:
+    def event_attach(self, *args) -> None:
+        pass
+
+
+class RefCountingVlcPlayer(FakeVlcPlayer):
+    """A MediaPlayer that holds a reference to its media, as libvlc's does."""
+
+    def event_manager(self):
+        # Not a MagicMock: thousands of those would swamp the tracemalloc check.
+        return NullEventManager()
+
+    def set_media(self, media) -> None:
+        media.retain()
+        if self.media is not None:
+            self.media.release()
+        self.media = media
+
+    def release(self) -> None:
+        super().release()
+        if self.media is not None:
+            self.media.release()
+            self.media = None
+
+
+class RefCountingVlcInstance(FakeVlcInstance):
+    def media_player_new(self) -> RefCountingVlcPlayer:
+        # Keep only the live ones, so a long soak doesn't measure this list.
+        self.players = [player for player in self.players if not player.released]
+        self.players.append(RefCountingVlcPlayer())
+        return self.players[-1]
+
+    def media_new(self, url, *options):
+        return RefCountedMedia(url, *options)
+
+
+class TestMediaPool(unittest.TestCase):
+    def setUp(self):
+        FakeMedia.live = 0
+
+    def test_same_url_and_options_reuse_media(self):
+        pool = MediaPool(FakeMedia, capacity=2)
+        first = pool.get("urlA", (":network-caching=500",))
+        self.assertIs(pool.get("urlA", (":network-caching=500",)), first)
+        self.assertEqual(pool.stats()["hits"], 1)
+        self.assertEqual(pool.stats()["misses"], 1)
+
+    def test_changed_options_rebuild_and_release_old_media(self):
+        pool = MediaPool(FakeMedia, capacity=2)
+        first = pool.get("urlA", (":network-caching=500",))
+        second = pool.get("urlA", (":network-caching=1500",))
+        self.assertIsNot(second, first)
+        self.assertTrue(first.released)
+        self.assertEqual(pool.stats()["stale"], 1)
+
+    def test_least_recently_used_is_evicted_and_released(self):
+        pool = MediaPool(FakeMedia, capacity=2)
+        a = pool.get("urlA")
+        b = pool.get("urlB")
+        pool.get("urlA")
+        pool.get("urlC")
+        self.assertTrue(b.released)
+        self.assertFalse(a.released)
+        self.assertEqual(pool.stats()["evictions"], 1)
+        pool.clear()
+        self.assertEqual(FakeMedia.live, 0)
+
+    def test_soak_thousands_of_flips_keeps_memory_flat(self):
+        pool = MediaPool(FakeMedia, capacity=8)
+        urls = [f"http://station/{i}" for i in range(20)]
+
+        def flip(count):
+            for i in range(count):
+                # Mostly back-and-forth between neighbours, with periodic jumps away.
+                url = urls[(i // 3) % len(urls)] if i % 7 else urls[i % len(urls)]
+                pool.get(url, (":network-caching=500",))
+
+        tracemalloc.start()
+        try:
+            flip(1000)
+            warm, _ = tracemalloc.get_traced_memory()
+            flip(5000)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLessEqual(FakeMedia.live, 8)
+        self.assertEqual(len(pool), 8)
+        self.assertLess(after - warm, 16 * 1024)
+        stats = pool.stats()
+        self.assertEqual(stats["misses"] - stats["evictions"], len(pool))
+        self.assertGreater(stats["hits"], 0)
+
+
+class TestAudioPlayerMediaSoak(unittest.IsolatedAsyncioTestCase):
+    """The soak above, through AudioPlayer: every switch replaces a player's
+    media and every prefetch() evicts standbys, and none may leak a media."""
+
+    def setUp(self):
+        FakeMedia.live = 0
+
+    async def test_soak_flips_with_standbys_release_every_dropped_media(self):
+        player = make_player()
+        player.instance = RefCountingVlcInstance()
+        player.player = player._new_player()
+        urls = [f"http://station/{i}" for i in range(20)]
+
+        def flip(count):
+            for i in range(count):
+                # Mostly back-and-forth between neighbours, with periodic jumps away.
+                n = (i // 3) % len(urls) if i % 7 else i % len(urls)
+                player.play(urls[n], station=urls[n])
+                adjacent = [urls[(n + 1) % len(urls)], urls[n - 1]]
+                player.prefetch(adjacent, stations=adjacent)
+
+        tracemalloc.start()
+        try:
+            flip(500)
+            warm, _ = tracemalloc.get_traced_memory()
+            flip(2000)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        players = [p for p in player.instance.players if not p.released]
+        self.assertEqual(len(players), 3)   # the live one and two standbys
+        # The pool's media, plus at most one more held by each live player
+        self.assertLessEqual(FakeMedia.live, MEDIA_POOL_SIZE + len(players))
+        self.assertGreater(player.media_pool.stats()["evictions"], 0)
+        self.assertLess(after - warm, 16 * 1024)
+
+        await player.stop()
+        # Only the stopped player's own reference is left.
+        self.assertLessEqual(FakeMedia.live, 1)
+        player.player.release()
+        self.assertEqual(FakeMedia.live, 0)
@@ -0,0 +1,49 @@
+import asyncio
+import sys
+import unittest
+
+from radioglobe.hal.pcm_tap import PcmTap, parec_command
+
+
+def _writer(nbytes: int) -> tuple:
+    """A stand-in for parec that writes nbytes of PCM and exits."""
+    script = f"import sys; sys.stdout.buffer.write(bytes(range(256)) * {nbytes // 256})"
+    return (sys.executable, "-c", script)
+
+
+class TestPcmTap(unittest.IsolatedAsyncioTestCase):
+    async def test_reads_whole_blocks(self):
+        tap = PcmTap(sample_rate=1024, block_seconds=0.25, command=_writer(2048))
+        self.assertEqual(tap.block_bytes, 512)
+        tap.start()
+        try:
+            for _ in range(100):
+                if tap.blocks.qsize() == 4:
+                    break
+                await asyncio.sleep(0.02)
+            blocks = tap.drain()
+        finally:
+            await tap.stop()
+        self.assertEqual(len(blocks), 4)
+        self.assertTrue(all(block == bytes(range(256)) * 2 for block in blocks))
+        self.assertEqual(tap.drain(), [])
+
+    async def test_full_queue_drops_oldest_block(self):
+        tap = PcmTap(sample_rate=1024, block_seconds=0.25)
+        for n in range(12):
+            tap._put(bytes([n]))
+        self.assertEqual(tap.drain()[0], bytes([4]))
+
+    async def test_missing_parec_leaves_tap_idle(self):
+        tap = PcmTap(command=("/nonexistent/parec",))
+        with self.assertLogs(level="WARNING"):
+            tap.start()
+            await asyncio.sleep(0.05)
+        self.assertTrue(tap._task.done())
+        await tap.stop()
+
+    def test_default_command_reads_the_output_monitor(self):
+        command = parec_command(16000)
+        self.assertEqual(command[0], "parec")
+        self.assertIn("--device=@DEFAULT_MONITOR@", command)
+        self.assertIn("--rate=16000", command)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import unittest
+
+from radioglobe.hal.encoder_sampling import AdaptiveSampler
+from radioglobe.hal.encoder_spi import EncoderSpi
+from radioglobe.hal.positional_encoders import PositionalEncoders
+from tests.hal.encoder_spi_test import FakeSpiDev, word
+
+
+def make_encoders(threaded: bool) -> PositionalEncoders:
+    FakeSpiDev.calls = []
+    FakeSpiDev.replies = {0: [word(24)], 1: [word(512)]}
+    sampler = AdaptiveSampler(fast_interval=0.002, interval=0.002, idle_interval=0.002)
+    return PositionalEncoders(
+        spi=EncoderSpi(spi_factory=FakeSpiDev), sampler=sampler, threaded=threaded
+    )
+
+
+class TestSamplingThread(unittest.IsolatedAsyncioTestCase):
+    async def test_thread_posts_readings_to_the_loop(self):
+        encoders = make_encoders(threaded=True)
+        encoders.start()
+        await asyncio.wait_for(encoders.updated.wait(), 1)
+        encoders.updated.clear()
+        self.assertEqual((encoders.latitude, encoders.longitude), (1000, 512))
+
+        encoders.latch(*encoders.get_readings(), stickiness=2)
+        FakeSpiDev.replies[0] = [word(60)]
+        await asyncio.wait_for(encoders.updated.wait(), 1)
+        self.assertFalse(encoders.is_latched())
+
+        await encoders.stop()
+        self.assertEqual(FakeSpiDev.calls[-2:], [("close", 0), ("close", 1)])
+        self.assertTrue(encoders.stats()["threaded"])
+
+    async def test_loop_stall_coalesces_in_the_mailbox(self):
+        encoders = make_encoders(threaded=True)
+        encoders.start()
+        await asyncio.wait_for(encoders.updated.wait(), 1)
+        time.sleep(0.05)   # a blocking call on the event loop
+        await asyncio.sleep(0.01)
+        await encoders.stop()
+        self.assertGreater(encoders.coalesced, 0)
+        self.assertEqual(encoders.updates, 1)
+
+    async def test_sampling_keeps_its_cadence_through_a_loop_stall(self):
+        late = {}
+        for threaded in (False, True):
+            encoders = make_encoders(threaded)
+            encoders.start()
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)
+            await asyncio.sleep(0.02)
+            await encoders.stop()
+            late[threaded] = encoders.stats()["max_late_ms"]
+        self.assertGreaterEqual(late[False], 90)
+        self.assertLess(late[True], 50)
+
+
+class TestVelocity(unittest.TestCase):
+    def feed(self, encoders, positions, start, interval=0.005):
+        for index, position in enumerate(positions):
+            encoders._handle_readings([position, 512], start + index * interval)
+        return start + len(positions) * interval
+
+    def test_a_spin_is_reported_and_its_end_published(self):
+        encoders = PositionalEncoders(filter_kind="none")
+        now = self.feed(encoders, [100] * 20, 0.0)
+        self.assertFalse(encoders.is_spinning())
+        self.assertEqual(encoders.updates, 1)
+
+        # 600 steps/s (over half a turn a second), across the 1023/0 seam.
+        now = self.feed(encoders, [(100 + 3 * i) % 1024 for i in range(1, 400)], now)
+        self.assertTrue(encoders.is_spinning())
+        self.assertGreater(encoders.velocity, 500)
+        self.assertEqual(encoders.spins, 1)
+
+        updates = encoders.updates
+        self.feed(encoders, [(100 + 3 * 399) % 1024] * 100, now)
+        self.assertFalse(encoders.is_spinning())
+        self.assertLess(encoders.velocity, 10)
+        self.assertEqual(encoders.updates, updates + 1)   # published as it slowed
+        self.assertEqual(encoders.stats()["spins"], 1)
+
+    def test_flicker_is_not_a_spin(self):
+        encoders = PositionalEncoders(filter_kind="none")
+        self.feed(encoders, [100, 101] * 200, 0.0, interval=0.05)
+        self.assertFalse(encoders.is_spinning())
+        self.assertEqual(encoders.spins, 0)
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import tempfile
+import types
+import unittest
+
+from radioglobe.hal.fake import FakeButtonManager, FakeDial, FakePositionalEncoders
+from radioglobe.hal.positional_encoders import PositionalEncoders
+from radioglobe.input_log import (
+    KIND_BUTTON_DOWN,
+    KIND_BUTTON_UP,
+    KIND_DIAL,
+    KIND_ENCODER,
+    InputEvent,
+    InputRecorder,
+    InputReplayer,
+    read_log,
+)
+from tests.main_test import CITY_GRID_COORDS, make_app
+
+
+def encoder_events(positions: list, start: float, interval: float) -> list:
+    """InputEvents for raw (latitude, longitude) samples, interval s apart."""
+    return [
+        InputEvent(start + index * interval, KIND_ENCODER, lat, lon)
+        for index, (lat, lon) in enumerate(positions)
+    ]
+
+
+class TestLogFormat(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "session.rgin")
+
+    def test_round_trip(self):
+        recorder = InputRecorder(self.path)
+        recorder.open()
+        recorder.encoder([1023, 0])
+        recorder.dial(-1)
+        recorder.button("Top", down=True)
+        recorder.button("Top", down=False)
+        recorder.button("Mid", down=True)
+        recorder.close()
+
+        events = read_log(self.path)
+        self.assertEqual(
+            [(e.kind, e.a, e.b, e.name) for e in events],
+            [
+                (KIND_ENCODER, 1023, 0, None),
+                (KIND_DIAL, -1, 0, None),
+                (KIND_BUTTON_DOWN, 0, 0, "Top"),
+                (KIND_BUTTON_UP, 0, 0, "Top"),
+                (KIND_BUTTON_DOWN, 1, 0, "Mid"),
+            ],
+        )
+        self.assertEqual(events[0].time, 0.0)
+        self.assertEqual(sorted(e.time for e in events), [e.time for e in events])
+        # 5-byte header, 9 bytes per event, and each name once.
+        self.assertEqual(os.path.getsize(self.path), 5 + 5 * 9 + (9 + 3) * 2)
+        self.assertEqual(recorder.stats(), {"records": 5, "bytes": os.path.getsize(self.path)})
+
+    def test_events_after_close_are_dropped(self):
+        recorder = InputRecorder(self.path)
+        recorder.open()
+        recorder.close()
+        recorder.dial(1)
+        self.assertEqual(read_log(self.path), [])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a log")
+        with self.assertRaises(ValueError):
+            read_log(self.path)
+
+
+class TestReplay(unittest.IsolatedAsyncioTestCase):
+    async def test_drives_the_fakes(self):
+        pressed = []
+        top = types.SimpleNamespace(
+            name="Top",
+            press_cb=lambda: pressed.append("press"),
+            short_cb=lambda: pressed.append("short"),
+            long_cb=lambda: pressed.append("long"),
+        )
+        buttons = FakeButtonManager([top])
+        handler = asyncio.create_task(buttons.handle_events())
+        encoders, dial = FakePositionalEncoders(), FakeDial()
+        events = [
+            InputEvent(0.0, KIND_ENCODER, 1000, 40),
+            InputEvent(0.1, KIND_DIAL, 1),
+            InputEvent(0.2, KIND_DIAL, -1),
+            InputEvent(0.3, KIND_BUTTON_DOWN, 0, name="Top"),
+            InputEvent(0.4, KIND_BUTTON_UP, 0, name="Top"),
+            InputEvent(1.0, KIND_BUTTON_DOWN, 0, name="Top"),
+            InputEvent(2.5, KIND_BUTTON_UP, 0, name="Top"),
+        ]
+        stats = await InputReplayer(events, encoders, dial, buttons, realtime=False).run()
+        await asyncio.sleep(0)
+        handler.cancel()
+
+        self.assertEqual(encoders.get_readings(), (24, 40))   # latitude inverted
+        self.assertTrue(encoders.updated.is_set())
+        self.assertEqual([dial.queue.get_nowait() for _ in range(2)], [1, -1])
+        self.assertEqual(pressed, ["press", "short", "press", "long"])
+        counts = (stats["events"], stats["encoder"], stats["dial"], stats["button"])
+        self.assertEqual(counts, (5, 1, 2, 2))
+        self.assertEqual(stats["recorded_seconds"], 2.5)
+        self.assertLess(stats["seconds"], 0.5)
+
+    async def test_realtime_keeps_the_recorded_pace(self):
+        dial = FakeDial()
+        events = [InputEvent(0.02 * i, KIND_DIAL, 1) for i in range(5)]
+        stats = await InputReplayer(events, dial=dial).run()
+        self.assertGreaterEqual(stats["seconds"], 0.08)
+        self.assertEqual(dial.queue.qsize(), 5)
+
+    async def test_a_recorded_spin_through_app_latches_only_where_it_stops(self):
+        """A session replayed through the real encoder pipeline into App: a
+        fast spin past the city, then a slow drift back onto it."""
+        app = make_app()
+        app.encoders = PositionalEncoders(filter_kind="median")
+        lat = 1024 - CITY_GRID_COORDS[0]   # raw latitude is inverted
+        lon = CITY_GRID_COORDS[1]
+        events = (
+            encoder_events([(lat, 300)] * 20, 0.0, 0.05)
+            # ~1000 steps/s across the city at 512...
+            + encoder_events([(lat, 300 + 5 * i) for i in range(1, 81)], 1.0, 0.005)
+            # ...a stop at 700, then a drift back at 20 steps/s.
+            + encoder_events([(lat, 700)] * 40, 1.4, 0.05)
+            + encoder_events([(lat, 700 - i) for i in range(1, 189)], 3.4, 0.05)
+            + encoder_events([(lat, lon)] * 10, 12.8, 0.05)
+        )
+        loop_task = asyncio.create_task(app._encoder_loop())
+        try:
+            stats = await InputReplayer(events, encoders=app.encoders, realtime=False).run()
+            await asyncio.sleep(0.01)
+        finally:
+            loop_task.cancel()
+            if app._stream_task:
+                app._stream_task.cancel()
+
+        self.assertEqual(stats["encoder"], len(events))
+        self.assertEqual(app.encoders.spins, 1)
+        self.assertEqual(app.spin_stats["spins"], 1)
+        self.assertGreater(app.spin_stats["skipped"], 0)
+        self.assertTrue(app.encoders.is_latched())
+        self.assertEqual(app.audio_player.played, ["http://example.com/stream"])
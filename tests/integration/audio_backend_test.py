@@ -0,0 +1,148 @@
+"""Compare the VLC and mpv audio backends on RSS, CPU and time-to-first-audio.
+
+Serves an audio file from a local test stream server (paced at the file's
+--kbps, looping, like an Icecast mount), then for each backend starts a
+fresh Python process that creates the player, plays the stream and reports:
+
+- first audio: ms from play() to the first Playing event
+- RSS: the app process plus, for mpv, its child process (MiB)
+- CPU: user+system seconds used by both during --seconds of playback
+- threads: in the app process
+
+run: python tests/integration/audio_backend_test.py FILE.mp3 [--kbps 128] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("vlc", reason="Requires python-vlc")
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def _proc_status(pid, field: str) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _cpu_seconds(pid) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS   # utime + stime
+
+
+async def _serve(path: str, kbps: int, port: int):
+    """A looping, bitrate-paced audio stream on http://127.0.0.1:port/stream."""
+    from aiohttp import web
+
+    with open(path, "rb") as f:
+        audio = f.read()
+    chunk = kbps * 1000 // 8 // 10   # 100 ms of audio
+
+    async def stream(request):
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+        await response.prepare(request)
+        # Burst a few seconds up front, like Icecast's burst-on-connect.
+        await response.write(audio[: chunk * 30])
+        offset = chunk * 30
+        while True:
+            if offset >= len(audio):
+                offset = 0
+            await response.write(audio[offset: offset + chunk])
+            offset += chunk
+            await asyncio.sleep(0.1)
+
+    app = web.Application()
+    app.router.add_get("/stream", stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def _child(url: str, backend: str, seconds: float) -> dict:
+    from radioglobe.constants import AUDIO_PLAYING
+    from radioglobe.hal.factory import build_audio_player
+
+    player = build_audio_player(backend)
+    player.start()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    player.play(url)
+    try:
+        while True:
+            event = await asyncio.wait_for(player.events.get(), 15)
+            if event.kind == AUDIO_PLAYING:
+                break
+        first_audio = loop.time() - started
+        pids = [os.getpid()]
+        if backend == "mpv":
+            pids.append(player._process.pid)
+        cpu_before = sum(_cpu_seconds(pid) for pid in pids)
+        await asyncio.sleep(seconds)
+        cpu = sum(_cpu_seconds(pid) for pid in pids) - cpu_before
+        rss = sum(_proc_status(pid, "VmRSS") for pid in pids)
+        threads = _proc_status(os.getpid(), "Threads")
+    finally:
+        await player.stop()
+    return {"first_audio_ms": first_audio * 1000, "rss_kb": rss, "cpu_s": cpu, "threads": threads}
+
+
+def _run(url: str, backend: str, seconds: float) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", backend, "--url", url, "--seconds", str(seconds)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+async def _compare(args) -> None:
+    runner = await _serve(args.file, args.kbps, args.port)
+    url = f"http://127.0.0.1:{args.port}/stream"
+    try:
+        for backend in ("vlc", "mpv"):
+            runs = [
+                await asyncio.to_thread(_run, url, backend, args.seconds) for _ in range(args.runs)
+            ]
+            summary = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            print(
+                f"{backend}: first audio {summary['first_audio_ms']:.0f} ms, "
+                f"RSS {summary['rss_kb'] / 1024:.1f} MiB, "
+                f"CPU {summary['cpu_s'] / args.seconds * 100:.1f}% over {args.seconds:.0f}s, "
+                f"{summary['threads']:.0f} threads (median of {args.runs})"
+            )
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", nargs="?", help="audio file to serve (e.g. a 128 kbps MP3)")
+    parser.add_argument("--kbps", type=int, default=128, help="bitrate to pace the stream at")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=10, help="playback measured for CPU")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--child", choices=["vlc", "mpv"], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.url, args.child, args.seconds))))
+        return
+    if not args.file:
+        parser.error("an audio file to serve is required")
+    asyncio.run(_compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure encoder sampling jitter on the event loop vs the sampling thread.
+
+Runs PositionalEncoders for --seconds in each mode, first on an idle event
+loop and then with a load task that blocks the loop for --block ms every
+--every ms (standing in for a synchronous libvlc call or an LCD write),
+and prints each run's effective sample rate and how late samples were
+against the requested interval. The thread also reports whether it got
+SCHED_FIFO and how many samples the loop never saw (coalesced).
+
+--fake replaces the SPI devices with a stand-in, so the comparison can be
+run on any Linux machine.
+
+run: python tests/integration/encoder_jitter_test.py
+         [--seconds 5] [--block 20] [--every 100] [--fake]
+"""
+
+import argparse
+import asyncio
+import time
+
+import pytest
+
+
+class _StandInSpiDev:
+    """Answers every read with position 512 and valid parity."""
+
+    def open(self, bus, device):
+        pass
+
+    def readbytes(self, n):
+        return [0x80, 0x01]   # 512 << 6 = 0x8000, plus its parity bit
+
+    def close(self):
+        pass
+
+
+async def _load(block: float, every: float) -> None:
+    while True:
+        await asyncio.sleep(every)
+        time.sleep(block)
+
+
+async def _measure(threaded: bool, loaded: bool, args) -> dict:
+    from radioglobe.hal.encoder_spi import EncoderSpi
+    from radioglobe.hal.positional_encoders import PositionalEncoders
+
+    spi = EncoderSpi(spi_factory=_StandInSpiDev) if args.fake else None
+    encoders = PositionalEncoders(spi=spi, threaded=threaded)
+    encoders.start()
+    load = asyncio.create_task(_load(args.block / 1000, args.every / 1000)) if loaded else None
+    await asyncio.sleep(args.seconds)
+    if load:
+        load.cancel()
+    await encoders.stop()
+    return encoders.stats()
+
+
+async def _compare(args) -> None:
+    for loaded in (False, True):
+        for threaded in (False, True):
+            stats = await _measure(threaded, loaded, args)
+            mode = "thread" if threaded else "loop  "
+            extra = ""
+            if threaded:
+                extra = f", SCHED_FIFO {stats['realtime']}, coalesced {stats['coalesced']}"
+            print(
+                f"{mode} {'loaded' if loaded else 'idle  '}: "
+                f"{stats['samples_per_second']:.1f} samples/s, "
+                f"late {stats['late_ms']:.2f} ms mean / {stats['max_late_ms']:.1f} ms max{extra}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5, help="length of each run")
+    parser.add_argument("--block", type=float, default=20, help="ms the load blocks the loop for")
+    parser.add_argument("--every", type=float, default=100, help="ms between load blocks")
+    parser.add_argument("--fake", action="store_true", help="use a stand-in SPI device")
+    args = parser.parse_args()
+    if not args.fake:
+        pytest.importorskip("spidev", reason="Requires SPI hardware")
+    asyncio.run(_compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,12 +24,23 @@ async def main():
     # Start continuous reading in background
     ps.start()
 
+    # Print the polling stats every 5 s, even while the globe is still
+    async def print_stats():
+        while True:
+            await asyncio.sleep(5)
+            print(f"Stats: {ps.stats()}")
+
+    asyncio.create_task(print_stats())
+
     # Display the encoder values on each update
     while True:
         await ps.updated.wait()
         ps.updated.clear()
         readings = ps.get_readings()
-        print(f"Coords: {readings} Latched: {ps.is_latched()}")
+        print(
+            f"Coords: {readings} Latched: {ps.is_latched()} "
+            f"Velocity: {ps.velocity:.0f} steps/s{' (spinning)' if ps.is_spinning() else ''}"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+"""Replay a recorded input session through App, off the device.
+
+Record a session on the Pi with RADIOGLOBE_INPUT_LOG=/tmp/session.rgin set
+for the radioglobe service (or `radioglobe` run by hand), copy the log off,
+and replay it here. App runs with HAL fakes and the real stations.json;
+encoder samples go through a real PositionalEncoders (never started, so no
+SPI) for its filtering, velocity and latch logic. Prints the replay's
+throughput, the encoders' and App's spin stats, and the streams App played.
+
+--fast replays as fast as the event loop allows instead of at the
+recorded pace.
+
+run: python tests/integration/replay_test.py SESSION.rgin [--fast]
+"""
+
+import argparse
+import asyncio
+import types
+
+
+async def _replay(args) -> None:
+    from radioglobe.hal.fake import (
+        FakeAudioPlayer,
+        FakeButtonManager,
+        FakeDial,
+        FakeDisplay,
+        FakeRGBLed,
+    )
+    from radioglobe.hal.positional_encoders import PositionalEncoders
+    from radioglobe.input_log import InputReplayer, read_log
+    from radioglobe.main import App
+
+    events = read_log(args.log)
+    app = App(
+        dial=FakeDial(),
+        audio_player=FakeAudioPlayer(),
+        encoders=PositionalEncoders(),
+        display=FakeDisplay(),
+        led=FakeRGBLed(),
+    )
+    # Mirrors App.run()'s wiring, without importing evdev for ButtonDefinition.
+    buttons = FakeButtonManager([
+        types.SimpleNamespace(
+            name="Jog", short_cb=app._handle_short_jog, press_cb=app._on_jog_press,
+        ),
+        types.SimpleNamespace(
+            name="Top", short_cb=app._handle_short_top, long_cb=app._handle_long_top,
+            press_cb=app._on_sound_press,
+        ),
+        # Mid's long press powers off, so only calibration is replayed.
+        types.SimpleNamespace(
+            name="Mid", short_cb=app._handle_short_mid, press_cb=app._on_mid_press,
+        ),
+        types.SimpleNamespace(
+            name="Bottom", short_cb=app._handle_short_bottom, long_cb=app._handle_long_bottom,
+            press_cb=app._on_sound_press,
+        ),
+    ])
+    tasks = [
+        asyncio.create_task(app._encoder_loop()),
+        asyncio.create_task(app._dial_loop()),
+        asyncio.create_task(buttons.handle_events()),
+    ]
+    stats = await InputReplayer(
+        events, app.encoders, app.dial, buttons, realtime=not args.fast
+    ).run()
+    await asyncio.sleep(0.1)
+    for task in tasks:
+        task.cancel()
+
+    print(
+        f"Replayed {stats['events']} events ({stats['encoder']} encoder, {stats['dial']} dial, "
+        f"{stats['button']} button) covering {stats['recorded_seconds']:.1f} s "
+        f"in {stats['seconds']:.2f} s: {stats['events_per_second']:.0f} events/s"
+    )
+    encoder_stats = app.encoders.stats()
+    print(
+        f"Encoders: {encoder_stats['updates']} updates, {encoder_stats['unlatches']} unlatches, "
+        f"{encoder_stats['spins']} spins"
+    )
+    print(f"App: {app.spin_stats}")
+    print(f"Played {len(app.audio_player.played)} streams:")
+    for url in app.audio_player.played:
+        print(f"  {url}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("log", help="input log written with RADIOGLOBE_INPUT_LOG")
+    parser.add_argument("--fast", action="store_true", help="replay as fast as possible")
+    asyncio.run(_replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare AudioPlayer's fast VLC startup profile against VLC's defaults.
+
+Each run starts a fresh Python process (so neither profile benefits from
+the other's loaded plugins), creates an AudioPlayer, plays one URL and
+reports VLC init time, RSS after init, and time from start() to the first
+Playing event.
+
+run: python tests/integration/vlc_startup_test.py [URL] [--runs N]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("vlc", reason="Requires python-vlc")
+
+DEFAULT_URL = "http://stream.live.vc.bbcmedia.co.uk/bbc_world_service"
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def _child(url: str, fast: bool) -> dict:
+    from radioglobe.constants import AUDIO_PLAYING
+    from radioglobe.hal.audio_async import AudioPlayer
+    from radioglobe.station_history import StationHistory
+
+    history = StationHistory("/tmp/radioglobe-bench-history.json")
+    player = AudioPlayer(history=history, fast_startup=fast)
+    player.start()
+    rss = _rss_kb()
+    player.play(url)
+    try:
+        while True:
+            event = await asyncio.wait_for(player.events.get(), 15)
+            if event.kind == AUDIO_PLAYING:
+                break
+    finally:
+        await player.stop()
+    return {
+        "init_ms": player.init_time * 1000,
+        "rss_kb": rss,
+        "first_audio_ms": player.first_audio_time * 1000,
+    }
+
+
+def _run(url: str, fast: bool) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, url, "--child", "fast" if fast else "full"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url", nargs="?", default=DEFAULT_URL)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["fast", "full"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.url, args.child == "fast"))))
+        return
+
+    for fast in (False, True):
+        runs = [_run(args.url, fast) for _ in range(args.runs)]
+        summary = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(
+            f"{'fast' if fast else 'full'}: init {summary['init_ms']:.0f} ms, "
+            f"RSS {summary['rss_kb'] / 1024:.1f} MiB, "
+            f"first audio {summary['first_audio_ms']:.0f} ms (median of {args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
 import asyncio
+import importlib.util
+import json
+import os
+import tempfile
+import time
 import unittest
+from unittest import mock
 
-from radioglobe.constants import MODE_STATION
+from radioglobe.bitrate import BitrateSelector
+from radioglobe.constants import AUDIO_ERROR, AUDIO_PLAYING, MODE_STATION
 from radioglobe.database import build_cities_index
 from radioglobe.hal.fake import (
     FakeAudioPlayer,
@@ -10,9 +17,17 @@ from radioglobe.hal.fake import (
     FakePositionalEncoders,
     FakeRGBLed,
 )
+from radioglobe.hal.pcm_tap import PcmTap
+from radioglobe.hal.protocols import AudioEvent
 from radioglobe.hal.rgb_led import COLOUR_BLUE, COLOUR_GREEN
 from radioglobe.main import App
 from radioglobe.navigation import Navigator
+from radioglobe.net.dns import DnsCache
+from radioglobe.net.playlist import PlaylistResolver
+from radioglobe.net.probe import ProbeResult
+from radioglobe.radio_config import DEAD_AIR_MIN_VOLUME, VOLUME_OFF_LEVEL, VOLUME_STEP
+from radioglobe.settle import SettleScheduler
+from tests.net.dns_test import FakeResolver
 
 STATIONS_INFO = {
     "TestCity,XY": {
@@ -25,7 +40,7 @@ STATIONS_INFO = {
 CITY_GRID_COORDS = (512, 512)
 
 
-def make_app(nav=None):
+def make_app(nav=None, **kwargs):
     """Build an App wired entirely to HAL fakes - no real hardware I/O."""
     if nav is None:
         nav = Navigator(stations_json="/nonexistent/stations.json")
@@ -38,6 +53,9 @@ def make_app(nav=None):
         display=FakeDisplay(),
         led=FakeRGBLed(),
         nav=nav,
+        # Settle quickly so single-turn tests see the stream switch promptly.
+        settle=SettleScheduler(min_window=0.01, max_window=0.02),
+        **kwargs,
     )
 
 
@@ -63,6 +81,62 @@ class TestEncoderLoop(unittest.IsolatedAsyncioTestCase):
                 await task
 
 
+class PendingProber:
+    """probe_all() never finishes, like a city whose stations are all slow."""
+
+    async def probe_all(self, urls, budget, scope=None, priority=None):
+        await asyncio.sleep(60)
+
+
+class TestSpinGating(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.app = make_app()
+        self.task = asyncio.create_task(self.app._encoder_loop())
+
+    async def asyncTearDown(self):
+        self.task.cancel()
+        for task in (self.app._stream_task, self.app._probe_task):
+            if task:
+                task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await self.task
+
+    async def spin(self, positions):
+        for lat, lon in positions:
+            self.app.encoders.set_position(lat, lon, spinning=True)
+            await asyncio.sleep(0)
+
+    async def test_cities_passed_over_mid_spin_are_not_latched(self):
+        app = self.app
+        await self.spin([(500, 500), CITY_GRID_COORDS, (530, 530)])
+        self.assertFalse(app.encoders.is_latched())
+        self.assertEqual(app.audio_player.played, [])
+
+        # It slows to a stop back over the city, and latches there once.
+        app.encoders.set_position(*CITY_GRID_COORDS)
+        await asyncio.sleep(0.05)
+        self.assertTrue(app.encoders.is_latched())
+        self.assertEqual(app.audio_player.played, ["http://example.com/stream"])
+        self.assertEqual(
+            app.spin_stats, {"spins": 1, "lookups": 1, "skipped": 3, "aborted_starts": 0}
+        )
+
+    async def test_a_start_abandoned_by_a_spin_is_counted(self):
+        app = self.app
+        app.prober = PendingProber()
+        app.encoders.set_position(*CITY_GRID_COORDS)
+        await asyncio.sleep(0.01)
+        probe = app._probe_task
+        self.assertFalse(probe.done())
+
+        app.encoders.reset_latch()
+        await self.spin([(530, 530), (560, 560)])
+        await asyncio.sleep(0)
+        self.assertTrue(probe.cancelled())
+        self.assertEqual(app.spin_stats["aborted_starts"], 1)
+        self.assertEqual(app.spin_stats["skipped"], 2)
+
+
 class TestDialLoop(unittest.IsolatedAsyncioTestCase):
     async def test_turn_advances_station_and_flashes_blue(self):
         app = make_app()
@@ -87,6 +161,60 @@ class TestDialLoop(unittest.IsolatedAsyncioTestCase):
             with self.assertRaises(asyncio.CancelledError):
                 await task
 
+    async def test_turn_prebuffers_adjacent_stations_in_dial_direction(self):
+        app = make_app()
+        app.nav.state.mode = MODE_STATION
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "urlA"), ("B", "urlB"), ("C", "urlC"), ("D", "urlD")]
+        app.nav.state.station_idx = 0
+        app.nav.state.station = app.nav.state.stations[0]
+
+        task = asyncio.create_task(app._dial_loop())
+        try:
+            with mock.patch("radioglobe.main.PREBUFFER_DELAY", 0):
+                app.dial.push_turn(-1)
+                await asyncio.sleep(0.05)
+
+            self.assertEqual(app.audio_player.played, ["urlD"])
+            self.assertEqual(app.audio_player.prefetched, ["urlC", "urlA"])
+        finally:
+            task.cancel()
+            if app._stream_task:
+                app._stream_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+    async def test_fast_scroll_shows_every_station_but_plays_only_the_last(self):
+        app = make_app()
+        app.settle = SettleScheduler(min_window=0.05, max_window=0.2)
+        app.nav.state.mode = MODE_STATION
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [(name, f"url{name}") for name in "ABCDEFGH"]
+        app.nav.state.station_idx = 0
+        app.nav.state.station = app.nav.state.stations[0]
+
+        task = asyncio.create_task(app._dial_loop())
+        try:
+            for _ in range(5):
+                app.dial.push_turn(1)
+                await asyncio.sleep(0.01)
+            self.assertEqual(app.audio_player.played, [])
+            shown = [call[3] for call in app.display.calls if call[0] == "show_station"]
+            self.assertEqual(shown, ["B", "C", "D", "E", "F"])
+
+            await asyncio.sleep(0.3)
+            self.assertEqual(app.audio_player.played, ["urlF"])
+            stats = app.settle.latency_stats()
+            self.assertEqual(stats["commits"], 1)
+            self.assertEqual(stats["ticks_skipped"], 4)
+            self.assertGreaterEqual(stats["last"], 0.05)
+        finally:
+            task.cancel()
+            if app._stream_task:
+                app._stream_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
     async def test_turn_is_ignored_when_selection_incomplete(self):
         app = make_app()
         # nav.state starts with no city/station selected.
@@ -102,6 +230,208 @@ class TestDialLoop(unittest.IsolatedAsyncioTestCase):
                 await task
 
 
+class StubProber:
+    """Answers probe_all() from a canned {url: ProbeResult} dict."""
+
+    def __init__(self, results):
+        self.results = results
+        self.probed: list = []
+
+    async def probe_all(self, urls, budget, scope=None, priority=None):
+        self.probed.append(list(urls))
+        return {url: self.results[url] for url in urls if url in self.results}
+
+
+class TestStationProbing(unittest.IsolatedAsyncioTestCase):
+    async def test_latch_plays_fastest_answering_station_first(self):
+        stations_info = {
+            "TestCity,XY": {
+                "coords": {"n": 0.0, "e": 0.0},
+                "urls": [
+                    {"name": "Dead", "url": "urlDead"},
+                    {"name": "Slow", "url": "urlSlow"},
+                    {"name": "Fast", "url": "urlFast"},
+                ],
+            }
+        }
+        nav = Navigator(stations_json="/nonexistent/stations.json")
+        nav.stations_info = stations_info
+        nav.cities_info = build_cities_index(stations_info)
+        app = make_app(nav)
+        app.prober = StubProber({
+            "urlDead": ProbeResult("urlDead", False, error="refused"),
+            "urlSlow": ProbeResult("urlSlow", True, 0.01, 0.9),
+            "urlFast": ProbeResult("urlFast", True, 0.01, 0.1),
+        })
+
+        task = asyncio.create_task(app._encoder_loop())
+        try:
+            app.encoders.set_position(*CITY_GRID_COORDS)
+            await asyncio.sleep(0.05)
+
+            self.assertEqual(app.prober.probed, [["urlDead", "urlSlow", "urlFast"]])
+            self.assertEqual(app.audio_player.played, ["urlFast"])
+            self.assertEqual([name for name, _ in app.nav.state.stations], ["Fast", "Slow", "Dead"])
+        finally:
+            task.cancel()
+            if app._stream_task:
+                app._stream_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+
+class TestPlaylistResolution(unittest.IsolatedAsyncioTestCase):
+    async def test_plays_cached_stream_url_instead_of_playlist(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, "playlists.json")
+            with open(cache, "w") as f:
+                json.dump({"urlA.pls": ["http://direct/a.mp3", time.time() + 60]}, f)
+            resolver = PlaylistResolver(cache_path=cache)
+            resolver.start()
+
+            app = make_app()
+            app.resolver = resolver
+            app.nav.state.city = "TestCity,XY"
+            app.nav.state.stations = [("A", "urlA.pls")]
+            app.nav.state.station = app.nav.state.stations[0]
+            try:
+                self.assertEqual(app._play_station(), "http://direct/a.mp3")
+                await app.audio.wait_idle()
+                self.assertEqual(app.audio_player.played, ["http://direct/a.mp3"])
+                # History is kept under the stations.json URL, not the resolved one.
+                self.assertEqual(app.audio_player.stations, ["urlA.pls"])
+                await app._resolve_task
+            finally:
+                await resolver.stop()
+
+    async def test_resolves_and_invalidates_the_current_bitrate_tier(self):
+        app = make_app()
+        app.resolver = RecordingResolver({"urlA-96k": "http://direct/a-96k.mp3"})
+        app.bitrate.ladders = {"urlA": [(320000, "urlA"), (96000, "urlA-96k")]}
+        app.bitrate.step_down("urlA", 0.0)
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "urlA"), ("B", "urlB")]
+        app.nav.state.station = app.nav.state.stations[0]
+
+        self.assertEqual(app._play_station(), "http://direct/a-96k.mp3")
+        await app._resolve_task
+        self.assertEqual(app.resolver.resolved, [["urlA-96k", "urlB"]])
+
+        app._fail_current_station()
+        self.assertEqual(app.resolver.invalidated, ["urlA-96k"])
+        app._prefetch_task.cancel()
+
+
+class RecordingResolver:
+    """A PlaylistResolver stand-in with a fixed cache that records its calls."""
+
+    def __init__(self, cache):
+        self.cache = dict(cache)
+        self.resolved = []
+        self.invalidated = []
+
+    def cached(self, url):
+        return self.cache.get(url)
+
+    def invalidate(self, url):
+        self.invalidated.append(url)
+        self.cache.pop(url, None)
+
+    async def resolve_many(self, urls, scope=None):
+        self.resolved.append(list(urls))
+        return {url: self.cache.get(url) for url in urls}
+
+
+class TestDnsWarming(unittest.IsolatedAsyncioTestCase):
+    async def test_play_warms_city_and_neighbour_hosts_once(self):
+        fake = FakeResolver()
+        dns = DnsCache(resolver=fake)
+        dns.start()
+        app = make_app(dns=dns)
+        app.nav.stations_info = {
+            **STATIONS_INFO,
+            "Other,XY": {"coords": {"n": 0.1, "e": 0.0},
+                         "urls": [{"name": "O", "url": "http://other.example/live"}]},
+        }
+        app.nav.state.cities = ["TestCity,XY", "Other,XY"]
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "http://a.example/one"), ("B", "http://a.example/two")]
+        app.nav.state.station = app.nav.state.stations[0]
+        try:
+            app._play_station()
+            await app._dns_task
+            self.assertEqual(fake.lookups, ["a.example", "other.example"])
+            app.nav.next_station(1)
+            app._play_station()  # same city: nothing new to warm
+            self.assertEqual(fake.lookups, ["a.example", "other.example"])
+        finally:
+            await dns.stop()
+
+
+class PendingResolver:
+    """resolve_many() never finishes, like a slow playlist host."""
+
+    def cached(self, url):
+        return None
+
+    async def resolve_many(self, urls, scope=None):
+        await asyncio.sleep(60)
+
+
+class TestCityScopedNetworkJobs(unittest.IsolatedAsyncioTestCase):
+    async def test_leaving_a_city_cancels_its_background_jobs(self):
+        app = make_app()
+        app.resolver = PendingResolver()
+        app.nav.stations_info = {**STATIONS_INFO, "Other,XY": STATIONS_INFO["TestCity,XY"]}
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "http://a.example/one")]
+        app.nav.state.station = app.nav.state.stations[0]
+        app._play_station()
+        first = app._resolve_task
+        app.nav.state.city = "Other,XY"
+        app._play_station()
+        await asyncio.sleep(0)
+        self.assertTrue(first.cancelled())
+        self.assertFalse(app._resolve_task.done())
+        self.assertEqual(app.scheduler.stats()["cancelled"], 1)
+        app._resolve_task.cancel()
+
+
+class StubRelay:
+    def url_for(self, url):
+        return f"http://127.0.0.1:9/stream?url={url}"
+
+
+class TestStreamRelay(unittest.IsolatedAsyncioTestCase):
+    async def test_plays_station_through_relay(self):
+        app = make_app()
+        app.relay = StubRelay()
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "http://direct/a.mp3")]
+        app.nav.state.station = app.nav.state.stations[0]
+        self.assertEqual(app._play_station(), "http://127.0.0.1:9/stream?url=http://direct/a.mp3")
+        await app.audio.wait_idle()
+        self.assertEqual(app.audio_player.played, ["http://127.0.0.1:9/stream?url=http://direct/a.mp3"])
+        app._prefetch_task.cancel()
+
+    async def test_probes_stations_directly_not_through_relay(self):
+        app = make_app()
+        app.relay = StubRelay()
+        app.prober = StubProber({
+            "http://direct/a.mp3": ProbeResult("http://direct/a.mp3", True, 0.01, 0.1),
+        })
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "http://direct/a.mp3")]
+        app.nav.state.station = app.nav.state.stations[0]
+        await app._probe_and_play()
+        try:
+            self.assertEqual(app.prober.probed, [["http://direct/a.mp3"]])
+            await app.audio.wait_idle()
+            self.assertEqual(app.audio_player.played, ["http://127.0.0.1:9/stream?url=http://direct/a.mp3"])
+        finally:
+            app._cancel_stream_tasks()
+
+
 class TestMonitorStream(unittest.IsolatedAsyncioTestCase):
     async def test_stream_error_removes_station_and_plays_next(self):
         app = make_app()
@@ -136,6 +466,44 @@ class TestMonitorStream(unittest.IsolatedAsyncioTestCase):
             except asyncio.CancelledError:
                 pass
 
+    async def test_error_event_fails_over_without_waiting_for_interval(self):
+        app = make_app()
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "urlA"), ("B", "urlB")]
+        app.nav.state.station_idx = 0
+        app.nav.state.station = app.nav.state.stations[0]
+        app.audio_player.play("urlA")
+        app.audio_player.set_error(True)  # also queues an AUDIO_ERROR event
+
+        task = asyncio.create_task(app._monitor_stream("urlA"))
+        try:
+            await asyncio.sleep(0.05)
+            self.assertEqual(app.audio_player.played, ["urlA", "urlB"])
+            self.assertTrue(task.done())
+        finally:
+            task.cancel()
+
+    async def test_playing_event_ends_wait_and_ignores_other_urls(self):
+        app = make_app()
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "urlA"), ("B", "urlB")]
+        app.nav.state.station = app.nav.state.stations[0]
+        app.audio_player.play("urlA")
+        app.audio_player._error = True  # still opening, no event yet
+
+        task = asyncio.create_task(app._monitor_stream("urlA"))
+        try:
+            app.audio_player.events.put_nowait(AudioEvent(AUDIO_ERROR, "urlStandby"))
+            await asyncio.sleep(0.01)
+            self.assertFalse(task.done())
+
+            app.audio_player.emit(AUDIO_PLAYING)
+            await asyncio.sleep(0.01)
+            self.assertTrue(task.done())
+            self.assertEqual(app.audio_player.played, ["urlA"])
+        finally:
+            task.cancel()
+
     async def test_returns_early_if_user_already_changed_station(self):
         app = make_app()
         app.audio_player.play("urlA")
@@ -153,11 +521,172 @@ class TestMonitorStream(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(app.audio_player.played, ["urlA"])
 
 
+class TestStallWatchdog(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # Shrink the watchdog's timings so a stall plays out in milliseconds.
+        overrides = {
+            "WATCHDOG_INTERVAL": 0.01,
+            "STALL_TIMEOUT": 0.03,
+            "RECONNECT_BACKOFF_BASE": 0.0,
+            "RECONNECT_ATTEMPTS": 2,
+            "STREAM_CHECK_INTERVAL": 0,
+        }
+        for name, value in overrides.items():
+            patcher = mock.patch(f"radioglobe.main.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _playing_app(self):
+        app = make_app()
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "urlA"), ("B", "urlB")]
+        app.nav.state.station_idx = 0
+        app.nav.state.station = app.nav.state.stations[0]
+        app.audio_player.play("urlA")
+        app.audio_player.advance()
+        return app
+
+    async def test_stalled_stream_is_reconnected(self):
+        app = self._playing_app()
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        try:
+            await asyncio.sleep(0.02)
+            self.assertEqual(app.audio_player.played, ["urlA"])  # still within STALL_TIMEOUT
+
+            await asyncio.sleep(0.05)
+            self.assertEqual(app.audio_player.played[:2], ["urlA", "urlA"])
+            self.assertGreaterEqual(app.watchdog_stats["reconnects"], 1)
+            self.assertEqual(app.nav.state.station, ("A", "urlA"))
+        finally:
+            task.cancel()
+
+    async def test_progressing_stream_is_left_alone(self):
+        app = self._playing_app()
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        try:
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                app.audio_player.advance()
+            self.assertEqual(app.audio_player.played, ["urlA"])
+            self.assertEqual(app.watchdog_stats["stalls"], 0)
+        finally:
+            task.cancel()
+
+    async def test_stall_steps_multi_bitrate_station_down_a_tier(self):
+        app = self._playing_app()
+        app.bitrate.ladders = {"urlA": [(320000, "urlA"), (96000, "urlA-96k")]}
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        try:
+            await asyncio.sleep(0.07)
+            self.assertEqual(app.audio_player.played[:2], ["urlA", "urlA-96k"])
+            self.assertEqual(app.watchdog_stats["step_downs"], 1)
+            self.assertEqual(app.watchdog_stats["reconnects"], 0)
+            # The lowest tier stalling again falls back to plain reconnects.
+            await asyncio.sleep(0.07)
+            self.assertEqual(app.audio_player.played[2], "urlA-96k")
+        finally:
+            task.cancel()
+
+    async def test_healthy_stream_is_not_reconnected_after_stepping_up(self):
+        app = self._playing_app()
+        app.bitrate = BitrateSelector(
+            {"urlA": [(320000, "urlA"), (96000, "urlA-96k")]},
+            headroom=0.75, window=0.05, step_up_after=0.05,
+        )
+        app.bitrate.step_down("urlA", 0.0)
+        app.audio_player.play("urlA-96k")
+        app.bitrate.start_session("urlA", asyncio.get_running_loop().time())
+        task = asyncio.create_task(app._watch_stream("urlA-96k"))
+        try:
+            for _ in range(30):
+                await asyncio.sleep(0.01)
+                app.audio_player.advance(200)   # ~160 kbps: plenty for 96k, not for 320k
+            self.assertEqual(app.bitrate.select("urlA"), "urlA")   # the next play steps up...
+            self.assertEqual(app.audio_player.played, ["urlA", "urlA-96k"])   # ...this one plays on
+            self.assertEqual(app.watchdog_stats["step_downs"], 0)
+            self.assertEqual(app.watchdog_stats["stalls"], 0)
+        finally:
+            task.cancel()
+
+    async def test_error_event_reconnects_without_waiting_for_stall_timeout(self):
+        app = self._playing_app()
+        app.audio_player.demux_bytes = None  # no stats: events alone decide
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        try:
+            app.audio_player.emit(AUDIO_ERROR)
+            await asyncio.sleep(0.02)
+            self.assertEqual(app.audio_player.played, ["urlA", "urlA"])
+        finally:
+            task.cancel()
+
+    async def test_gives_up_after_reconnect_attempts_and_plays_next_station(self):
+        app = self._playing_app()
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        try:
+            await asyncio.sleep(0.2)
+            # Two reconnects, then the station is dropped and the next one plays.
+            self.assertEqual(app.audio_player.played[:4], ["urlA", "urlA", "urlA", "urlB"])
+            self.assertEqual(app.nav.state.stations, [("B", "urlB")])
+            self.assertEqual(app.watchdog_stats["failovers"], 1)
+            self.assertTrue(task.done())
+        finally:
+            task.cancel()
+            app._cancel_stream_tasks()
+
+    async def test_stops_when_user_changes_station(self):
+        app = self._playing_app()
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        app.audio_player.play("urlB")
+        await asyncio.sleep(0.05)
+        self.assertTrue(task.done())
+        self.assertEqual(app.audio_player.played, ["urlA", "urlB"])
+
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "Requires numpy (the deadair extra)")
+    async def test_dead_air_skips_to_next_station(self):
+        app = make_app(pcm_tap=PcmTap())
+        app.dead_air.hold = 0.03
+        app.nav.state.city = "TestCity,XY"
+        app.nav.state.stations = [("A", "urlA"), ("B", "urlB")]
+        app.nav.state.station = app.nav.state.stations[0]
+        app.audio_player.play("urlA")
+        task = asyncio.create_task(app._watch_stream("urlA"))
+        try:
+            for _ in range(10):
+                # Bytes keep arriving, so only the tap can tell it's dead air.
+                app.audio_player.advance()
+                app.pcm_tap.blocks.put_nowait(bytes(8000))
+                await asyncio.sleep(0.01)
+                if "urlB" in app.audio_player.played:
+                    break
+            self.assertEqual(app.audio_player.played, ["urlA", "urlB"])
+            self.assertEqual(app.watchdog_stats["dead_air"], 1)
+            self.assertEqual(app.watchdog_stats["reconnects"], 0)
+        finally:
+            task.cancel()
+            app._cancel_stream_tasks()
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "Requires numpy (the deadair extra)")
+    async def test_muted_or_quiet_radio_is_not_dead_air(self):
+        for volume in (VOLUME_OFF_LEVEL, DEAD_AIR_MIN_VOLUME - VOLUME_STEP):
+            with self.subTest(volume=volume):
+                app = make_app(pcm_tap=PcmTap())
+                app.dead_air.hold = 0.03
+                app.volume = volume
+                app.audio_player.play("urlA")
+                task = asyncio.create_task(app._watch_stream("urlA"))
+                try:
+                    for _ in range(10):
+                        app.audio_player.advance()
+                        app.pcm_tap.blocks.put_nowait(bytes(8000))
+                        await asyncio.sleep(0.01)
+                    self.assertEqual(app.audio_player.played, ["urlA"])
+                finally:
+                    task.cancel()
+
+
 class TestSaveLoadState(unittest.TestCase):
     def test_save_and_load_round_trip_encoder_calibration(self):
-        import tempfile
-        import os
-
         app = make_app()
         app.encoders.latch(100, 200, stickiness=2)
         app.nav.state.city = "TestCity,XY"
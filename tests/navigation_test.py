@@ -50,6 +50,30 @@ class TestNavigatorNextStation(unittest.TestCase):
         self.assertIsNone(nav.state.station)
 
 
+class TestNavigatorAdjacentStations(unittest.TestCase):
+    def setUp(self):
+        self.nav = make_navigator()
+        self.nav.state.stations = [("A", "urlA"), ("B", "urlB"), ("C", "urlC"), ("D", "urlD")]
+        self.nav.state.station_idx = 0
+        self.nav.state.station = self.nav.state.stations[0]
+
+    def test_dial_direction_first_then_opposite(self):
+        self.assertEqual(self.nav.adjacent_stations(2, 1), [("B", "urlB"), ("D", "urlD")])
+        self.assertEqual(self.nav.adjacent_stations(2, -1), [("D", "urlD"), ("B", "urlB")])
+
+    def test_count_caps_result_and_skips_duplicates(self):
+        self.assertEqual(self.nav.adjacent_stations(1, 1), [("B", "urlB")])
+        self.assertEqual(len(self.nav.adjacent_stations(10, 1)), 3)
+
+    def test_two_stations_yields_single_neighbour(self):
+        self.nav.state.stations = [("A", "urlA"), ("B", "urlB")]
+        self.assertEqual(self.nav.adjacent_stations(2, 1), [("B", "urlB")])
+
+    def test_no_stations_or_zero_count_is_empty(self):
+        self.assertEqual(self.nav.adjacent_stations(0, 1), [])
+        self.assertEqual(make_navigator().adjacent_stations(2, 1), [])
+
+
 class TestNavigatorNextCity(unittest.TestCase):
     def setUp(self):
         self.nav = make_navigator()
@@ -70,6 +94,22 @@ class TestNavigatorNextCity(unittest.TestCase):
         self.assertIsNone(nav.state.city)
 
 
+class TestNavigatorAdjacentCities(unittest.TestCase):
+    def setUp(self):
+        self.nav = make_navigator()
+        self.nav.state.cities = ["London,GB", "Paris,FR", "Berlin,DE", "Rome,IT"]
+        self.nav.state.city_idx = 0
+        self.nav.state.city = "London,GB"
+
+    def test_alternates_either_side_of_current(self):
+        self.assertEqual(self.nav.adjacent_cities(1), ["Paris,FR", "Rome,IT"])
+        self.assertEqual(self.nav.adjacent_cities(2), ["Paris,FR", "Rome,IT", "Berlin,DE"])
+
+    def test_no_cities_or_zero_count_is_empty(self):
+        self.assertEqual(self.nav.adjacent_cities(0), [])
+        self.assertEqual(make_navigator().adjacent_cities(1), [])
+
+
 class TestNavigatorSelectCity(unittest.TestCase):
     def setUp(self):
         self.stations = {
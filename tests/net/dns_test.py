@@ -0,0 +1,135 @@
+import asyncio
+import socket
+import unittest
+
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from aiohttp.test_utils import TestServer
+
+from radioglobe.net.dns import DnsCache, hosts_of
+from radioglobe.net.probe import StationProber
+from radioglobe.net.scheduler import PRIORITY_NEXT, PRIORITY_PREFETCH, NetScheduler
+
+
+class FakeResolver(AbstractResolver):
+    """Resolves every host but "dead.example" to 127.0.0.1, counting lookups."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lookups = []
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.lookups.append(host)
+        await asyncio.sleep(self.delay)
+        if host == "dead.example":
+            raise OSError(f"no such host {host}")
+        return [{
+            "hostname": host, "host": "127.0.0.1", "port": port,
+            "family": socket.AF_INET, "proto": 0, "flags": socket.AI_NUMERICHOST,
+        }]
+
+    async def close(self):
+        pass
+
+
+class TestHostsOf(unittest.TestCase):
+    def test_distinct_hostnames_in_order_without_ip_literals(self):
+        urls = [
+            "http://lstn.lv/bbc.m3u8?station=r4", "https://lstn.lv/bbc.m3u8?station=r6",
+            "http://media-ice.musicradio.com:80/LBC", "http://10.0.0.1:8000/live", "not a url",
+        ]
+        self.assertEqual(hosts_of(urls), ["lstn.lv", "media-ice.musicradio.com"])
+
+
+class TestDnsCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.fake = FakeResolver()
+        self.dns = DnsCache(ttl=60, resolver=self.fake)
+        self.dns.start()
+
+    async def asyncTearDown(self):
+        await self.dns.stop()
+
+    async def test_answers_are_cached_per_host_with_the_callers_port(self):
+        first = await self.dns.resolve("lstn.lv", 80, socket.AF_UNSPEC)
+        second = await self.dns.resolve("lstn.lv", 443, socket.AF_UNSPEC)
+        self.assertEqual(self.fake.lookups, ["lstn.lv"])
+        self.assertEqual((first[0]["port"], second[0]["port"]), (80, 443))
+        self.assertEqual(self.dns.stats()["hits"], 1)
+        self.assertEqual(self.dns.stats()["misses"], 1)
+
+    async def test_expired_entries_are_looked_up_again(self):
+        self.dns.ttl = 0
+        await self.dns.resolve("lstn.lv")
+        await self.dns.resolve("lstn.lv")
+        self.assertEqual(self.fake.lookups, ["lstn.lv", "lstn.lv"])
+
+    async def test_concurrent_lookups_of_a_host_share_one_query(self):
+        self.fake.delay = 0.05
+        await asyncio.gather(*(self.dns.resolve("lstn.lv") for _ in range(3)))
+        self.assertEqual(self.fake.lookups, ["lstn.lv"])
+        self.assertEqual(self.dns.stats()["shared"], 2)
+
+    async def test_warm_resolves_hosts_and_skips_failures(self):
+        resolved = await self.dns.warm(["a.example", "dead.example", "a.example", "b.example"])
+        self.assertEqual(resolved, 2)
+        self.assertEqual(self.dns.stats()["hosts"], 2)
+        self.assertEqual(self.dns.stats()["failures"], 1)
+        with self.assertRaises(OSError):
+            await self.dns.resolve("dead.example", 0, socket.AF_UNSPEC)  # not cached
+        await self.dns.resolve("a.example", 80, socket.AF_UNSPEC)
+        self.assertEqual(self.fake.lookups.count("a.example"), 1)
+
+
+class TestDnsSlots(unittest.IsolatedAsyncioTestCase):
+    async def test_slot_holders_joining_a_pending_warm_do_not_deadlock(self):
+        scheduler = NetScheduler(8)
+        dns = DnsCache(ttl=60, resolver=FakeResolver(delay=0.01), scheduler=scheduler)
+        dns.start()
+        hosts = ["a.example", "b.example"]
+        go = asyncio.Event()
+
+        async def connect(host):
+            # A probe or playlist fetch: holds a connection slot while aiohttp resolves.
+            async with scheduler.slot(PRIORITY_NEXT):
+                await go.wait()
+                return await dns.resolve(host, 80, socket.AF_UNSPEC)
+
+        try:
+            holders = [asyncio.create_task(connect(hosts[i % 2])) for i in range(8)]
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.active, 8)
+            warm = asyncio.create_task(dns.warm(hosts, priority=PRIORITY_PREFETCH))
+            await asyncio.sleep(0)
+            go.set()
+            results = await asyncio.wait_for(asyncio.gather(*holders), timeout=2)
+            self.assertEqual(await asyncio.wait_for(warm, timeout=2), 2)
+            self.assertTrue(all(result[0]["port"] == 80 for result in results))
+        finally:
+            await dns.stop()
+
+
+class TestSessionsConnectThroughCache(unittest.IsolatedAsyncioTestCase):
+    async def test_prober_uses_warmed_answer(self):
+        async def stream(request):
+            return web.Response(body=b"\xff\xfb" * 64, content_type="audio/mpeg")
+
+        app = web.Application()
+        app.router.add_get("/live", stream)
+        server = TestServer(app)
+        await server.start_server()
+        fake = FakeResolver()
+        dns = DnsCache(resolver=fake)
+        dns.start()
+        prober = StationProber(dns=dns)
+        prober.start()
+        try:
+            await dns.warm(["radio.example"])
+            result = await prober.probe(f"http://radio.example:{server.port}/live")
+            self.assertTrue(result.ok)
+            self.assertEqual(fake.lookups, ["radio.example"])
+            self.assertEqual(dns.stats()["hits"], 1)
+        finally:
+            await prober.stop()
+            await dns.stop()
+            await server.close()
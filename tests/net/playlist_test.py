@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from radioglobe.net.playlist import PlaylistResolver, decode_playlist, is_hls, parse_playlist
+
+
+class TestParsePlaylist(unittest.TestCase):
+    def test_pls_entries_in_file_number_order(self):
+        text = "[playlist]\nNumberOfEntries=2\nFile2=http://b/stream\nFile1=http://a/stream\n"
+        self.assertEqual(parse_playlist(text), ["http://a/stream", "http://b/stream"])
+
+    def test_m3u_skips_comments_and_blank_lines(self):
+        text = "#EXTM3U\n#EXTINF:-1,Radio\n\nhttp://a/stream\n"
+        self.assertEqual(parse_playlist(text), ["http://a/stream"])
+
+    def test_relative_entries_resolved_against_base(self):
+        self.assertEqual(parse_playlist("live.mp3\n", "http://host/radio/list.m3u"), ["http://host/radio/live.mp3"])
+
+    def test_unknown_charset_decodes_as_utf8(self):
+        self.assertEqual(decode_playlist("http://a/caf\u00e9".encode(), "x-unknown"), "http://a/caf\u00e9")
+        self.assertEqual(decode_playlist(b"http://a/caf\xe9", "latin-1"), "http://a/caf\u00e9")
+
+    def test_hls_detection(self):
+        self.assertTrue(is_hls("#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=128000\nlow.m3u8\n"))
+        self.assertFalse(is_hls("#EXTM3U\nhttp://a/stream\n"))
+
+
+def make_station_app():
+    async def stream(request):
+        return web.Response(body=b"\xff\xfb" * 64, content_type="audio/mpeg")
+
+    async def pls(request):
+        return web.Response(text="[playlist]\nFile1=/m3u.m3u\n", content_type="audio/x-scpls")
+
+    async def m3u(request):
+        return web.Response(text="#EXTM3U\n/stream.mp3\n", content_type="audio/x-mpegurl")
+
+    async def hls(request):
+        return web.Response(
+            text="#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=128000\nlow.m3u8\n",
+            content_type="application/vnd.apple.mpegurl",
+        )
+
+    async def odd_charset(request):
+        return web.Response(
+            body=b"#EXTM3U\n/stream.mp3\n",
+            headers={"Content-Type": "audio/x-mpegurl; charset=x-unknown"},
+        )
+
+    async def redirect(request):
+        raise web.HTTPFound("/hls.m3u8")
+
+    async def dead(request):
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/stream.mp3", stream)
+    app.router.add_get("/list.pls", pls)
+    app.router.add_get("/m3u.m3u", m3u)
+    app.router.add_get("/hls.m3u8", hls)
+    app.router.add_get("/odd.m3u", odd_charset)
+    app.router.add_get("/redirect.m3u8", redirect)
+    app.router.add_get("/dead.pls", dead)
+    return app
+
+
+class TestPlaylistResolver(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_station_app())
+        await self.server.start_server()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "playlists.json")
+        self.resolver = PlaylistResolver(cache_path=self.cache_path)
+        self.resolver.start()
+
+    async def asyncTearDown(self):
+        await self.resolver.stop()
+        await self.server.close()
+        self.tmp.cleanup()
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+    async def test_follows_nested_playlists_to_stream(self):
+        resolved = await self.resolver.resolve(self.url("/list.pls"))
+        self.assertEqual(resolved, self.url("/stream.mp3"))
+
+    async def test_redirect_to_hls_stops_at_hls_url(self):
+        resolved = await self.resolver.resolve(self.url("/redirect.m3u8"))
+        self.assertEqual(resolved, self.url("/hls.m3u8"))
+
+    async def test_unknown_charset_still_resolves(self):
+        results = await self.resolver.resolve_many([self.url("/odd.m3u"), self.url("/list.pls")])
+        self.assertEqual(set(results.values()), {self.url("/stream.mp3")})
+
+    async def test_failure_returns_none_and_is_not_cached(self):
+        self.assertIsNone(await self.resolver.resolve(self.url("/dead.pls")))
+        self.assertIsNone(self.resolver.cached(self.url("/dead.pls")))
+
+    async def test_cache_persists_across_instances(self):
+        await self.resolver.resolve_many([self.url("/list.pls")])
+
+        reloaded = PlaylistResolver(cache_path=self.cache_path)
+        reloaded.load()
+        self.assertEqual(reloaded.cached(self.url("/list.pls")), self.url("/stream.mp3"))
+
+    async def test_expired_and_invalidated_entries_are_dropped(self):
+        await self.resolver.resolve(self.url("/list.pls"))
+        self.resolver.invalidate(self.url("/list.pls"))
+        self.assertIsNone(self.resolver.cached(self.url("/list.pls")))
+
+        expired = PlaylistResolver(cache_path=self.cache_path, ttl=-1)
+        expired.start()
+        try:
+            await expired.resolve(self.url("/list.pls"))
+            self.assertIsNone(expired.cached(self.url("/list.pls")))
+        finally:
+            await expired.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
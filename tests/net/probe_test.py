@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from radioglobe.net.probe import ProbeResult, StationProber, rank_stations
+
+
+class TestRankStations(unittest.TestCase):
+    STATIONS = [("A", "urlA"), ("B", "urlB"), ("C", "urlC"), ("D", "urlD")]
+
+    def test_answered_fastest_first_then_unprobed_then_failed(self):
+        results = {
+            "urlA": ProbeResult("urlA", False, error="boom"),
+            "urlB": ProbeResult("urlB", True, 0.01, 0.40),
+            "urlD": ProbeResult("urlD", True, 0.01, 0.05),
+        }
+        ranked = rank_stations(self.STATIONS, results)
+        self.assertEqual([name for name, _ in ranked], ["D", "B", "C", "A"])
+
+    def test_no_results_keeps_original_order(self):
+        self.assertEqual(rank_stations(self.STATIONS, {}), self.STATIONS)
+
+
+def make_probe_app():
+    async def fast(request):
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+        await response.prepare(request)
+        await response.write(b"\xff\xfb" * 64)
+        return response
+
+    async def slow(request):
+        await asyncio.sleep(2)
+        return web.Response(body=b"late", content_type="audio/mpeg")
+
+    async def dead(request):
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/fast", fast)
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/dead", dead)
+    return app
+
+
+async def _icy_handler(reader, writer):
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(b"ICY 200 OK\r\ncontent-type: audio/mpeg\r\n\r\n" + b"\xff\xfb" * 64)
+    await writer.drain()
+    writer.close()
+
+
+class TestStationProber(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_probe_app())
+        await self.server.start_server()
+        self.prober = StationProber(max_connections=4, timeout=3)
+        self.prober.start()
+
+    async def asyncTearDown(self):
+        await self.prober.stop()
+        await self.server.close()
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+    async def test_probe_measures_answering_stream(self):
+        result = await self.prober.probe(self.url("/fast"))
+        self.assertTrue(result.ok)
+        self.assertIsNotNone(result.connect_time)
+        self.assertGreaterEqual(result.first_byte_time, result.connect_time)
+        self.assertEqual(result.content_type, "audio/mpeg")
+
+    async def test_http_error_is_a_failed_probe(self):
+        result = await self.prober.probe(self.url("/dead"))
+        self.assertFalse(result.ok)
+        self.assertIsNotNone(result.error)
+
+    async def test_icy_status_line_counts_as_answered(self):
+        server = await asyncio.start_server(_icy_handler, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            result = await self.prober.probe(f"http://127.0.0.1:{port}/")
+        finally:
+            server.close()
+        self.assertTrue(result.ok)
+
+    async def test_probe_all_drops_probes_over_budget(self):
+        urls = [self.url("/fast"), self.url("/slow"), self.url("/dead")]
+        results = await self.prober.probe_all(urls, budget=0.5)
+        self.assertEqual(set(results), {self.url("/fast"), self.url("/dead")})
+
+
+if __name__ == "__main__":
+    unittest.main()
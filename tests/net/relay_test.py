@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from radioglobe.net.relay import RingBuffer, StreamRelay, is_relayable
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_read_from_wraps_and_clamps_to_oldest_byte(self):
+        ring = RingBuffer(8)
+        ring.write(b"abcdef")
+        ring.write(b"ghij")
+        self.assertEqual(ring.start, 2)
+        self.assertEqual(ring.read_from(0), (b"cdefghij", 10))
+        self.assertEqual(ring.read_from(8), (b"ij", 10))
+        self.assertEqual(ring.read_from(10), (b"", 10))
+
+    def test_chunk_larger_than_capacity_keeps_its_tail(self):
+        ring = RingBuffer(4)
+        ring.write(b"0123456789")
+        self.assertEqual(ring.total, 10)
+        self.assertEqual(ring.read_from(0), (b"6789", 10))
+
+    def test_playlists_are_not_relayed(self):
+        self.assertTrue(is_relayable("http://host/live.mp3?x=1"))
+        self.assertFalse(is_relayable("http://host/list.pls"))
+        self.assertFalse(is_relayable("https://host/hls/master.m3u8?token=1"))
+
+
+def make_stream_app(connections):
+    async def stream(request):
+        connections.append(request.path)
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg", "icy-br": "8"})
+        await response.prepare(request)
+        for _ in range(200):
+            await response.write(b"x" * 100)
+            await asyncio.sleep(0.01)
+        return response
+
+    async def dead(request):
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/live", stream)
+    app.router.add_get("/dead", dead)
+    return app
+
+
+class TestStreamRelay(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.connections = []
+        self.server = TestServer(make_stream_app(self.connections))
+        await self.server.start_server()
+        self.relay = StreamRelay(linger=0.2)
+        await self.relay.start()
+        self.session = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.relay.stop()
+        await self.server.close()
+
+    async def read(self, url, size):
+        async with self.session.get(url) as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.content_type, "audio/mpeg")
+            return await response.content.readexactly(size)
+
+    async def test_second_listener_gets_buffer_at_once_on_shared_upstream(self):
+        station = str(self.server.make_url("/live"))
+        relayed = self.relay.url_for(station)
+        self.assertTrue(relayed.startswith(f"http://127.0.0.1:{self.relay.port}/stream?url="))
+
+        await self.read(relayed, 500)
+        await asyncio.sleep(0.1)
+        # Returning listener: buffered bytes arrive without waiting for the station.
+        data = await asyncio.wait_for(self.read(relayed, 1000), 0.5)
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(self.connections, ["/live"])
+
+        stats = self.relay.stats()[station]
+        self.assertGreater(stats["bytes_in"], 0)
+        self.assertGreaterEqual(stats["bytes_out"], 1500)
+        self.assertEqual(stats["stalls"], 0)
+
+    async def test_idle_upstream_is_closed_after_linger(self):
+        station = str(self.server.make_url("/live"))
+        await self.read(self.relay.url_for(station), 100)
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.relay.stats(), {})
+
+    async def test_dead_station_is_a_bad_gateway(self):
+        relayed = self.relay.url_for(str(self.server.make_url("/dead")))
+        async with self.session.get(relayed) as response:
+            self.assertEqual(response.status, 502)
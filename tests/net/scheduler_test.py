@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+
+from radioglobe.net.scheduler import (
+    PRIORITY_LIVE,
+    PRIORITY_NEXT,
+    PRIORITY_PREFETCH,
+    PRIORITY_PROBE,
+    NetScheduler,
+)
+
+
+class TestSlots(unittest.IsolatedAsyncioTestCase):
+    async def hold(self, scheduler, priority, order, release):
+        async with scheduler.slot(priority):
+            order.append(priority)
+            await release.wait()
+
+    async def test_waiters_are_served_strictly_by_priority(self):
+        scheduler = NetScheduler(max_connections=1)
+        order, release = [], asyncio.Event()
+        first = asyncio.create_task(self.hold(scheduler, PRIORITY_PROBE, order, release))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(self.hold(scheduler, priority, order, release))
+            for priority in (PRIORITY_PROBE, PRIORITY_PREFETCH, PRIORITY_NEXT)
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats()["waiting"], 3)
+        release.set()
+        await asyncio.gather(first, *waiters)
+        self.assertEqual(order, [PRIORITY_PROBE, PRIORITY_NEXT, PRIORITY_PREFETCH, PRIORITY_PROBE])
+        self.assertEqual(scheduler.active, 0)
+
+    async def test_live_never_waits_but_counts_against_the_cap(self):
+        scheduler = NetScheduler(max_connections=1)
+        async with scheduler.slot(PRIORITY_NEXT):
+            async with scheduler.slot(PRIORITY_LIVE):
+                self.assertEqual(scheduler.active, 2)
+        async with scheduler.slot(PRIORITY_LIVE):
+            waiter = asyncio.create_task(self.hold(scheduler, PRIORITY_NEXT, [], asyncio.Event()))
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats()["waiting"], 1)
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats()["waiting"], 0)
+        waiter.cancel()
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        scheduler = NetScheduler(max_connections=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(self.hold(scheduler, PRIORITY_NEXT, [], release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(self.hold(scheduler, PRIORITY_PROBE, [], release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        async with scheduler.slot(PRIORITY_PROBE):
+            self.assertEqual(scheduler.active, 1)
+        self.assertEqual(scheduler.active, 0)
+
+
+class TestThrottle(unittest.IsolatedAsyncioTestCase):
+    async def test_background_bytes_beyond_the_budget_are_paced(self):
+        scheduler = NetScheduler(bandwidth=100_000)
+        await scheduler.throttle(100_000, PRIORITY_PREFETCH)   # the bucket starts full
+        self.assertEqual(scheduler.throttled, 0)
+        await scheduler.throttle(5_000, PRIORITY_PROBE)
+        self.assertAlmostEqual(scheduler.throttled, 0.05, delta=0.01)
+
+    async def test_live_and_next_traffic_is_only_counted(self):
+        scheduler = NetScheduler(bandwidth=1)
+        await scheduler.throttle(10_000, PRIORITY_LIVE)
+        await scheduler.throttle(10_000, PRIORITY_NEXT)
+        self.assertEqual(scheduler.throttled, 0)
+        self.assertEqual(scheduler.stats()["bytes"]["live"], 10_000)
+
+
+class TestScopes(unittest.IsolatedAsyncioTestCase):
+    async def test_cancel_cancels_only_that_scopes_jobs(self):
+        scheduler = NetScheduler()
+        london = [scheduler.spawn(asyncio.sleep(10), "London,GB") for _ in range(3)]
+        paris = scheduler.spawn(asyncio.sleep(10), "Paris,FR")
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.cancel("London,GB"), 3)
+        await asyncio.sleep(0)
+        self.assertTrue(all(task.cancelled() for task in london))
+        self.assertFalse(paris.done())
+        self.assertEqual(scheduler.cancel("London,GB"), 0)
+        paris.cancel()
+
+    async def test_finished_jobs_leave_their_scope(self):
+        scheduler = NetScheduler()
+        await scheduler.spawn(asyncio.sleep(0), "London,GB")
+        self.assertEqual(scheduler.cancel("London,GB"), 0)
+        self.assertEqual(scheduler.stats()["cancelled"], 0)
@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from radioglobe.settle import SettleScheduler
+
+
+class TestSettleScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_single_tick_commits_after_min_window(self):
+        settle = SettleScheduler(min_window=0.02, max_window=0.2)
+        committed = []
+        settle.tick(lambda: committed.append("A"))
+        self.assertTrue(settle.pending)
+        await asyncio.sleep(0.05)
+        self.assertEqual(committed, ["A"])
+        self.assertFalse(settle.pending)
+
+    async def test_burst_commits_only_latest_callback(self):
+        settle = SettleScheduler(min_window=0.03, max_window=0.2)
+        committed = []
+        for name in "ABC":
+            settle.tick(lambda name=name: committed.append(name))
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.25)
+        self.assertEqual(committed, ["C"])
+        self.assertEqual(settle.ticks_skipped, 2)
+
+    async def test_window_follows_tick_rate_within_bounds(self):
+        settle = SettleScheduler(min_window=0.01, max_window=0.5, factor=2.0)
+        settle.tick(lambda: None)
+        self.assertEqual(settle.window, 0.01)
+        await asyncio.sleep(0.05)
+        settle.tick(lambda: None)
+        # One ~50 ms gap, doubled.
+        self.assertGreater(settle.window, 0.08)
+        self.assertLessEqual(settle.window, 0.5)
+        settle.cancel()
+
+    async def test_cancel_drops_pending_commit(self):
+        settle = SettleScheduler(min_window=0.01, max_window=0.1)
+        committed = []
+        settle.tick(lambda: committed.append("A"))
+        settle.cancel()
+        await asyncio.sleep(0.03)
+        self.assertEqual(committed, [])
+        self.assertEqual(settle.latency_stats()["count"], 0)
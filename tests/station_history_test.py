@@ -0,0 +1,164 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from radioglobe.radio_config import (
+    NETWORK_CACHING_DEFAULT,
+    NETWORK_CACHING_HLS_MIN,
+    NETWORK_CACHING_MAX,
+    NETWORK_CACHING_MIN,
+)
+from radioglobe.station_history import (
+    StationHistory,
+    choose_network_caching,
+    hints_for_codec,
+    hints_for_content_type,
+    media_options,
+)
+
+
+class TestChooseNetworkCaching(unittest.TestCase):
+    def test_unknown_station_gets_default(self):
+        self.assertEqual(choose_network_caching("http://a/live.mp3", None), NETWORK_CACHING_DEFAULT)
+
+    def test_steady_station_gets_floor(self):
+        history = StationHistory()
+        for _ in range(5):
+            history.record_play("http://a/live.mp3")
+            history.record_startup("http://a/live.mp3", 0.4)
+        self.assertEqual(history.network_caching("http://a/live.mp3"), NETWORK_CACHING_MIN)
+
+    def test_hls_floor_follows_the_url_played_not_the_station(self):
+        history = StationHistory()
+        history.record_play("http://a/station.pls")
+        caching = history.network_caching("http://a/station.pls", "http://cdn/hls/master.m3u8")
+        self.assertEqual(caching, NETWORK_CACHING_HLS_MIN)
+
+    def test_hls_never_below_hls_floor(self):
+        history = StationHistory()
+        url = "http://a/hls/master.m3u8?t=1"
+        history.record_play(url)
+        self.assertEqual(history.network_caching(url), NETWORK_CACHING_HLS_MIN)
+
+    def test_flaky_station_gets_more_buffer_capped_at_max(self):
+        history = StationHistory()
+        url = "http://a/live.mp3"
+        history.record_play(url)
+        history.record_buffering(url)
+        one_rebuffer = history.network_caching(url)
+        self.assertGreater(one_rebuffer, NETWORK_CACHING_MIN)
+        for _ in range(10):
+            history.record_stall(url)
+        self.assertEqual(history.network_caching(url), NETWORK_CACHING_MAX)
+
+    def test_old_rebuffers_decay_with_later_plays(self):
+        history = StationHistory()
+        url = "http://a/live.mp3"
+        history.record_play(url)
+        history.record_buffering(url)
+        flaky = history.network_caching(url)
+        for _ in range(10):
+            history.record_play(url)
+        self.assertLess(history.network_caching(url), flaky)
+
+    def test_jitter_tracks_startup_deviation(self):
+        history = StationHistory()
+        url = "http://a/live.mp3"
+        for seconds in (0.2, 1.8, 0.2, 1.8):
+            history.record_play(url)
+            history.record_startup(url, seconds)
+        self.assertGreater(history.get(url)["jitter"], 0.1)
+        self.assertGreater(history.network_caching(url), NETWORK_CACHING_MIN)
+
+
+class TestStreamHints(unittest.TestCase):
+    def test_codec_hints_for_icecast_and_hls(self):
+        self.assertEqual(
+            hints_for_codec("http://a/live.mp3", "mpga"), {"demux": "es", "codec": "mpg123"}
+        )
+        self.assertEqual(
+            hints_for_codec("http://a/live.m3u8", "mp4a"), {"demux": "adaptive", "codec": "avcodec"}
+        )
+        self.assertIsNone(hints_for_codec("http://a/live", "????"))
+
+    def test_content_type_hints_ignore_parameters(self):
+        self.assertEqual(
+            hints_for_content_type("http://a/live", "audio/aacp; charset=binary"),
+            {"demux": "es", "codec": "avcodec"},
+        )
+        self.assertIsNone(hints_for_content_type("http://a/live", "text/html"))
+
+    def test_media_options_fall_back_to_autodetection(self):
+        self.assertEqual(
+            media_options({"demux": "es", "codec": "mpg123"}),
+            [":demux=es,any", ":codec=mpg123,any"],
+        )
+        self.assertEqual(media_options(None), [])
+
+    def test_hint_gain_compares_hinted_and_unhinted_startup(self):
+        history = StationHistory()
+        url = "http://a/live.mp3"
+        self.assertIsNone(history.hint_gain(url))
+        history.record_startup(url, 1.2)
+        history.record_startup(url, 0.7, hinted=True)
+        self.assertAlmostEqual(history.hint_gain(url), 0.5)
+        self.assertEqual(list(history.hint_report()), [url])
+
+
+class TestStationHistoryPersistence(unittest.TestCase):
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sub", "history.json")
+            history = StationHistory(path)
+            history.record_play("http://a/live.mp3")
+            history.record_stall("http://a/live.mp3")
+            history.save()
+
+            restored = StationHistory(path)
+            restored.load()
+            self.assertEqual(restored.get("http://a/live.mp3"), history.get("http://a/live.mp3"))
+
+    def test_unreadable_file_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.json")
+            with open(path, "w") as f:
+                f.write("{not json")
+            history = StationHistory(path)
+            with self.assertLogs(level="WARNING"):
+                history.load()
+            self.assertIsNone(history.get("http://a/live.mp3"))
+
+    def test_save_drops_stations_not_played_within_max_age(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.json")
+            history = StationHistory(path, max_age=60)
+            history.record_play("http://a/old.mp3")
+            history.get("http://a/old.mp3")["last_played"] = time.time() - 120
+            history.record_play("http://a/new.mp3")
+            history.save()
+
+            restored = StationHistory(path)
+            restored.load()
+            self.assertIsNone(restored.get("http://a/old.mp3"))
+            self.assertIsNotNone(restored.get("http://a/new.mp3"))
+
+    def test_save_keeps_only_the_most_recently_played(self):
+        history = StationHistory(max_records=2)
+        for i in range(4):
+            history.record_play(f"http://a/{i}.mp3")
+            history.get(f"http://a/{i}.mp3")["last_played"] = 1000.0 + i
+        self.assertEqual(history.prune(now=1010.0), 2)
+        self.assertIsNone(history.get("http://a/1.mp3"))
+        self.assertIsNotNone(history.get("http://a/3.mp3"))
+
+    def test_records_from_older_files_age_out_from_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.json")
+            with open(path, "w") as f:
+                json.dump({"http://a/live.mp3": {"plays": 3.0}}, f)
+            history = StationHistory(path)
+            history.load()
+            self.assertIsNotNone(history.get("http://a/live.mp3")["last_played"])
+            self.assertEqual(history.prune(), 0)
@@ -0,0 +1,50 @@
+import unittest
+
+from radioglobe.constants import AUDIO_BUFFERING, AUDIO_ENDED, AUDIO_PLAYING
+from radioglobe.hal.protocols import AudioEvent
+from radioglobe.watchdog import StallDetector, backoff_delay
+
+
+class TestBackoffDelay(unittest.TestCase):
+    def test_doubles_per_attempt_up_to_cap(self):
+        delays = [backoff_delay(n, 1.0, 5.0, rng=lambda: 1.0) for n in range(1, 6)]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0, 5.0])
+
+    def test_jitter_scales_between_half_and_full(self):
+        self.assertEqual(backoff_delay(2, 1.0, 5.0, rng=lambda: 0.0), 1.0)
+        for _ in range(50):
+            self.assertTrue(1.0 <= backoff_delay(2, 1.0, 5.0) <= 2.0)
+
+
+class TestStallDetector(unittest.TestCase):
+    def test_stalls_when_demux_bytes_stop_moving(self):
+        detector = StallDetector(2.0)
+        detector.reset(0.0)
+        detector.observe_stats({"demux_read_bytes": 100, "input_bitrate": 0.02}, 1.0)
+        detector.observe_stats({"demux_read_bytes": 200}, 2.0)
+        self.assertFalse(detector.stalled(3.5))
+        detector.observe_stats({"demux_read_bytes": 200}, 4.0)
+        self.assertTrue(detector.stalled(4.0))
+
+    def test_without_stats_only_events_count(self):
+        detector = StallDetector(2.0)
+        detector.reset(0.0)
+        detector.observe_stats(None, 10.0)
+        self.assertFalse(detector.stalled(10.0, track_bytes=False))
+
+    def test_sustained_rebuffering_stalls(self):
+        detector = StallDetector(2.0)
+        detector.reset(0.0)
+        detector.observe_event(AudioEvent(AUDIO_BUFFERING, "u", 40.0), 1.0)
+        self.assertFalse(detector.stalled(2.5, track_bytes=False))
+        self.assertTrue(detector.stalled(3.0, track_bytes=False))
+        detector.observe_event(AudioEvent(AUDIO_PLAYING, "u"), 3.0)
+        self.assertFalse(detector.stalled(3.0, track_bytes=False))
+
+    def test_end_event_stalls_at_once_until_reset(self):
+        detector = StallDetector(2.0)
+        detector.reset(0.0)
+        detector.observe_event(AudioEvent(AUDIO_ENDED, "u"), 0.1)
+        self.assertTrue(detector.stalled(0.1))
+        detector.reset(0.2)
+        self.assertFalse(detector.stalled(0.2))